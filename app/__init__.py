@@ -14,8 +14,38 @@ def create_app(config_class=Config):
 
     # Register blueprints
     from app.blueprints.main import main as main_blueprint
+    from app.blueprints.metrics import metrics as metrics_blueprint, init_request_metrics
+    from app.blueprints.api import api as api_blueprint
+    from routes.file_routes import file_bp
     
     app.register_blueprint(main_blueprint)
+    app.register_blueprint(metrics_blueprint)
+    app.register_blueprint(api_blueprint)
+    app.register_blueprint(file_bp)
+
+    # Request latency metrics
+    init_request_metrics(app)
+
+    # In-memory job counts per status
+    from app.services.status_count_service import init_status_counts
+    init_status_counts(app)
+
+    # Turnaround estimates from the live queue and past waits
+    from app.services.estimate_service import init_turnaround_estimator
+    init_turnaround_estimator(app)
+
+    # Rendered student status pages
+    from app.services.student_status_service import init_student_status
+    init_student_status(app)
+
+    # Per-client submission limits and the cap on concurrent uploads
+    from app.services.rate_limit_service import init_rate_limiting
+    init_rate_limiting(app)
+
+    # Take the client address from X-Forwarded-For when behind trusted proxies
+    if app.config.get('TRUSTED_PROXY_COUNT'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
 
     # Initialize the config
     config_class.init_app(app)
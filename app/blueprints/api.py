@@ -0,0 +1,152 @@
+import time
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from app.blueprints.main import staff_required
+from app.services.status_count_service import get_status_count_cache, get_status_counts
+from app.services.storage_service import StorageService
+from app.services.search_service import SearchService
+from app.services.export_service import ExportService
+from app.services.analytics_service import AnalyticsService, PERIODS
+from app.services.event_service import JobEventService
+from app.services.scheduler_service import SchedulerService
+from app.services.plate_service import PlateService
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+
+@api.route('/status-counts')
+def status_counts():
+    """Job counts per status, served from memory for lab status screens."""
+    counts = get_status_counts()
+    updated_at = get_status_count_cache().updated_at
+    response = jsonify({
+        'counts': counts,
+        'total': sum(counts.values()),
+        'updated_at': updated_at.isoformat() + 'Z' if updated_at else None,
+    })
+    response.cache_control.public = True
+    response.cache_control.max_age = 5
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@api.route('/storage')
+@staff_required
+def storage_usage():
+    """Disk usage per status and student, largest jobs and a capacity forecast."""
+    top = min(request.args.get('top', 10, type=int), 100)
+    usage = StorageService.get_usage(top=top)
+    usage['forecast'] = StorageService.forecast()
+    response = jsonify(usage)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@api.route('/jobs/search')
+@staff_required
+def search_jobs():
+    """Full-text search over students, files, printers, colors, materials and notes."""
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    start = time.perf_counter()
+    rows = SearchService.search(query, limit=limit)
+    took_ms = (time.perf_counter() - start) * 1000
+    return jsonify({
+        'query': query,
+        'took_ms': round(took_ms, 2),
+        'results': [{
+            'id': row.id,
+            'student_name': row.student_name,
+            'student_email': row.student_email,
+            'original_filename': row.original_filename,
+            'printer': row.printer,
+            'color': row.color,
+            'material': row.material,
+            'status': row.status,
+            'created_at': row.created_at.isoformat(),
+            'url': url_for('main.job_detail', job_id=row.id),
+        } for row in rows],
+    })
+
+
+@api.route('/jobs/<int:job_id>/events')
+@staff_required
+def job_events(job_id):
+    """Audit trail of one job's status transitions, oldest first."""
+    return jsonify({'job_id': job_id, 'events': [e.to_dict() for e in JobEventService.history(job_id)]})
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', ExportService.iter_csv),
+    'parquet': ('application/vnd.apache.parquet', ExportService.iter_parquet),
+}
+
+
+@api.route('/jobs/export')
+@staff_required
+def export_jobs():
+    """Stream job history (completed jobs by default) as CSV or Parquet for accounting."""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown format: {export_format}'}), 400
+    if export_format == 'parquet' and not ExportService.parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow'}), 501
+    try:
+        dates = {name: datetime.strptime(request.args[arg], '%Y-%m-%d').date() if request.args.get(arg) else None
+                 for name, arg in (('created_from', 'from'), ('created_to', 'to'))}
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+
+    mimetype, writer = EXPORT_FORMATS[export_format]
+    batches = ExportService.iter_batches(statuses=request.args.getlist('status') or None, **dates)
+    response = Response(stream_with_context(writer(batches)), mimetype=mimetype)
+    filename = f"jobs-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+
+@api.route('/reports/usage')
+@staff_required
+def usage_report():
+    """Throughput per day or week with material and printer breakdowns, read from the rollups."""
+    period = request.args.get('period', 'week')
+    if period not in PERIODS:
+        return jsonify({'error': f'Unknown period: {period}'}), 400
+    try:
+        start, end = (datetime.strptime(request.args[arg], '%Y-%m-%d').date() if request.args.get(arg) else None
+                      for arg in ('from', 'to'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    response = jsonify(AnalyticsService.get_report(period, start, end))
+    response.cache_control.private = True
+    response.cache_control.max_age = 60
+    return response
+
+
+@api.route('/schedule', methods=['GET', 'POST'])
+@staff_required
+def print_schedule():
+    """Per-printer print queues for confirmed jobs; POST saves the assignment on the jobs."""
+    start = time.perf_counter()
+    schedule = SchedulerService.build(apply=request.method == 'POST')
+    schedule['took_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    response = jsonify(schedule)
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+
+@api.route('/plates')
+@staff_required
+def plate_suggestions():
+    """Suggested build plates of small confirmed jobs sharing a printer model, material and color."""
+    start = time.perf_counter()
+    suggestions = PlateService.suggest()
+    suggestions['took_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    response = jsonify(suggestions)
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
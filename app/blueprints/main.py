@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, flash, redirect, url_for, request, current_app, send_file, jsonify, abort, session
+from flask import Blueprint, render_template, flash, redirect, url_for, request, current_app, jsonify, abort, session
 from werkzeug.utils import secure_filename
 from app.models.job import Job, Status
 from extensions import db
@@ -10,16 +10,19 @@ import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from functools import wraps
-from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadTimeSignature
 from app.services.token_service import TokenService
 from app.services.mail_service import MailService
+from app.services.status_count_service import get_status_counts
+from app.services.download_service import DownloadService
+from app.services.job_listing_service import JobListingService, InvalidCursor, SORT_COLUMNS
+from app.services.analytics_service import AnalyticsService, PERIODS
+from app.services.estimate_service import get_turnaround_estimator, describe_estimate
+from app.services.rate_limit_service import limit_submissions, get_rate_limiter
+from app.services.student_status_service import StudentStatusService
+from app.services.metrics_service import STUDENT_STATUS_REQUESTS
 
 main = Blueprint('main', __name__)
 
-# Helper to get the token serializer
-def get_token_serializer():
-    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
-
 # Decorator for staff-only routes
 def staff_required(f):
     @wraps(f)
@@ -43,6 +46,8 @@ def dashboard():
     # e.g., 'uploaded', 'pending', 'ready_to_print'
     
     jobs_by_status_for_template = {}
+    status_counts_for_template = {}
+    db_status_counts = get_status_counts()
     for db_status_value in Config.STATUS_FOLDERS: # These are the values stored in DB, e.g., "Uploaded", "ReadyToPrint"
         # Convert DB status value to the key format expected by the template
         template_key = db_status_value.lower().replace(' ', '_') # 'Uploaded' -> 'uploaded', 'ReadyToPrint' -> 'readytoprint' - wait, template uses 'ready_to_print'
@@ -70,17 +75,22 @@ def dashboard():
             continue # Should not happen if Config.STATUS_FOLDERS is aligned
             
         jobs_by_status_for_template[template_key] = Job.query.filter_by(status=db_status_value).all()
+        status_counts_for_template[template_key] = db_status_counts.get(db_status_value, 0)
 
     # Ensure all keys expected by template are present, even if with empty lists
     expected_template_keys = ['uploaded', 'pending', 'rejected', 'ready_to_print', 'printing', 'completed', 'paid_picked_up']
     for key in expected_template_keys:
         if key not in jobs_by_status_for_template:
             jobs_by_status_for_template[key] = []
+            status_counts_for_template[key] = 0
             
-    return render_template('dashboard.html', jobs_by_status=jobs_by_status_for_template)
+    return render_template('dashboard.html',
+                           jobs_by_status=jobs_by_status_for_template,
+                           status_counts=status_counts_for_template)
 
 @main.route('/submit', methods=['GET', 'POST'])
 # @login_required # Removed - Public access
+@limit_submissions
 def submit():
     if request.method == 'POST':
         student_name = request.form.get('student_name')
@@ -131,18 +141,19 @@ def submit():
             flash(f'Error creating job record. Please try again.', 'error')
             return redirect(request.url)
             
-        if FileService.save_uploaded_file(file, Status.UPLOADED.value, filename):
+        if FileService.save_uploaded_file(file, Status.UPLOADED.value, filename, job=job):
+            db.session.commit()
             current_app.logger.info(f"File saved successfully for job ID: {job.id}. Filename: {filename}")
             
             try:
-                file_path = FileService.get_upload_path(Status.UPLOADED.value, filename)
-                thumbnail_path = ThumbnailService.generate_thumbnail(str(file_path), job.id)
+                thumbnail_path = ThumbnailService.generate_thumbnail(job)
                 if thumbnail_path:
                     job.thumbnail_path = thumbnail_path
-                    db.session.commit() 
                     current_app.logger.info(f"Thumbnail path saved for job ID: {job.id}")
                 else:
                     current_app.logger.warning(f'Thumbnail generation returned no path for job {job.id}')
+                # Also keeps the bounding box taken from the mesh, even if rendering failed
+                db.session.commit()
             except Exception as thumb_e:
                 db.session.rollback() 
                 current_app.logger.error(f'Error during thumbnail generation for job {job.id}: {thumb_e}', exc_info=True)
@@ -167,12 +178,104 @@ def submit():
 def submission_confirmed():
     return render_template('main/submission_confirmed.html', title='Submission Confirmed')
 
+@main.route('/status', methods=['GET', 'POST'])
+def request_status_link():
+    """Email a student a link to the status page of their jobs."""
+    if request.method == 'POST':
+        student_email = (request.form.get('student_email') or '').strip().lower()
+        if not student_email:
+            flash('Please enter the email address you submitted with.', 'error')
+            return redirect(request.url)
+        # Answer the same whether or not the address has jobs, so the form
+        # does not reveal who has submitted; the limit stops mail floods
+        allowed = (not current_app.config.get('RATE_LIMIT_ENABLED', True)
+                   or not get_rate_limiter().check('status_link', student_email))
+        if allowed and StudentStatusService.has_jobs(student_email):
+            status_url = url_for('main.student_status',
+                                 token=TokenService.generate_status_token(student_email), _external=True)
+            EmailService.send_status_link_email(student_email, status_url)
+        flash('If there are print jobs for that address, a link to their status has been emailed to it.', 'success')
+        return redirect(url_for('main.request_status_link'))
+    return render_template('student/request_status.html', title='Check Job Status')
+
+@main.route('/status/<token>')
+def student_status(token):
+    """Current status, thumbnail and estimate of every job of the token's student."""
+    student_email, error = TokenService.verify_status_token(token)
+    if error:
+        flash(error, 'error')
+        return redirect(url_for('main.request_status_link'))
+
+    version = StudentStatusService.version(student_email)
+    # The page around the job list also depends on the session (navigation links)
+    etag = f'{version}-staff' if session.get('is_staff') else version
+    if request.if_none_match.contains(etag) and not session.get('_flashes'):
+        STUDENT_STATUS_REQUESTS.inc(result='not_modified')
+        response = current_app.response_class(status=304)
+    else:
+        def render_jobs(jobs):
+            estimator = get_turnaround_estimator()
+            rows = []
+            for job in jobs:
+                estimate = estimator.estimate(job)
+                rows.append((job, describe_estimate(estimate) if estimate else None))
+            return render_template('student/_status_jobs.html', rows=rows)
+
+        jobs_html = StudentStatusService.render_jobs(student_email, version, render_jobs)
+        response = current_app.make_response(render_template(
+            'student/status.html', title='Your Print Jobs', student_email=student_email, jobs_html=jobs_html))
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    # The token is in the URL; keep it out of Referer headers sent to the CDNs
+    response.headers['Referrer-Policy'] = 'no-referrer'
+    return response
+
 @main.route('/jobs')
 @staff_required # Use the new decorator
 def jobs():
     # Removed staff/student distinction - staff see all jobs
-    jobs = Job.query.order_by(Job.created_at.desc()).all()
-    return render_template('main/jobs.html', jobs=jobs)
+    filters = {name: request.args.get(name, '').strip() for name in ('status', 'printer', 'material')}
+    for name, arg in (('created_from', 'from'), ('created_to', 'to')):
+        value = request.args.get(arg, '').strip()
+        try:
+            filters[name] = datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            flash(f'Invalid date: {value}', 'error')
+            filters[name] = None
+    sort = request.args.get('sort', 'created_at')
+    if sort not in SORT_COLUMNS:
+        sort = 'created_at'
+    descending = request.args.get('order', 'desc') != 'asc'
+
+    try:
+        page = JobListingService.list_jobs(filters, sort=sort, descending=descending,
+                                           after=request.args.get('after'), before=request.args.get('before'))
+    except InvalidCursor:
+        abort(400)
+
+    # Query args shared by every pagination link; the cursors are added per link
+    args = {key: value for key, value in request.args.items() if value and key not in ('after', 'before')}
+    return render_template('main/jobs.html', jobs=page['jobs'], page=page, args=args, sort=sort,
+                           descending=descending, statuses=[status.value for status in Status])
+
+@main.route('/reports')
+@staff_required
+def reports():
+    period = request.args.get('period', 'week')
+    if period not in PERIODS:
+        period = 'week'
+    dates = {}
+    for arg in ('from', 'to'):
+        value = request.args.get(arg, '').strip()
+        try:
+            dates[arg] = datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            flash(f'Invalid date: {value}', 'error')
+            dates[arg] = None
+    report = AnalyticsService.get_report(period, dates['from'], dates['to'])
+    peak = max([entry['submitted'] for entry in report['series']] + [1])
+    return render_template('main/reports.html', report=report, peak=peak, title='Usage Reports')
 
 @main.route('/job/<int:job_id>')
 @staff_required # Use the new decorator
@@ -186,16 +289,11 @@ def job_detail(job_id):
 def download_file(job_id):
     job = Job.query.get_or_404(job_id)
     # Removed user check
-    file_path = FileService.get_upload_path(job.status, job.filename)
+    file_path = job.get_file_path()
     if not file_path.exists():
         flash(f'File not found for job {job_id}.', 'error')
         abort(404) 
-    return send_file(
-        str(file_path),
-        as_attachment=True,
-        download_name=job.original_filename,
-        mimetype=FileService.get_mime_type(job.original_filename)
-    )
+    return DownloadService.send_job_file(job, as_attachment=True)
 
 @main.route('/job/<int:job_id>/approve', methods=['POST'])
 @staff_required
@@ -227,7 +325,8 @@ def approve_job(job_id):
     
     try:
         # Update job status and generate confirmation token
-        job.update_status(Status.PENDING)
+        job.update_status(Status.PENDING, actor='staff',
+                          payload={'weight_g': job.weight_g, 'time_min': job.time_min, 'cost': job.cost})
         token = TokenService.generate_token(job)
         job.confirm_url = url_for('main.confirm_job_by_token', token=token, _external=True)
         db.session.commit()
@@ -237,6 +336,7 @@ def approve_job(job_id):
             try:
                 hours = job.time_min // 60
                 minutes = job.time_min % 60
+                estimate = get_turnaround_estimator().estimate(job)
                 EmailService.send_job_approval_email(
                     student_email=job.student_email,
                     filename=job.original_filename,
@@ -244,7 +344,8 @@ def approve_job(job_id):
                     hours=hours,
                     minutes=minutes,
                     material=job.material,
-                    confirm_url=job.confirm_url
+                    confirm_url=job.confirm_url,
+                    estimated_completion=describe_estimate(estimate) if estimate else None
                 )
             except Exception as email_error:
                 current_app.logger.error(f'Error sending approval email for job {job.id}: {email_error}')
@@ -277,7 +378,7 @@ def reject_job(job_id):
         # Update job status and reasons
         job.reject_reasons = reasons
         old_status = job.status
-        job.update_status(Status.REJECTED)
+        job.update_status(Status.REJECTED, actor='staff', payload={'reasons': reasons})
         
         # Move file back to rejected directory
         if not FileService.move_file(job.filename, Status(old_status), Status.REJECTED):
@@ -327,7 +428,7 @@ def confirm_job_by_token(token):
     try:
         # Update job status
         job.student_confirmed = True
-        job.update_status(Status.CONFIRMED)
+        job.update_status(Status.CONFIRMED, actor=job.student_email)
         
         # Move file to confirmed directory
         if not FileService.move_file(job.filename, Status.PENDING, Status.CONFIRMED):
@@ -336,8 +437,11 @@ def confirm_job_by_token(token):
             return redirect(url_for('main.submit'))
         
         db.session.commit()
+        TokenService.invalidate_token(token)
         flash('Job confirmed successfully! Your print will begin soon.', 'success')
-        return render_template('student/job_confirmed.html', job=job)
+        estimate = get_turnaround_estimator().estimate(job)
+        return render_template('student/job_confirmed.html', job=job, estimate=estimate,
+                               estimate_text=describe_estimate(estimate) if estimate else None)
         
     except Exception as e:
         db.session.rollback()
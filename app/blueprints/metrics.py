@@ -0,0 +1,132 @@
+import hmac
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from sqlalchemy import text
+from extensions import db
+from app.services.metrics_service import registry, REQUEST_LATENCY, JOB_TRANSITIONS, JOB_STATUS_DURATION
+from app.services.event_service import job_events_committed
+from app.services.status_count_service import get_status_counts
+from app.maintenance.reconcile import read_last_report
+
+metrics = Blueprint('metrics', __name__)
+
+
+def _job_status_counts():
+    return {(status,): count for status, count in get_status_counts().items()}
+
+
+def _jobs_root_disk_usage():
+    usage = shutil.disk_usage(current_app.config['JOBS_ROOT'])
+    return {('total',): usage.total, ('used',): usage.used, ('free',): usage.free}
+
+
+def _last_maintenance_run():
+    # Imported here so `python -m app.maintenance.cleanup` does not load itself twice
+    from app.maintenance.cleanup import read_last_run
+    return read_last_run(current_app.config['MAINTENANCE_FOLDER']) or {}
+
+
+def _maintenance_last_run_timestamp():
+    last_run = _last_maintenance_run()
+    if not last_run:
+        return {}
+    started_at = datetime.fromisoformat(last_run['started_at']).replace(tzinfo=timezone.utc)
+    return {(): started_at.timestamp()}
+
+
+def _maintenance_last_run_jobs():
+    return {
+        (stage, outcome): count
+        for stage, outcomes in _last_maintenance_run().get('stages', {}).items()
+        for outcome, count in outcomes.items()
+        if outcome not in ('jobs', 'files_checked', 'bytes', 'compressed_bytes')
+    }
+
+
+def _reconcile_issues():
+    report = read_last_report(current_app.config['MAINTENANCE_FOLDER'])
+    if not report:
+        return {}
+    return {(kind,): len(report.get(kind, [])) for kind in ('orphans', 'missing', 'misplaced', 'search_index_missing')}
+
+
+registry.gauge('printsystem_jobs', 'Jobs per status.', ('status',), callback=_job_status_counts)
+registry.gauge('printsystem_jobs_root_disk_bytes', 'Disk usage of the filesystem holding JOBS_ROOT.',
+               ('kind',), callback=_jobs_root_disk_usage)
+registry.gauge('printsystem_maintenance_last_run_timestamp_seconds', 'Start time of the last maintenance run.',
+               callback=_maintenance_last_run_timestamp)
+registry.gauge('printsystem_maintenance_last_run_jobs', 'Jobs handled by the last maintenance run, per outcome.',
+               ('stage', 'outcome'), callback=_maintenance_last_run_jobs)
+registry.gauge('printsystem_reconcile_issues', 'Problems found by the last reconcile run.',
+               ('kind',), callback=_reconcile_issues)
+
+
+@job_events_committed.connect
+def _observe_job_events(sender, events, **extra):
+    for job_event in events:
+        JOB_TRANSITIONS.inc(from_status=job_event['from_status'] or '', to_status=job_event['to_status'])
+        if job_event['elapsed_seconds'] is not None:
+            JOB_STATUS_DURATION.observe(job_event['elapsed_seconds'], status=job_event['from_status'])
+
+
+def init_request_metrics(app):
+    """Record the latency of every request, labelled by endpoint."""
+
+    @app.before_request
+    def _start_request_timer():
+        request.environ['printsystem.start_time'] = time.perf_counter()
+
+    @app.after_request
+    def _observe_request_latency(response):
+        start = request.environ.get('printsystem.start_time')
+        if start is not None:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                endpoint=request.endpoint or 'unmatched',
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+
+@metrics.route('/metrics')
+def metrics_endpoint():
+    """Expose all metrics in the Prometheus text exposition format.
+
+    When ``METRICS_TOKEN`` is set, scrapers must send it as a bearer token.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            abort(401)
+    return Response(registry.render(), mimetype=None, content_type=registry.CONTENT_TYPE)
+
+
+@metrics.route('/healthz')
+def healthz():
+    """Liveness: the worker process is up and answering requests."""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+
+@metrics.route('/readyz')
+def readyz():
+    """Readiness: the database answers, the jobs volume is mounted and this
+    worker is not draining before a recycle or reload."""
+    checks = {}
+    try:
+        db.session.execute(text('SELECT 1'))
+        checks['database'] = 'ok'
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f'Readiness check: database unavailable: {e}')
+        checks['database'] = 'unavailable'
+    checks['jobs_root'] = 'ok' if os.path.isdir(current_app.config['JOBS_ROOT']) else 'missing'
+    draining = current_app.extensions.get('draining')
+    checks['worker'] = 'draining' if draining is not None and draining.is_set() else 'ok'
+    ready = all(state == 'ok' for state in checks.values())
+    return jsonify({'status': 'ready' if ready else 'unavailable', 'pid': os.getpid(), 'checks': checks}), \
+        200 if ready else 503
@@ -1 +1,318 @@
- 
\ No newline at end of file
+"""Scheduled maintenance for the 3D print system.
+
+Expiring jobs are selected from the database through the
+``(status, archived_at, updated_at)`` index and processed in bounded batches, so a run
+touches (and stats) only the files that are actually due, no matter how large
+the archive grows. Progress is checkpointed after every batch so an
+interrupted run resumes where it stopped, and each run appends its stats as
+one JSON line to ``MAINTENANCE_FOLDER/cleanup_runs.jsonl``.
+
+Usage::
+
+    python -m app.maintenance.cleanup [run] [--batch-size N] [--max-batches N] [--dry-run]
+    python -m app.maintenance.cleanup disk-space [PATH]
+    python -m app.maintenance.cleanup storage [--top N] [--rebuild]
+    python -m app.maintenance.cleanup reconcile [--repair] [--full]
+    python -m app.maintenance.cleanup rollups [--period day|week] [--rebuild]
+    python -m app.maintenance.cleanup export [--format csv|parquet] [--status S ...] [--from DATE] [--to DATE] [-o FILE]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_
+from extensions import db
+from app.models.job import Job, Status
+from app.services.archive_service import ArchiveService
+from app.services.geometry_service import GeometryService
+from app.services.storage_service import StorageService
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Thresholds
+STALE_UPLOAD_DAYS = 7
+ARCHIVE_AFTER_DAYS = 30
+BATCH_SIZE = 200
+
+CHECKPOINT_FILE = 'cleanup_checkpoint.json'
+STATS_FILE = 'cleanup_runs.jsonl'
+
+
+def _delete_stale_uploads(jobs, stage):
+    """Delete jobs that were never submitted for review (files go with them)."""
+    outcomes = {}
+    for job in jobs:
+        outcomes[job.id] = 'deleted'
+        db.session.delete(job)
+    db.session.commit()
+    return outcomes
+
+
+def _archive_jobs(jobs, stage):
+    """Compress finished jobs' files into the archival tier."""
+    outcomes = {}
+    for job_id, (outcome, compressed_size) in ArchiveService.archive_jobs(jobs).items():
+        outcomes[job_id] = outcome
+        if compressed_size is not None:
+            stage['compressed_bytes'] = stage.get('compressed_bytes', 0) + compressed_size
+    return outcomes
+
+
+# (stage name, status, minimum age in days, action)
+POLICIES = (
+    ('stale_uploads', Status.UPLOADED, STALE_UPLOAD_DAYS, _delete_stale_uploads),
+    ('archive_completed', Status.COMPLETED, ARCHIVE_AFTER_DAYS, _archive_jobs),
+    ('archive_rejected', Status.REJECTED, ARCHIVE_AFTER_DAYS, _archive_jobs),
+)
+
+
+def _load_checkpoint(folder: str) -> dict:
+    try:
+        with open(os.path.join(folder, CHECKPOINT_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(folder: str, checkpoint: dict):
+    path = os.path.join(folder, CHECKPOINT_FILE)
+    if not checkpoint:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _candidate_batch(status: Status, cutoff: datetime, position, batch_size: int):
+    """Next batch of unarchived jobs in ``status`` last updated before ``cutoff``, after ``position``."""
+    query = Job.query.filter(Job.status == status.value, Job.archived_at.is_(None), Job.updated_at < cutoff)
+    if position:
+        last_updated_at, last_id = datetime.fromisoformat(position[0]), position[1]
+        query = query.filter(or_(
+            Job.updated_at > last_updated_at,
+            and_(Job.updated_at == last_updated_at, Job.id > last_id),
+        ))
+    return query.order_by(Job.updated_at, Job.id).limit(batch_size).all()
+
+
+def _unmeasured_count():
+    return Job.query.filter(Job.status == Status.CONFIRMED.value, Job.bbox_x_mm.is_(None)).count()
+
+
+def _file_size(job):
+    try:
+        return job.get_file_path().stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+def run_maintenance(batch_size: int = BATCH_SIZE, max_batches: int = None, dry_run: bool = False,
+                    now: datetime = None) -> dict:
+    """Run every maintenance policy and return the run's stats.
+
+    Stops after ``max_batches`` batches (leaving a checkpoint for the next run)
+    when given. A dry run reports what would be done without changing anything.
+    """
+    folder = current_app.config['MAINTENANCE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    now = now or datetime.utcnow()
+    checkpoint = {} if dry_run else _load_checkpoint(folder)
+    stats = {
+        'run_id': uuid.uuid4().hex,
+        'started_at': now.isoformat(),
+        'dry_run': dry_run,
+        'resumed': bool(checkpoint),
+        'complete': True,
+        'batches': 0,
+        'stages': {},
+    }
+    start = time.perf_counter()
+
+    for name, status, age_days, action in POLICIES:
+        stage = stats['stages'][name] = {'jobs': 0, 'files_checked': 0, 'missing': 0, 'bytes': 0}
+        cutoff = now - timedelta(days=age_days)
+        position = checkpoint.get(name)
+        while True:
+            if max_batches is not None and stats['batches'] >= max_batches:
+                stats['complete'] = False
+                break
+            jobs = _candidate_batch(status, cutoff, position, batch_size)
+            if not jobs:
+                checkpoint.pop(name, None)
+                break
+            # Read the keyset position before jobs are deleted or expired
+            position = [jobs[-1].updated_at.isoformat(), jobs[-1].id]
+            for job in jobs:
+                size = _file_size(job)
+                stage['jobs'] += 1
+                stage['files_checked'] += 1
+                if size is None:
+                    stage['missing'] += 1
+                else:
+                    stage['bytes'] += size
+            outcomes = {job.id: 'dry_run' for job in jobs} if dry_run else action(jobs, stage)
+            for outcome in outcomes.values():
+                stage[outcome] = stage.get(outcome, 0) + 1
+            stats['batches'] += 1
+            if not dry_run:
+                checkpoint[name] = position
+                _save_checkpoint(folder, checkpoint)
+        if not stats['complete']:
+            break
+
+    # Web requests only read bounding boxes; jobs whose mesh could not be
+    # measured while rendering the thumbnail are caught up here
+    if dry_run:
+        stats['stages']['measure_confirmed'] = {'jobs': _unmeasured_count()}
+    else:
+        stats['stages']['measure_confirmed'] = GeometryService.measure_confirmed()
+        _save_checkpoint(folder, checkpoint)
+        StorageService.record_snapshot(now)
+    stats['duration_seconds'] = round(time.perf_counter() - start, 3)
+    if not dry_run:
+        with open(os.path.join(folder, STATS_FILE), 'a') as f:
+            f.write(json.dumps(stats) + '\n')
+    logger.info('Maintenance run %s: %s', stats['run_id'], json.dumps(stats['stages']))
+    return stats
+
+
+def read_last_run(folder: str):
+    """Return the stats of the most recent run, or None if there has not been one."""
+    path = os.path.join(folder, STATS_FILE)
+    try:
+        with open(path, 'rb') as f:
+            # Only the tail is needed, however long the history grows
+            f.seek(max(os.path.getsize(path) - 65536, 0))
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def check_disk_space(path: str = None, threshold: float = None) -> dict:
+    """Log disk usage of ``path`` (JOBS_ROOT by default), warning above the threshold."""
+    path = path or Config.JOBS_ROOT
+    threshold = Config.DISK_SPACE_THRESHOLD if threshold is None else threshold
+    usage = shutil.disk_usage(path)
+    ratio = usage.used / usage.total if usage.total else 0.0
+    result = {
+        'path': path,
+        'total': usage.total,
+        'used': usage.used,
+        'free': usage.free,
+        'used_ratio': round(ratio, 4),
+        'alert': ratio > threshold,
+    }
+    if result['alert']:
+        logger.warning('Disk usage of %s is %.1f%% (threshold %.0f%%)', path, ratio * 100, threshold * 100)
+    else:
+        logger.info('Disk usage of %s is %.1f%%', path, ratio * 100)
+    return result
+
+
+def _parse_date(value: str):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _export(args) -> int:
+    from app.services.export_service import ExportService
+    if args.format == 'parquet' and not ExportService.parquet_available():
+        logger.error('Parquet export requires pyarrow')
+        return 1
+    batches = ExportService.iter_batches(statuses=args.status, created_from=args.created_from,
+                                         created_to=args.created_to)
+    writer = ExportService.iter_parquet if args.format == 'parquet' else ExportService.iter_csv
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in writer(batches):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='3D print system maintenance')
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help='expire stale uploads and archive old jobs (default)')
+    run_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    run_parser.add_argument('--max-batches', type=int, default=None)
+    run_parser.add_argument('--dry-run', action='store_true')
+    disk_parser = subparsers.add_parser('disk-space', help='check disk usage of the jobs root')
+    disk_parser.add_argument('path', nargs='?', default=None)
+    storage_parser = subparsers.add_parser('storage', help='report disk usage by status and student with a forecast')
+    storage_parser.add_argument('--top', type=int, default=10)
+    storage_parser.add_argument('--rebuild', action='store_true',
+                                help='backfill unknown file sizes and recompute the totals first')
+    reconcile_parser = subparsers.add_parser('reconcile', help='compare job files on disk with the database')
+    reconcile_parser.add_argument('--repair', action='store_true', help='move misplaced files to their status folder')
+    reconcile_parser.add_argument('--full', action='store_true', help='ignore cached directory listings')
+    rollups_parser = subparsers.add_parser('rollups', help='print the usage report from the analytics rollups')
+    rollups_parser.add_argument('--period', choices=('day', 'week'), default='week')
+    rollups_parser.add_argument('--rebuild', action='store_true', help='backfill the rollups from the jobs table first')
+    export_parser = subparsers.add_parser('export', help='export job history for accounting')
+    export_parser.add_argument('--format', choices=('csv', 'parquet'), default='csv')
+    export_parser.add_argument('--status', action='append', help='statuses to export (default Completed)')
+    export_parser.add_argument('--from', dest='created_from', type=_parse_date, help='first submission date, YYYY-MM-DD')
+    export_parser.add_argument('--to', dest='created_to', type=_parse_date, help='last submission date, YYYY-MM-DD')
+    export_parser.add_argument('-o', '--output', help='output file (default stdout)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if args.command == 'disk-space':
+        result = check_disk_space(args.path)
+        return 1 if result['alert'] else 0
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        if args.command == 'storage':
+            if args.rebuild:
+                StorageService.rebuild()
+            report = StorageService.get_usage(top=args.top)
+            report['forecast'] = StorageService.forecast()
+            print(json.dumps(report, indent=2))
+            return 0
+        if args.command == 'reconcile':
+            from app.maintenance.reconcile import reconcile
+            report = reconcile(repair=args.repair, full=args.full)
+            print(json.dumps(report))
+            issues = report['orphans'] or report['missing'] or report['misplaced'] or report['search_index_missing']
+            return 1 if issues else 0
+        if args.command == 'rollups':
+            from app.services.analytics_service import AnalyticsService
+            if args.rebuild:
+                AnalyticsService.rebuild()
+            print(json.dumps(AnalyticsService.get_report(args.period), indent=2))
+            return 0
+        if args.command == 'export':
+            return _export(args)
+        stats = run_maintenance(
+            batch_size=getattr(args, 'batch_size', BATCH_SIZE),
+            max_batches=getattr(args, 'max_batches', None),
+            dry_run=getattr(args, 'dry_run', False),
+        )
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""Reconcile job files on disk with the job rows in the database.
+
+Each directory under JOBS_ROOT is listed with ``os.scandir`` in a thread pool
+and diffed against one bulk query of ``(id, status, filename)``. The report
+lists orphan files (no job), missing files (job without a file) and misplaced
+files (a job's file in another status folder). ``repair`` moves misplaced
+files to where the database expects them; orphans and missing files are only
+reported. On SQLite it also lists missing search triggers, which ``repair``
+recreates.
+
+Runs are incremental: a directory whose mtime has not changed since the last
+scan is not listed again, and when no directory and no per-status database
+signature changed, the previous report is reused without querying the jobs.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from app.models.job import Job, Status, ARCHIVE_SUFFIX
+from app.services.file_service import FileService
+from app.services.search_service import SearchService
+
+STATE_FILE = 'reconcile_state.json'
+REPORT_FILE = 'reconcile_report.json'
+SCAN_WORKERS = 8
+# Directories that do not hold job files
+IGNORED_DIRS = {'thumbnails', 'maintenance'}
+# A listing is only reused when the directory was last modified at least this
+# long before it was scanned, so a change in the same mtime tick is not missed
+RACY_WINDOW_NS = 2 * 10 ** 9
+
+
+def _list_dir(path: str):
+    """Names of the job files in one directory."""
+    with os.scandir(path) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and not entry.name.startswith('.') and not entry.name.endswith('.tmp')
+        )
+
+
+def _scan(jobs_root: str, cached: dict, full: bool):
+    """List every status directory, reusing cached listings of unchanged ones.
+
+    Returns ``(listings, dirs_state, scanned)`` where ``scanned`` counts the
+    directories actually listed.
+    """
+    dirs = {}
+    with os.scandir(jobs_root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.name not in IGNORED_DIRS \
+                    and not entry.name.startswith('.'):
+                dirs[entry.name] = entry.stat().st_mtime_ns
+
+    now_ns = time.time_ns()
+    listings, to_scan = {}, []
+    for name, mtime_ns in dirs.items():
+        previous = cached.get(name)
+        if (not full and previous and previous['mtime_ns'] == mtime_ns
+                and previous['scanned_at_ns'] - mtime_ns > RACY_WINDOW_NS):
+            listings[name] = previous['files']
+        else:
+            to_scan.append(name)
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        for name, files in zip(to_scan, pool.map(lambda n: _list_dir(os.path.join(jobs_root, n)), to_scan)):
+            listings[name] = files
+
+    dirs_state = {
+        name: {
+            'mtime_ns': mtime_ns,
+            'scanned_at_ns': now_ns if name in to_scan else cached[name]['scanned_at_ns'],
+            'files': listings[name],
+        }
+        for name, mtime_ns in dirs.items()
+    }
+    return listings, dirs_state, len(to_scan)
+
+
+def _db_signature() -> dict:
+    """Cheap per-status summary that changes whenever jobs are added, removed or updated."""
+    # Archiving moves a file without touching the status or updated_at
+    rows = db.session.query(
+        Job.status, func.count(Job.id), func.sum(Job.id), func.max(Job.updated_at), func.count(Job.archived_at)
+    ).group_by(Job.status).all()
+    return {status: [count, int(id_sum or 0), str(latest), archived]
+            for status, count, id_sum, latest, archived in rows}
+
+
+def _diff(listings: dict) -> dict:
+    """Compare the directory listings with all jobs (one query)."""
+    locations = {}
+    for folder, files in listings.items():
+        for name in files:
+            locations.setdefault(name, []).append(folder)
+
+    report = {'orphans': [], 'missing': [], 'misplaced': []}
+    for job_id, status, filename, compressed_size, archived_at in db.session.query(
+            Job.id, Job.status, Job.filename, Job.compressed_size, Job.archived_at).all():
+        name = filename + ARCHIVE_SUFFIX if compressed_size is not None else filename
+        if archived_at is not None:
+            status = Status.ARCHIVED.value
+        folders = locations.pop(name, [])
+        if status in folders:
+            folders.remove(status)
+        elif folders:
+            report['misplaced'].append({'job_id': job_id, 'file': name, 'expected': status, 'found': folders.pop(0)})
+        else:
+            report['missing'].append({'job_id': job_id, 'file': name, 'expected': status})
+        # Extra copies of a job's file are reported as orphans
+        report['orphans'].extend({'file': name, 'folder': folder, 'job_id': job_id} for folder in folders)
+
+    for name, folders in locations.items():
+        report['orphans'].extend({'file': name, 'folder': folder, 'job_id': None} for folder in folders)
+    return report
+
+
+def _load_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def reconcile(repair: bool = False, full: bool = False) -> dict:
+    """Scan JOBS_ROOT, diff it against the jobs table and return the report.
+
+    ``full`` ignores the cached state and lists every directory again.
+    """
+    jobs_root = current_app.config['JOBS_ROOT']
+    folder = current_app.config['MAINTENANCE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    state_path, report_path = os.path.join(folder, STATE_FILE), os.path.join(folder, REPORT_FILE)
+    state = (None if full else _load_json(state_path)) or {'dirs': {}, 'db': None}
+    start = time.perf_counter()
+
+    listings, dirs_state, scanned = _scan(jobs_root, state['dirs'], full)
+    signature = _db_signature()
+    previous = _load_json(report_path)
+    unchanged = (not full and scanned == 0 and previous is not None
+                 and set(dirs_state) == set(state['dirs']) and signature == state['db'])
+
+    if unchanged and not (repair and previous['misplaced']):
+        report = previous
+        report.pop('repaired', None)
+        report['reused'] = True
+    else:
+        report = _diff(listings)
+        report['reused'] = False
+        if repair:
+            report['repaired'] = [
+                item for item in report['misplaced']
+                if FileService.move_file(item['file'], item['found'], item['expected'])
+            ]
+            report['misplaced'] = [item for item in report['misplaced'] if item not in report['repaired']]
+
+    # A table rebuild drops the SQLite search triggers without any error
+    missing = SearchService.check_index(repair=repair)
+    report.pop('search_index_repaired', None)
+    report['search_index_missing'] = [] if repair else missing
+    if repair:
+        report['search_index_repaired'] = missing
+    report.update({
+        'checked_at': datetime.utcnow().isoformat(),
+        'dirs_scanned': scanned,
+        'dirs_total': len(dirs_state),
+        'duration_seconds': round(time.perf_counter() - start, 4),
+    })
+    # Repairs change the mtimes of the folders involved, so they are re-listed next run
+    _write_json(state_path, {'dirs': dirs_state, 'db': signature})
+    _write_json(report_path, report)
+    return report
+
+
+def read_last_report(folder: str):
+    """Return the most recent reconcile report, or None."""
+    return _load_json(os.path.join(folder, REPORT_FILE))
@@ -1,2 +1,7 @@
 # from .user import User # Removed
-from .job import Job 
\ No newline at end of file
+from .job import Job 
+from .storage import StorageUsage, StorageSnapshot
+from .analytics import UsageRollup
+from .job_event import JobEvent
+from .printer import Printer, PrinterStatus
+from .rate_limit import RateLimitBucket
@@ -0,0 +1,31 @@
+from extensions import db
+
+
+class UsageRollup(db.Model):
+    """Throughput counters per day or week, printer and material.
+
+    Incremented in the same transaction as the status change they count (see
+    ``app/services/analytics_service.py``), so reports never scan the jobs
+    table. Jobs without a printer or material are counted under ''.
+    """
+    __tablename__ = 'usage_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('period', 'period_start', 'printer', 'material', name='uq_usage_rollups_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)  # 'day' or 'week'
+    period_start = db.Column(db.Date, nullable=False)
+    printer = db.Column(db.String(50), nullable=False, default='')
+    material = db.Column(db.String(50), nullable=False, default='')
+    submitted = db.Column(db.Integer, nullable=False, default=0)
+    approved = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    printed = db.Column(db.Integer, nullable=False, default=0)
+    # Of printed jobs: weight, cost and submission-to-completion time
+    grams = db.Column(db.Float, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    turnaround_seconds = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UsageRollup {self.period}:{self.period_start} {self.printer}/{self.material}>'
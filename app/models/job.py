@@ -8,6 +8,9 @@ from pathlib import Path
 from sqlalchemy import event
 import json
 
+# Suffix of job files compressed into the archival tier
+ARCHIVE_SUFFIX = '.zst'
+
 class Status(str, Enum):
     """Job status enum."""
     UPLOADED = 'Uploaded'
@@ -17,9 +20,29 @@ class Status(str, Enum):
     COMPLETED = 'Completed'
     REJECTED = 'Rejected'
     FAILED = 'Failed'
+    ARCHIVED = 'Archived'
 
 class Job(db.Model):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Maintenance sweeps select expiring jobs by status and age, skipping
+        # jobs already in the archival tier
+        db.Index('ix_jobs_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_jobs_status_archived_at_updated_at', 'status', 'archived_at', 'updated_at'),
+        # Largest-jobs report
+        db.Index('ix_jobs_file_size', 'file_size'),
+        # Keyset pagination of the jobs listing: one (sort column, id) index
+        # per sort, plus the status filter over the default sort
+        db.Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_jobs_updated_at_id', 'updated_at', 'id'),
+        db.Index('ix_jobs_cost_id', 'cost', 'id'),
+        db.Index('ix_jobs_status_created_at_id', 'status', 'created_at', 'id'),
+        # Per-printer print queues
+        db.Index('ix_jobs_printer_id_queue_position', 'printer_id', 'queue_position'),
+        # Student status page: a student's jobs by email, whatever its case,
+        # and the latest change among them (index-only)
+        db.Index('ix_jobs_student_email_updated_at', db.func.lower(db.text('student_email')), 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(100), nullable=False)
@@ -37,7 +60,20 @@ class Job(db.Model):
     student_confirmed = db.Column(db.Boolean, default=False)
     _reject_reasons = db.Column('reject_reasons', db.Text, default='[]')
     thumbnail_path = db.Column(db.String(255))
+    # Bytes the job's file currently occupies on disk (None until known)
+    file_size = db.Column(db.BigInteger)
+    # Size on disk once compressed into the archival tier, None while uncompressed
+    compressed_size = db.Column(db.BigInteger)
+    # When the job's file moved to the archival tier; the status is kept
+    archived_at = db.Column(db.DateTime)
     confirm_url = db.Column(db.String(512))
+    # Bounding box of the model in millimetres (None until measured)
+    bbox_x_mm = db.Column(db.Float)
+    bbox_y_mm = db.Column(db.Float)
+    bbox_z_mm = db.Column(db.Float)
+    # Machine and place in its queue assigned by the scheduler
+    printer_id = db.Column(db.Integer, db.ForeignKey('printers.id'))
+    queue_position = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, nullable=False)
     updated_at = db.Column(db.DateTime, nullable=False)
     
@@ -56,12 +92,33 @@ class Job(db.Model):
         """Set the list of rejection reasons."""
         self._reject_reasons = json.dumps(value)
     
-    def update_status(self, new_status):
-        """Update the job status and timestamp."""
+    def update_status(self, new_status, actor=None, payload=None):
+        """Update the job status and timestamp.
+
+        The transition is recorded in ``job_events`` when the session flushes,
+        with ``actor`` (who made the change) and an optional JSON ``payload``.
+        """
         if not isinstance(new_status, Status):
             raise ValueError(f"Invalid status: {new_status}")
+        # Load the previous value so the change shows up in the attribute
+        # history (used by the status count cache)
+        old_status = self.status
+        now = datetime.utcnow()
+        self.pending_events.append({
+            'from_status': getattr(old_status, 'value', old_status) or Status.UPLOADED.value,
+            'to_status': new_status.value,
+            'actor': actor,
+            'created_at': now,
+            'elapsed_seconds': int((now - self.updated_at).total_seconds()) if self.updated_at else None,
+            'payload': payload,
+        })
         self.status = new_status.value
-        self.updated_at = datetime.utcnow()
+        self.updated_at = now
+
+    @property
+    def pending_events(self):
+        """Transitions not yet written to ``job_events``."""
+        return self.__dict__.setdefault('_pending_events', [])
     
     def calculate_cost(self):
         """Calculate the total cost of the print job.
@@ -106,10 +163,34 @@ class Job(db.Model):
     def __repr__(self):
         return f'<Job {self.id} {self.original_filename}>'
 
+    @property
+    def extents(self):
+        """Bounding box as ``(x, y, z)`` millimetres, or None until measured."""
+        if self.bbox_x_mm is None:
+            return None
+        return (self.bbox_x_mm, self.bbox_y_mm, self.bbox_z_mm)
+
+    @property
+    def is_archived(self):
+        """Whether the job has been moved to the archival tier."""
+        return self.archived_at is not None
+
+    @property
+    def is_compressed(self):
+        """Whether the job's file lives compressed in the archival tier."""
+        return self.compressed_size is not None
+
+    @property
+    def storage_folder(self):
+        """Folder under JOBS_ROOT holding the job's file."""
+        return Status.ARCHIVED.value if self.is_archived else self.status
+
     def get_file_path(self):
         """Get the current path of the job's file."""
         jobs_root = Path(current_app.config['JOBS_ROOT'])
-        return jobs_root / self.status / self.filename
+        if self.is_compressed:
+            return jobs_root / self.storage_folder / (self.filename + ARCHIVE_SUFFIX)
+        return jobs_root / self.storage_folder / self.filename
 
     def cleanup_files(self):
         """Remove all files associated with this job."""
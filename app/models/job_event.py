@@ -0,0 +1,45 @@
+import json
+from extensions import db
+
+
+class JobEvent(db.Model):
+    """One status transition of a job, appended in the same transaction.
+
+    Rows are never updated or deleted, and outlive the job they describe.
+    """
+    __tablename__ = 'job_events'
+    __table_args__ = (
+        # History of one job, and time-range scans overall or into one status
+        db.Index('ix_job_events_job_id_created_at', 'job_id', 'created_at'),
+        db.Index('ix_job_events_created_at', 'created_at'),
+        db.Index('ix_job_events_to_status_created_at', 'to_status', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    from_status = db.Column(db.String(50))  # None for the job's creation
+    to_status = db.Column(db.String(50), nullable=False)
+    actor = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime, nullable=False)
+    # Seconds the job spent in from_status
+    elapsed_seconds = db.Column(db.Integer)
+    _payload = db.Column('payload', db.Text)
+
+    @property
+    def payload(self):
+        return json.loads(self._payload) if self._payload else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'actor': self.actor,
+            'created_at': self.created_at.isoformat(),
+            'elapsed_seconds': self.elapsed_seconds,
+            'payload': self.payload,
+        }
+
+    def __repr__(self):
+        return f'<JobEvent {self.job_id} {self.from_status}->{self.to_status}>'
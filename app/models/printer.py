@@ -0,0 +1,81 @@
+from enum import Enum
+import json
+from extensions import db
+
+
+class PrinterStatus(str, Enum):
+    """Printer availability, set by staff."""
+    AVAILABLE = 'Available'
+    MAINTENANCE = 'Maintenance'
+    OFFLINE = 'Offline'
+
+
+def fits_build_volume(build, extents) -> bool:
+    """Whether a part of ``(x, y, z)`` extents fits a ``build`` volume.
+
+    Parts may be turned on the plate, so the XY footprint is compared in
+    either orientation; height is kept since parts print as oriented.
+    Unknown extents are assumed to fit.
+    """
+    if not extents or None in extents:
+        return True
+    short, long = sorted(extents[:2])
+    plate_short, plate_long = sorted(build[:2])
+    return short <= plate_short and long <= plate_long and extents[2] <= build[2]
+
+
+class Printer(db.Model):
+    """One physical printer in the lab.
+
+    ``model`` matches the printer students choose on the submission form
+    (``Job.printer``); a lab may own several units of one model.
+    """
+    __tablename__ = 'printers'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+    model = db.Column(db.String(50), nullable=False)
+    # Build volume in millimetres
+    build_x_mm = db.Column(db.Float, nullable=False)
+    build_y_mm = db.Column(db.Float, nullable=False)
+    build_z_mm = db.Column(db.Float, nullable=False)
+    # Materials the printer can run; an empty list accepts any
+    _materials = db.Column('materials', db.Text, default='[]')
+    status = db.Column(db.String(20), nullable=False, default=PrinterStatus.AVAILABLE.value)
+    # What is on the printer now, so the scheduler can avoid changeovers
+    loaded_material = db.Column(db.String(50))
+    loaded_color = db.Column(db.String(50))
+
+    @property
+    def materials(self):
+        """Get the list of supported materials."""
+        return json.loads(self._materials or '[]')
+
+    @materials.setter
+    def materials(self, value):
+        """Set the list of supported materials."""
+        self._materials = json.dumps(value)
+
+    def accepts(self, material) -> bool:
+        """Whether the printer can run ``material``."""
+        materials = self.materials
+        return not materials or material in materials
+
+    def fits(self, extents) -> bool:
+        """Whether a part of ``(x, y, z)`` extents fits the build volume."""
+        return fits_build_volume((self.build_x_mm, self.build_y_mm, self.build_z_mm), extents)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'model': self.model,
+            'build_volume_mm': [self.build_x_mm, self.build_y_mm, self.build_z_mm],
+            'materials': self.materials,
+            'status': self.status,
+            'loaded_material': self.loaded_material,
+            'loaded_color': self.loaded_color,
+        }
+
+    def __repr__(self):
+        return f'<Printer {self.name}>'
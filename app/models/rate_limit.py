@@ -0,0 +1,18 @@
+from extensions import db
+
+
+class RateLimitBucket(db.Model):
+    """A token bucket shared by all workers when ``RATE_LIMIT_BACKEND`` is 'database'.
+
+    ``tokens`` is the balance at ``updated_at`` (Unix seconds); the refill
+    since then is added when the bucket is next used (see
+    ``app/services/rate_limit_service.py``).
+    """
+    __tablename__ = 'rate_limit_buckets'
+
+    key = db.Column(db.String(255), primary_key=True)  # '<scope>:<ip or email>'
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RateLimitBucket {self.key} {self.tokens:.2f}>'
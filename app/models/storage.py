@@ -0,0 +1,37 @@
+from datetime import datetime
+from extensions import db
+
+
+class StorageUsage(db.Model):
+    """Running byte and file totals of job files, per status and per student.
+
+    Maintained in the same transaction as the job rows (see
+    ``app/services/storage_service.py``), so reports never walk JOBS_ROOT.
+    """
+    __tablename__ = 'storage_usage'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_storage_usage_scope_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(20), nullable=False)  # 'status' or 'student'
+    key = db.Column(db.String(120), nullable=False)
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    files = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<StorageUsage {self.scope}:{self.key} {self.bytes}>'
+
+
+class StorageSnapshot(db.Model):
+    """Daily disk usage sample used for capacity forecasting."""
+    __tablename__ = 'storage_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    disk_total = db.Column(db.BigInteger, nullable=False)
+    disk_used = db.Column(db.BigInteger, nullable=False)
+    jobs_bytes = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<StorageSnapshot {self.taken_at} {self.disk_used}/{self.disk_total}>'
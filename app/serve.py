@@ -0,0 +1,291 @@
+"""Serve the app with waitress in one or more recycled worker processes.
+
+The supervisor binds the port once and starts ``SERVER_WORKERS`` processes
+that accept on the shared socket. Each worker imports the app itself and runs
+waitress with ``WAITRESS_THREADS`` threads, so thumbnail rendering in one
+process does not hold the GIL of another. After ``SERVER_MAX_REQUESTS``
+requests (plus a random jitter) a worker drains and exits, and the supervisor
+starts a fresh one. That bounds the memory pyrender and trimesh leave behind.
+
+A draining worker stops accepting connections and answers ``/readyz`` with
+503. It finishes the requests it already has, each with ``Connection: close``,
+and closes keep-alive connections that stay idle. It waits up to
+``SERVER_GRACEFUL_TIMEOUT`` seconds for all of this.
+
+Signals to the supervisor:
+
+- ``SIGHUP``: graceful reload. Start new workers with freshly imported code,
+  then drain the old ones.
+- ``SIGTERM``: drain every worker, then exit.
+- ``SIGINT``: stop at once.
+
+On Windows, which cannot hand a listening socket to a child this way, the
+app is served in this process without recycling.
+
+Usage::
+
+    python -m app.serve [--config config.ProductionConfig] [--workers N] [--threads N]
+                        [--max-requests N] [--graceful-timeout SECONDS]
+"""
+import argparse
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from waitress import create_server, wasyncore
+from waitress.channel import HTTPChannel
+from waitress.task import WSGITask
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits sooner than this after starting is failing to boot
+MIN_WORKER_LIFETIME = 1.0
+# A draining worker closes keep-alive connections that have been quiet this long
+IDLE_CONNECTION_SECONDS = 2.0
+
+
+def load_config(name):
+    """The config class at dotted path ``name``, e.g. ``config.ProductionConfig``."""
+    module, _, attr = name.rpartition('.')
+    return getattr(importlib.import_module(module), attr)
+
+
+def load_app(config_name):
+    from app import create_app
+    return create_app(load_config(config_name))
+
+
+class WorkerLifecycle:
+    """WSGI middleware that asks the worker to drain after ``max_requests``."""
+
+    def __init__(self, app, max_requests, draining):
+        self.app = app
+        self.max_requests = max_requests
+        self.draining = draining
+        self.handled = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self.max_requests:
+            with self.lock:
+                self.handled += 1
+                if self.handled >= self.max_requests:
+                    self.draining.set()
+        return self.app(environ, start_response)
+
+
+class DrainingTask(WSGITask):
+    """Close the connection after the response once the worker is draining, so
+    keep-alive clients reconnect to a worker that is still accepting."""
+
+    def build_response_header(self):
+        self.channel.served = True
+        if self.channel.server.draining.is_set():
+            self.set_close_on_finish()
+        return super().build_response_header()
+
+
+class DrainingChannel(HTTPChannel):
+    task_class = DrainingTask
+    served = False
+
+
+def run_worker(sock, settings, config_name):
+    """Serve the app on the shared listening socket until drained."""
+    app = load_app(config_name)
+    draining = app.extensions['draining'] = threading.Event()
+    max_requests = settings['max_requests']
+    if max_requests:
+        max_requests += random.randint(0, settings['max_requests_jitter'])
+    server = create_server(WorkerLifecycle(app, max_requests, draining), sockets=[sock],
+                           threads=settings['threads'], connection_limit=settings['connection_limit'],
+                           channel_timeout=settings['channel_timeout'])
+    server.draining = draining
+    server.channel_class = DrainingChannel
+
+    def close_idle_connections():
+        # Runs in the event loop thread; other workers keep accepting on the socket.
+        # A connection in use closes after its next response instead, so no
+        # client has its request cut off by the close.
+        server.accepting = False
+        idle_since = time.time() - IDLE_CONNECTION_SECONDS
+        for channel in list(server.active_channels.values()):
+            if (channel.served and not channel.requests and channel.request is None
+                    and channel.last_activity < idle_since):
+                channel.will_close = True
+
+    def drain():
+        draining.wait()
+        deadline = time.monotonic() + settings['graceful_timeout']
+        while True:
+            server.trigger.pull_trigger(close_idle_connections)
+            if not server.active_channels or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        if server.active_channels:
+            logger.warning('Worker %s stopping with %d connections still open', os.getpid(),
+                           len(server.active_channels))
+        # An empty socket map ends the event loop
+        server.trigger.pull_trigger(lambda: wasyncore.close_all(server._map))
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: draining.set())
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    threading.Thread(target=drain, name='drain', daemon=True).start()
+    logger.info('Worker %s serving (recycles after %s requests)', os.getpid(), max_requests or 'no')
+    server.run()
+    server.task_dispatcher.shutdown()
+
+
+class Supervisor:
+    """Keep ``workers`` processes serving the socket, replacing any that exit.
+
+    Workers are started as fresh interpreters that inherit the listening
+    socket, so a reload picks up new code and no state is shared by fork.
+    """
+
+    def __init__(self, sock, settings, argv):
+        self.sock = sock
+        self.settings = settings
+        self.argv = argv
+        self.workers = {}  # Popen -> (generation, started at)
+        self.generation = 0
+        self.stop_signal = None
+        self.reload_requested = False
+        self.retry_after = 0.0
+
+    def spawn(self):
+        command = [sys.executable, '-m', 'app.serve', *self.argv, '--worker-fd', str(self.sock.fileno())]
+        worker = subprocess.Popen(command, pass_fds=(self.sock.fileno(),))
+        self.workers[worker] = (self.generation, time.monotonic())
+
+    def reap(self):
+        for worker, (generation, started) in list(self.workers.items()):
+            code = worker.poll()
+            if code is None:
+                continue
+            del self.workers[worker]
+            if code != 0 and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                logger.error('Worker %s failed to start (exit %s)', worker.pid, code)
+                self.retry_after = time.monotonic() + MIN_WORKER_LIFETIME
+            elif generation == self.generation and not self.stop_signal:
+                logger.info('Worker %s exited (%s), replacing it', worker.pid, code)
+
+    def current_workers(self):
+        return [worker for worker, (generation, _) in self.workers.items() if generation == self.generation]
+
+    def signal_workers(self, workers, signum):
+        for worker in workers:
+            try:
+                worker.send_signal(signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        def request_stop(signum, frame):
+            self.stop_signal = signum
+
+        def request_reload(signum, frame):
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_reload)
+
+        while not self.stop_signal:
+            self.reap()
+            if self.reload_requested:
+                self.reload_requested = False
+                old = list(self.workers)
+                self.generation += 1
+                logger.info('Reloading: starting %d new workers, draining %d', self.settings['workers'], len(old))
+                for _ in range(self.settings['workers']):
+                    self.spawn()
+                self.signal_workers(old, signal.SIGTERM)
+            missing = self.settings['workers'] - len(self.current_workers())
+            if missing > 0 and time.monotonic() >= self.retry_after:
+                for _ in range(missing):
+                    self.spawn()
+            time.sleep(0.1)
+
+        graceful = self.stop_signal == signal.SIGTERM
+        logger.info('Stopping %d workers%s', len(self.workers), ' gracefully' if graceful else '')
+        self.signal_workers(list(self.workers), signal.SIGTERM if graceful else signal.SIGINT)
+        deadline = time.monotonic() + (self.settings['graceful_timeout'] if graceful else 0) + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        self.signal_workers(list(self.workers), signal.SIGKILL)
+        for worker in self.workers:
+            worker.wait()
+
+
+def bind(host, port):
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the 3D print system with waitress')
+    parser.add_argument('--config', default='config.Config', help='dotted path of the config class')
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--workers', type=int, help='worker processes')
+    parser.add_argument('--threads', type=int, help='waitress threads per worker')
+    parser.add_argument('--connection-limit', type=int, help='open connections per worker')
+    parser.add_argument('--channel-timeout', type=int, help='seconds before an idle connection is closed')
+    parser.add_argument('--max-requests', type=int, help='requests before a worker is recycled (0 = never)')
+    parser.add_argument('--max-requests-jitter', type=int)
+    parser.add_argument('--graceful-timeout', type=int, help='seconds a draining worker may take')
+    parser.add_argument('--worker-fd', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s %(process)d %(name)s: %(message)s')
+
+    config = load_config(args.config)
+    settings = {
+        'host': args.host or config.SERVER_HOST,
+        'port': config.SERVER_PORT if args.port is None else args.port,
+        'workers': args.workers or config.SERVER_WORKERS,
+        'threads': args.threads or config.WAITRESS_THREADS,
+        'connection_limit': args.connection_limit or config.WAITRESS_CONNECTION_LIMIT,
+        'channel_timeout': args.channel_timeout or config.WAITRESS_CHANNEL_TIMEOUT,
+        'max_requests': config.SERVER_MAX_REQUESTS if args.max_requests is None else args.max_requests,
+        'max_requests_jitter': (config.SERVER_MAX_REQUESTS_JITTER if args.max_requests_jitter is None
+                                else args.max_requests_jitter),
+        'graceful_timeout': (config.SERVER_GRACEFUL_TIMEOUT if args.graceful_timeout is None
+                             else args.graceful_timeout),
+    }
+
+    if args.worker_fd is not None:
+        try:
+            run_worker(socket.socket(fileno=args.worker_fd), settings, args.config)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if os.name != 'posix':
+        from waitress import serve
+        serve(load_app(args.config), host=settings['host'], port=settings['port'], threads=settings['threads'],
+              connection_limit=settings['connection_limit'], channel_timeout=settings['channel_timeout'])
+        return 0
+
+    sock = bind(settings['host'], settings['port'])
+    host, port = sock.getsockname()[:2]
+    logger.info('Listening on %s:%s with %d workers of %d threads', host, port, settings['workers'],
+                settings['threads'])
+    Supervisor(sock, settings, sys.argv[1:] if argv is None else argv).run()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, func, inspect, insert
+from sqlalchemy.orm import Session
+from extensions import db
+from app.models.job import Job, Status
+from app.models.analytics import UsageRollup
+from app.models.job_event import JobEvent
+from app.services.counter_service import increment_counters
+
+PERIODS = ('day', 'week')
+COUNTERS = ('submitted', 'approved', 'rejected', 'printed', 'grams', 'revenue', 'turnaround_seconds')
+# Entering these statuses is what the rollups count
+STATUS_COUNTERS = {
+    Status.PENDING.value: 'approved',
+    Status.REJECTED.value: 'rejected',
+    Status.COMPLETED.value: 'printed',
+}
+# Statuses only reachable after approval, for backfilling jobs that moved on
+_APPROVED_STATUSES = {Status.PENDING.value, Status.CONFIRMED.value, Status.PRINTING.value, Status.COMPLETED.value}
+_DELTAS_KEY = 'usage_rollup_deltas'
+
+
+def period_start(period: str, day: date) -> date:
+    """First day of the ``period`` containing ``day`` (weeks start on Monday)."""
+    return day - timedelta(days=day.weekday()) if period == 'week' else day
+
+
+def _add(deltas, job, at: datetime, counters: dict):
+    for period in PERIODS:
+        deltas[(period, period_start(period, at.date()), job.printer or '', job.material or '')].update(counters)
+
+
+def _enter_status(deltas, job, status: str, at: datetime):
+    counter = STATUS_COUNTERS.get(status)
+    if counter is None:
+        return
+    counters = {counter: 1}
+    if counter == 'printed':
+        counters.update(grams=job.weight_g or 0, revenue=job.cost or 0,
+                        turnaround_seconds=int((at - job.created_at).total_seconds()))
+    _add(deltas, job, at, counters)
+
+
+def _with_transitions(jobs, events):
+    """Pair each job with its ``(to_status, created_at)`` events; both are sorted by job id."""
+    events = iter(events)
+    event = next(events, None)
+    for job in jobs:
+        while event is not None and event.job_id < job.id:
+            event = next(events, None)
+        transitions = []
+        while event is not None and event.job_id == job.id:
+            transitions.append((event.to_status, event.created_at))
+            event = next(events, None)
+        yield job, transitions
+
+
+class AnalyticsService:
+    """Throughput reports answered from the ``usage_rollups`` table only."""
+
+    @staticmethod
+    def get_report(period: str = 'week', start: date = None, end: date = None) -> dict:
+        """Totals per period between ``start`` and ``end`` (inclusive), plus
+        breakdowns per material and printer.
+
+        Defaults to the last 12 weeks, or the last 30 days for daily reports.
+        Periods without activity are included with zeros.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Invalid period: {period}")
+        end = end or datetime.utcnow().date()
+        start = start or end - timedelta(days=30 if period == 'day' else 7 * 11)
+        first, last = period_start(period, start), period_start(period, end)
+        sums = [func.sum(getattr(UsageRollup, counter)) for counter in COUNTERS]
+        base = (db.session.query(UsageRollup)
+                .filter(UsageRollup.period == period, UsageRollup.period_start.between(first, last)))
+
+        totals = {}
+        for row in base.with_entities(UsageRollup.period_start, *sums).group_by(UsageRollup.period_start):
+            totals[row[0]] = dict(zip(COUNTERS, row[1:]))
+        step = timedelta(days=7 if period == 'week' else 1)
+        series, day = [], first
+        while day <= last:
+            series.append(AnalyticsService._entry(totals.get(day), period_start=day.isoformat()))
+            day += step
+
+        breakdowns = {}
+        for name, column in (('by_material', UsageRollup.material), ('by_printer', UsageRollup.printer)):
+            rows = base.with_entities(column, *sums).group_by(column).order_by(column)
+            breakdowns[name] = [AnalyticsService._entry(dict(zip(COUNTERS, row[1:])), key=row[0] or None)
+                                for row in rows]
+
+        grand_total = Counter()
+        for period_sums in totals.values():
+            grand_total.update({counter: value or 0 for counter, value in period_sums.items()})
+        return dict(period=period, start=first.isoformat(), end=last.isoformat(), series=series,
+                    totals=AnalyticsService._entry(grand_total), **breakdowns)
+
+    @staticmethod
+    def _entry(sums, **labels) -> dict:
+        entry = dict(labels)
+        sums = sums or {}
+        for counter in COUNTERS:
+            value = sums.get(counter) or 0
+            entry[counter] = round(value, 2) if counter in ('grams', 'revenue') else int(value)
+        turnaround = entry.pop('turnaround_seconds')
+        entry['avg_turnaround_hours'] = round(turnaround / entry['printed'] / 3600, 1) if entry['printed'] else None
+        return entry
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute every rollup from the jobs table and ``job_events``; return the number of jobs read.
+
+        A job is counted as submitted at ``created_at``, and every approval,
+        rejection and completion in its event log at the time it happened,
+        the same as the incremental counts. Jobs older than the event log only
+        have their latest status, which is dated by ``updated_at``.
+        """
+        deltas = defaultdict(Counter)
+        count = 0
+        jobs = Job.query.order_by(Job.id).yield_per(1000)
+        events = (db.session.query(JobEvent.job_id, JobEvent.to_status, JobEvent.created_at)
+                  .order_by(JobEvent.job_id, JobEvent.id).yield_per(1000))
+        for job, transitions in _with_transitions(jobs, events):
+            count += 1
+            _add(deltas, job, job.created_at, {'submitted': 1})
+            if transitions:
+                for status, at in transitions:
+                    _enter_status(deltas, job, status, at)
+                continue
+            if job.status in _APPROVED_STATUSES and job.status != Status.PENDING.value:
+                _enter_status(deltas, job, Status.PENDING.value, job.updated_at)
+            _enter_status(deltas, job, job.status, job.updated_at)
+        db.session.query(UsageRollup).delete()
+        if deltas:
+            db.session.execute(insert(UsageRollup.__table__), [
+                dict({counter: counters.get(counter, 0) for counter in COUNTERS},
+                     period=period, period_start=start, printer=printer, material=material)
+                for (period, start, printer, material), counters in deltas.items()
+            ])
+        db.session.commit()
+        return count
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_rollup_deltas(session, flush_context, instances):
+    deltas = session.info.setdefault(_DELTAS_KEY, defaultdict(Counter))
+    for obj in session.new:
+        if isinstance(obj, Job):
+            _add(deltas, obj, obj.created_at, {'submitted': 1})
+            _enter_status(deltas, obj, getattr(obj.status, 'value', obj.status), obj.updated_at)
+    for obj in session.dirty:
+        if isinstance(obj, Job) and obj not in session.deleted:
+            history = inspect(obj).attrs.status.history
+            if history.added and history.deleted and history.added[0] != history.deleted[0]:
+                status = getattr(history.added[0], 'value', history.added[0])
+                _enter_status(deltas, obj, status, obj.updated_at or datetime.utcnow())
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_rollup_deltas(session, flush_context):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    connection = session.connection()
+    for (period, start, printer, material), counters in deltas.items():
+        increment_counters(connection, UsageRollup.__table__,
+                           {'period': period, 'period_start': start, 'printer': printer, 'material': material},
+                           {counter: counters.get(counter, 0) for counter in COUNTERS})
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rollup_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
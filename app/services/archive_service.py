@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from flask import current_app
+import zstandard
+from extensions import db
+from app.models.job import Status, ARCHIVE_SUFFIX
+
+# Largest possible zstd frame header (ZSTD_FRAMEHEADERSIZE_MAX)
+FRAME_HEADER_MAX_SIZE = 18
+
+
+class IOThrottle:
+    """Limit the combined read rate of all archiver threads.
+
+    Each caller reserves a slot in a shared schedule and sleeps until it is
+    due, so the archiver never saturates the disk the web workers serve from.
+    """
+
+    def __init__(self, bytes_per_second: float):
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def consume(self, nbytes: int):
+        if not self.bytes_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_time, now)
+            self._next_time = start + nbytes / self.bytes_per_second
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ArchiveService:
+    """Compressed archival tier for old job files."""
+
+    CHUNK_SIZE = 256 * 1024
+
+    @staticmethod
+    def archive_path(filename: str) -> Path:
+        """Location of a job's compressed file in the Archived folder."""
+        return Path(current_app.config['JOBS_ROOT']) / Status.ARCHIVED.value / (filename + ARCHIVE_SUFFIX)
+
+    @staticmethod
+    def compress_file(src: Path, dst: Path, level: int, throttle: IOThrottle = None) -> int:
+        """Stream ``src`` into a zstd frame at ``dst`` and return the compressed size.
+
+        The original size is written into the frame header so downloads can
+        send a Content-Length. ``dst`` only appears once it is complete.
+        """
+        tmp_path = dst.with_name(dst.name + '.tmp')
+        compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+        try:
+            with open(src, 'rb') as fin, open(tmp_path, 'wb') as fout:
+                with compressor.stream_writer(fout, size=os.fstat(fin.fileno()).st_size, closefd=False) as writer:
+                    while True:
+                        chunk = fin.read(ArchiveService.CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        if throttle:
+                            throttle.consume(len(chunk))
+                        writer.write(chunk)
+                fout.flush()
+                os.fsync(fout.fileno())
+            os.replace(tmp_path, dst)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+        return dst.stat().st_size
+
+    @staticmethod
+    def archive_jobs(jobs) -> dict:
+        """Compress the files of ``jobs`` into the Archived folder.
+
+        Compression runs in a thread pool sharing one I/O throttle; the jobs
+        themselves are only updated on the calling thread. Archiving sets
+        ``archived_at`` and keeps the job's status, so reports still see
+        whether it was completed or rejected. Originals are removed only after
+        the new state is committed, so a crash never leaves a job without a
+        readable file. Jobs whose file is missing are archived without a
+        compressed copy. Returns ``(outcome, compressed_size)`` per
+        job id, the outcome being 'archived', 'no_file' or 'failed'.
+        """
+        config = current_app.config
+        throttle = IOThrottle(config['ARCHIVE_IO_BYTES_PER_SECOND'])
+        level = config['ARCHIVE_ZSTD_LEVEL']
+        tasks = {}
+        for job in jobs:
+            src = job.get_file_path()
+            if src.exists():
+                tasks[job.id] = (src, ArchiveService.archive_path(job.filename))
+        os.makedirs(Path(config['JOBS_ROOT']) / Status.ARCHIVED.value, exist_ok=True)
+
+        def compress(item):
+            job_id, (src, dst) = item
+            try:
+                return job_id, ArchiveService.compress_file(src, dst, level, throttle)
+            except Exception as e:
+                return job_id, e
+
+        with ThreadPoolExecutor(max_workers=config['ARCHIVE_WORKERS']) as pool:
+            results = dict(pool.map(compress, tasks.items()))
+
+        outcomes = {}
+        archived_at = datetime.utcnow()
+        for job in jobs:
+            result = results.get(job.id)
+            if isinstance(result, Exception):
+                current_app.logger.error(f"Error archiving file for job {job.id}: {result}")
+                outcomes[job.id] = ('failed', None)
+                continue
+            if result is not None:
+                job.compressed_size = result
+                job.file_size = result
+            job.archived_at = archived_at
+            outcomes[job.id] = ('archived', result) if result is not None else ('no_file', None)
+        db.session.commit()
+
+        for job_id, result in results.items():
+            if not isinstance(result, Exception):
+                tasks[job_id][0].unlink()
+        return outcomes
+
+    @staticmethod
+    def content_size(file_path: Path):
+        """Original size recorded in the frame header, or None if unknown."""
+        with open(file_path, 'rb') as f:
+            size = zstandard.frame_content_size(f.read(FRAME_HEADER_MAX_SIZE))
+        return size if size >= 0 else None
+
+    @staticmethod
+    def iter_decompressed(file_path: Path):
+        """Yield the original file contents, decompressing as they are read."""
+        decompressor = zstandard.ZstdDecompressor()
+        with open(file_path, 'rb') as f:
+            yield from decompressor.read_to_iter(f, read_size=ArchiveService.CHUNK_SIZE,
+                                                 write_size=ArchiveService.CHUNK_SIZE)
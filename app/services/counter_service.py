@@ -0,0 +1,37 @@
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def increment_counters(connection, table, key: dict, deltas: dict):
+    """Add ``deltas`` to the counter columns of the ``table`` row matching ``key``,
+    creating the row if there is none.
+
+    ``key`` must name the columns of a unique constraint. On SQLite and
+    PostgreSQL this is a single INSERT ... ON CONFLICT DO UPDATE, so two
+    transactions creating the same row at once both count. Elsewhere a missing
+    row is inserted in a savepoint, and if another transaction created it first
+    the UPDATE is retried.
+    """
+    dialect_insert = _UPSERT_INSERTS.get(connection.dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**key, **deltas)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: table.c[column] + statement.excluded[column] for column in deltas},
+        ))
+        return
+
+    increment = (update(table)
+                 .where(*(table.c[column] == value for column, value in key.items()))
+                 .values({column: table.c[column] + value for column, value in deltas.items()}))
+    if connection.execute(increment).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(table).values(**key, **deltas))
+    except IntegrityError:
+        connection.execute(increment)
@@ -0,0 +1,246 @@
+import re
+import secrets
+import unicodedata
+from datetime import datetime, timezone
+from urllib.parse import quote
+from flask import abort, current_app, request, make_response, Response
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import wrap_file
+from app.services.file_service import FileService
+from app.services.archive_service import ArchiveService
+
+# Servers whose wsgi.file_wrapper stops at Content-Length, so a range can be
+# sent straight from a seeked file (gunicorn uses os.sendfile for it)
+RANGE_FILE_WRAPPER_SERVERS = ('waitress', 'gunicorn')
+# Range bounds are ASCII digits only (RFC 9110)
+_DIGITS = re.compile(r'[0-9]+')
+
+
+class DownloadService:
+    """Delivers job files to staff with HTTP validators for conditional GETs."""
+
+    CHUNK_SIZE = 64 * 1024
+    # More ranges than this are answered with the full file, as RFC 9110 allows
+    MAX_RANGES = 16
+
+    @staticmethod
+    def get_etag(job, file_path) -> str:
+        """Build a strong ETag for a job file.
+
+        Built from the job id, size and modification time instead of the path,
+        so the tag survives the file being moved between status folders.
+        """
+        stat = file_path.stat()
+        return f'{job.id}-{stat.st_size}-{stat.st_mtime_ns}'
+
+    @staticmethod
+    def use_x_accel() -> bool:
+        """Decide whether nginx should deliver the file body.
+
+        ``DOWNLOAD_DELIVERY`` is ``send_file``, ``x-accel`` or ``auto``. In auto
+        mode the proxy announces itself with ``X-Sendfile-Type: X-Accel-Redirect``
+        so the app keeps streaming files itself when running without nginx.
+        """
+        mode = current_app.config.get('DOWNLOAD_DELIVERY', 'auto')
+        if mode == 'x-accel':
+            return True
+        if mode == 'auto':
+            return request.headers.get('X-Sendfile-Type', '').lower() == 'x-accel-redirect'
+        return False
+
+    @staticmethod
+    def _set_content_disposition(response, filename: str, as_attachment: bool):
+        # Same filename encoding as send_file: ASCII fallback plus RFC 5987 form
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple}
+        if simple != filename:
+            names['filename*'] = "UTF-8''" + quote(filename, safe="!#$&+-.^_`|~")
+        response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline', **names)
+
+    @staticmethod
+    def x_accel_response(job, as_attachment: bool = True):
+        """Hand the transfer to nginx via its internal location.
+
+        The staff check has already run in Flask; nginx handles the body,
+        conditional requests and ranges without holding a waitress thread.
+        """
+        prefix = current_app.config['X_ACCEL_REDIRECT_PREFIX'].rstrip('/')
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = f'{prefix}/{quote(job.status)}/{quote(job.filename)}'
+        response.headers['Content-Type'] = FileService.get_mime_type(job.original_filename)
+        DownloadService._set_content_disposition(response, job.original_filename, as_attachment)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    @staticmethod
+    def parse_ranges(header: str, length: int):
+        """Parse a ``Range: bytes=...`` header into sorted, merged (start, stop) spans.
+
+        Returns None when the header should be ignored (other units, bad syntax
+        or too many ranges) and an empty list when no range is satisfiable.
+        """
+        units, _, spec = header.partition('=')
+        if units.strip().lower() != 'bytes':
+            return None
+        spans = []
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, sep, last = part.partition('-')
+            first, last = first.strip(), last.strip()
+            # str.isdigit() also accepts digits such as '²' that int() rejects
+            if not sep or (first and not _DIGITS.fullmatch(first)) or (last and not _DIGITS.fullmatch(last)):
+                return None
+            if not first:
+                if not last:
+                    return None
+                # Suffix range: the last N bytes
+                start, stop = max(length - int(last), 0), length
+            else:
+                start = int(first)
+                if last and int(last) < start:
+                    return None
+                stop = min(int(last) + 1, length) if last else length
+            if start < stop:
+                spans.append((start, stop))
+        if len(spans) > DownloadService.MAX_RANGES:
+            return None
+
+        merged = []
+        for start, stop in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged
+
+    @staticmethod
+    def _if_range_matches(etag: str, last_modified: datetime) -> bool:
+        """Check If-Range; a stale validator means the full file must be sent."""
+        value = request.headers.get('If-Range')
+        if not value:
+            return True
+        if_range = request.if_range
+        if if_range.etag is not None:
+            # Weak tags never match in If-Range
+            return not value.strip().startswith('W/') and if_range.etag == etag
+        if if_range.date is not None:
+            return if_range.date == last_modified
+        return False
+
+    @staticmethod
+    def _read_span(file_path, start: int, stop: int):
+        """Yield bytes [start, stop) of a file in chunks."""
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                chunk = f.read(min(DownloadService.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    @staticmethod
+    def _span_body(file_path, start: int, stop: int, length: int):
+        """Body for a full file or a single range, zero-copy where the server allows it."""
+        environ = request.environ
+        server = environ.get('SERVER_SOFTWARE', '').lower()
+        if (start, stop) == (0, length):
+            return wrap_file(environ, open(file_path, 'rb'), DownloadService.CHUNK_SIZE)
+        if 'wsgi.file_wrapper' in environ and server.startswith(RANGE_FILE_WRAPPER_SERVERS):
+            f = open(file_path, 'rb')
+            f.seek(start)
+            return environ['wsgi.file_wrapper'](f, DownloadService.CHUNK_SIZE)
+        return DownloadService._read_span(file_path, start, stop)
+
+    @staticmethod
+    def _multipart_body(file_path, spans, length: int, mimetype: str):
+        """Build a multipart/byteranges body and its exact length."""
+        boundary = secrets.token_hex(16)
+        headers = [
+            (f'\r\n--{boundary}\r\nContent-Type: {mimetype}\r\n'
+             f'Content-Range: bytes {start}-{stop - 1}/{length}\r\n\r\n').encode('ascii')
+            for start, stop in spans
+        ]
+        closing = f'\r\n--{boundary}--\r\n'.encode('ascii')
+        content_length = sum(len(h) for h in headers) + sum(stop - start for start, stop in spans) + len(closing)
+
+        def generate():
+            for header, (start, stop) in zip(headers, spans):
+                yield header
+                yield from DownloadService._read_span(file_path, start, stop)
+            yield closing
+
+        return boundary, generate(), content_length
+
+    @staticmethod
+    def send_job_file(job, as_attachment: bool = True):
+        """Send the job's current file.
+
+        Answers If-None-Match/If-Modified-Since with 304 and supports single
+        and multiple byte ranges (206) validated with If-Range. Files in the
+        compressed archival tier are decompressed while streaming, without
+        range support.
+        """
+        file_path = job.get_file_path()
+        if not file_path.exists():
+            abort(404)
+
+        # nginx cannot decompress archived files, so those always go through Python
+        if DownloadService.use_x_accel() and not job.is_compressed:
+            return DownloadService.x_accel_response(job, as_attachment)
+
+        stat = file_path.stat()
+        length = stat.st_size
+        etag = DownloadService.get_etag(job, file_path)
+        last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        mimetype = FileService.get_mime_type(job.original_filename)
+
+        response = Response(mimetype=mimetype, direct_passthrough=True)
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.accept_ranges = 'bytes'
+        DownloadService._set_content_disposition(response, job.original_filename, as_attachment)
+        # Staff-only content: never shared caches, always revalidate
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response.status_code = 304
+            return response
+
+        if job.is_compressed:
+            response.accept_ranges = 'none'
+            response.response = ArchiveService.iter_decompressed(file_path)
+            response.content_length = ArchiveService.content_size(file_path)
+            return response
+
+        spans = None
+        range_header = request.headers.get('Range')
+        if range_header and DownloadService._if_range_matches(etag, last_modified):
+            spans = DownloadService.parse_ranges(range_header, length)
+
+        if spans == []:
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{length}'
+            response.content_length = 0
+            return response
+
+        if spans and len(spans) > 1:
+            boundary, body, content_length = DownloadService._multipart_body(file_path, spans, length, mimetype)
+            response.status_code = 206
+            response.headers['Content-Type'] = f'multipart/byteranges; boundary={boundary}'
+            response.response = body
+            response.content_length = content_length
+            return response
+
+        start, stop = spans[0] if spans else (0, length)
+        if spans:
+            response.status_code = 206
+            response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{length}'
+        response.response = DownloadService._span_body(file_path, start, stop, length)
+        response.content_length = stop - start
+        return response
@@ -3,6 +3,7 @@ from flask_mail import Mail, Message
 from threading import Thread
 from app import mail
 from typing import List
+from app.services.metrics_service import EMAIL_SEND_SECONDS, EMAIL_FAILURES
 
 class EmailService:
     """Service for handling all email notifications in the system."""
@@ -25,14 +26,17 @@ class EmailService:
                 html=html,
                 sender=current_app.config['MAIL_DEFAULT_SENDER']
             )
-            mail.send(msg)
+            with EMAIL_SEND_SECONDS.time():
+                mail.send(msg)
             return True
         except Exception as e:
+            EMAIL_FAILURES.inc()
             current_app.logger.error(f"Error sending email to {recipient}: {str(e)}")
             return False
     
     @staticmethod
-    def send_job_approval_email(student_email: str, filename: str, cost: float, hours: int, minutes: int, material: str, confirm_url: str):
+    def send_job_approval_email(student_email: str, filename: str, cost: float, hours: int, minutes: int, material: str, confirm_url: str,
+                                estimated_completion: str = None):
         """Send an approval email for a job.
         
         Args:
@@ -43,8 +47,12 @@ class EmailService:
             minutes: Print time minutes
             material: Material type
             confirm_url: Confirmation URL
+            estimated_completion: Optional description of when the print should be ready
         """
         subject = '3D Print Job Approved - Action Required'
+        estimate_text = f'\nEstimated Ready: {estimated_completion} if confirmed now' if estimated_completion else ''
+        estimate_html = (f'<li><strong>Estimated Ready:</strong> {estimated_completion} if confirmed now</li>'
+                         if estimated_completion else '')
         
         # Plain text version
         body = f'''Your 3D print job has been approved and is ready for confirmation!
@@ -52,7 +60,7 @@ class EmailService:
 File: {filename}
 Estimated Cost: ${cost:.2f}
 Print Time: {hours}h {minutes}m
-Material: {material}
+Material: {material}{estimate_text}
 
 Please confirm your print job by clicking the following link:
 {confirm_url}
@@ -72,6 +80,7 @@ Best regards,
             <li><strong>Estimated Cost:</strong> ${cost:.2f}</li>
             <li><strong>Print Time:</strong> {hours}h {minutes}m</li>
             <li><strong>Material:</strong> {material}</li>
+            {estimate_html}
         </ul>
         
         <p>Please confirm your print job by clicking the button below:</p>
@@ -168,6 +177,35 @@ Thank you for using our 3D printing service!"""
         
         return EmailService.send_email(subject, recipient, body, html)
 
+    @staticmethod
+    def send_status_link_email(student_email: str, status_url: str):
+        """Send a student the link to the status page of their jobs."""
+        subject = "Your 3D Print Job Status Link"
+
+        body = f"""You asked for the status of your 3D print jobs.
+
+Open this link to see every job submitted with this email address, its current status and when it should be ready:
+{status_url}
+
+The link works for 30 days. Please do not share it; anyone with it can see your jobs.
+
+Best regards,
+3D Print Lab Team"""
+
+        html = f"""
+        <h2>Your 3D Print Jobs</h2>
+
+        <p>You asked for the status of your 3D print jobs.</p>
+
+        <p><a href="{status_url}">See every job submitted with this email address</a>, its current status and when it should be ready.</p>
+
+        <p><em>The link works for 30 days. Please do not share it; anyone with it can see your jobs.</em></p>
+
+        <p>Best regards,<br>3D Print Lab Team</p>
+        """
+
+        return EmailService.send_email(subject, student_email, body, html)
+
 def send_async_email(app, msg):
     with app.app_context():
         mail.send(msg)
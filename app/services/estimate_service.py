@@ -0,0 +1,146 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from app.models.job import Job, Status
+from app.services.event_service import JobEventService, job_events_committed
+
+# Jobs holding a place in a printer's queue
+QUEUE_STATUSES = (Status.CONFIRMED.value, Status.PRINTING.value)
+
+
+class TurnaroundEstimator:
+    """Predicts when a job will be printed from the live queue and past waits.
+
+    Keeps two aggregates in memory: minutes of queued print time per printer,
+    and the count and total time jobs spent in each status over the last
+    ``history_days``. Committed job events update the wait times directly and
+    mark the queue stale when a job enters or leaves it; both are reloaded
+    from the database every ``reconcile_seconds`` to pick up other workers'
+    changes. An estimate therefore never scans job history.
+    """
+
+    def __init__(self, history_days: int = 90, reconcile_seconds: float = 300):
+        self.history_days = history_days
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._queue_minutes = None
+        self._durations = {}
+        self._loaded_at = None
+
+    def reconcile(self):
+        """Reload both aggregates from the database."""
+        since = datetime.utcnow() - timedelta(days=self.history_days)
+        stats = JobEventService.time_in_status(start=since)
+        with self._lock:
+            self._durations = {status: [entry['count'], entry['avg_seconds'] * entry['count']]
+                               for status, entry in stats.items()}
+            self._loaded_at = time.monotonic()
+        self._load_queue()
+
+    def _load_queue(self):
+        rows = (db.session.query(Job.printer, func.coalesce(func.sum(Job.time_min), 0))
+                .filter(Job.status.in_(QUEUE_STATUSES)).group_by(Job.printer).all())
+        with self._lock:
+            self._queue_minutes = {printer: int(minutes) for printer, minutes in rows}
+
+    def observe(self, events):
+        """Fold committed job events into the aggregates."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for event in events:
+                if event['from_status'] and event['elapsed_seconds'] is not None:
+                    entry = self._durations.setdefault(event['from_status'], [0, 0])
+                    entry[0] += 1
+                    entry[1] += event['elapsed_seconds']
+                if event['from_status'] in QUEUE_STATUSES or event['to_status'] in QUEUE_STATUSES:
+                    self._queue_minutes = None
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reconcile_seconds:
+            self.reconcile()
+        elif self._queue_minutes is None:
+            self._load_queue()
+
+    def average_seconds(self, status: str):
+        """Mean time jobs spent in ``status``, or None without history."""
+        self._ensure_loaded()
+        count, total = self._durations.get(status, (0, 0))
+        return total / count if count else None
+
+    def queue_minutes(self, printer: str) -> int:
+        """Print minutes of confirmed and printing jobs on ``printer``."""
+        self._ensure_loaded()
+        return (self._queue_minutes or {}).get(printer, 0)
+
+    def estimate(self, job, now: datetime = None) -> dict:
+        """Predicted completion time of ``job``.
+
+        A job still awaiting confirmation first waits the typical time in
+        Pending (less what it already spent there). Queue wait is the larger
+        of the print time already queued ahead of it on its printer and the
+        typical time jobs spent waiting in Confirmed, since the lab is not
+        staffed around the clock. Its own print time is added last (only
+        what is left of it for a job already printing).
+        Returns None when the job's print time is unknown or it is not headed
+        for the printer.
+        """
+        status = getattr(job.status, 'value', job.status)
+        if not job.time_min or status not in (Status.PENDING.value, *QUEUE_STATUSES):
+            return None
+        now = now or datetime.utcnow()
+        seconds = 0.0
+        if status == Status.PENDING.value:
+            waited = max((now - job.updated_at).total_seconds(), 0) if job.updated_at else 0
+            seconds += max((self.average_seconds(Status.PENDING.value) or 0) - waited, 0)
+
+        queued = self.queue_minutes(job.printer)
+        if status in QUEUE_STATUSES:
+            queued -= job.time_min  # the job's own print time is counted below
+        if status == Status.PRINTING.value:
+            printed = max((now - job.updated_at).total_seconds(), 0) if job.updated_at else 0
+            seconds += max(job.time_min * 60 - printed, 0)
+        else:
+            seconds += max(queued * 60, self.average_seconds(Status.CONFIRMED.value) or 0)
+            seconds += job.time_min * 60
+
+        # Round up to the next hour; students plan by the hour, not the minute
+        completed_by = now + timedelta(seconds=seconds)
+        completed_by = completed_by.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return {
+            'completed_by': completed_by,
+            'hours': math.ceil(seconds / 3600),
+            'queue_minutes_ahead': max(queued, 0),
+        }
+
+
+def describe_estimate(estimate) -> str:
+    """Phrase an estimate for students, e.g. 'in about 5 hours'."""
+    hours = estimate['hours']
+    if hours <= 1:
+        return 'within about an hour'
+    if hours < 48:
+        return f'in about {hours} hours'
+    return f'in about {math.ceil(hours / 24)} days'
+
+
+def get_turnaround_estimator() -> TurnaroundEstimator:
+    return current_app.extensions['turnaround_estimator']
+
+
+def init_turnaround_estimator(app):
+    app.extensions['turnaround_estimator'] = TurnaroundEstimator(
+        app.config.get('TURNAROUND_HISTORY_DAYS', 90),
+        app.config.get('TURNAROUND_RECONCILE_SECONDS', 300),
+    )
+
+
+@job_events_committed.connect
+def _observe_job_events(sender, events, **extra):
+    estimator = sender.extensions.get('turnaround_estimator') if sender is not None else None
+    if estimator is not None:
+        estimator.observe(events)
@@ -0,0 +1,85 @@
+import json
+from blinker import Namespace
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session
+from extensions import db
+from app.models.job import Job
+from app.models.job_event import JobEvent
+
+_signals = Namespace()
+# Sent after a commit with ``events``: the committed transitions as dicts, in
+# order. Subscribers (metrics, live updates) need no further queries.
+job_events_committed = _signals.signal('job-events-committed')
+
+_EVENTS_KEY = 'job_events_pending_publish'
+
+
+class JobEventService:
+    """Queries over the append-only ``job_events`` log."""
+
+    @staticmethod
+    def history(job_id: int) -> list:
+        """Every transition of one job, oldest first."""
+        return (JobEvent.query.filter_by(job_id=job_id)
+                .order_by(JobEvent.created_at, JobEvent.id).all())
+
+    @staticmethod
+    def time_in_status(start=None, end=None) -> dict:
+        """Count, average and longest time spent in each status, for jobs that
+        left it between ``start`` and ``end``."""
+        query = db.session.query(JobEvent.from_status, func.count(JobEvent.id),
+                                 func.avg(JobEvent.elapsed_seconds), func.max(JobEvent.elapsed_seconds))
+        query = query.filter(JobEvent.from_status.isnot(None), JobEvent.elapsed_seconds.isnot(None))
+        if start:
+            query = query.filter(JobEvent.created_at >= start)
+        if end:
+            query = query.filter(JobEvent.created_at < end)
+        return {
+            status: {'count': count, 'avg_seconds': round(avg or 0), 'max_seconds': longest}
+            for status, count, avg, longest in query.group_by(JobEvent.from_status)
+        }
+
+
+@event.listens_for(Session, 'after_flush')
+def _write_job_events(session, flush_context):
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, Job):
+            # A job created and moved on in one flush starts where its first transition did
+            pending = obj.__dict__.get('_pending_events')
+            rows.append({
+                'job_id': obj.id, 'from_status': None,
+                'to_status': pending[0]['from_status'] if pending else obj.status,
+                'actor': obj.student_email, 'created_at': obj.created_at, 'elapsed_seconds': None, 'payload': None,
+            })
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Job) and obj not in session.deleted:
+            for pending in obj.__dict__.pop('_pending_events', ()):
+                rows.append(dict(pending, job_id=obj.id))
+    if not rows:
+        return
+    # One executemany per flush, however many jobs a bulk operation touched
+    session.connection().execute(insert(JobEvent.__table__), [
+        dict(row, payload=json.dumps(row['payload']) if row['payload'] is not None else None)
+        for row in rows
+    ])
+    session.info.setdefault(_EVENTS_KEY, []).extend(rows)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_job_events(session):
+    events = session.info.pop(_EVENTS_KEY, None)
+    if not events:
+        return
+    sender = current_app._get_current_object() if has_app_context() else None
+    job_events_committed.send(sender, events=events)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_job_events(session):
+    session.info.pop(_EVENTS_KEY, None)
+    # Transitions made but never flushed were rolled back with the status change
+    for obj in list(session.identity_map.values()) + list(session.new):
+        if isinstance(obj, Job):
+            obj.__dict__.pop('_pending_events', None)
@@ -0,0 +1,135 @@
+import csv
+import importlib.util
+import io
+from datetime import datetime, timedelta
+from itertools import islice
+from extensions import db
+from app.models.job import Job, Status
+
+EXPORT_COLUMNS = (Job.id, Job.student_name, Job.student_email, Job.original_filename, Job.printer,
+                  Job.material, Job.color, Job.weight_g, Job.time_min, Job.cost, Job.status,
+                  Job.created_at, Job.updated_at)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+# Spreadsheets run text cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    """A value as written to the CSV, with student text defused for spreadsheets."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out whatever was written since the last take."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Streaming export of job history for accounting.
+
+    Rows are read through a server-side cursor (``yield_per``) and written out
+    one batch at a time, so memory use depends on ``BATCH_SIZE``, not on how
+    many jobs are exported.
+    """
+
+    BATCH_SIZE = 1000
+    DEFAULT_STATUSES = (Status.COMPLETED.value,)
+
+    @staticmethod
+    def parquet_available() -> bool:
+        """Whether the optional pyarrow dependency is installed."""
+        return importlib.util.find_spec('pyarrow') is not None
+
+    @staticmethod
+    def iter_batches(statuses=None, created_from=None, created_to=None, batch_size: int = None):
+        """Yield lists of at most ``batch_size`` rows of ``EXPORT_COLUMNS``, oldest job first.
+
+        ``created_from`` and ``created_to`` are dates, both inclusive.
+        """
+        batch_size = batch_size or ExportService.BATCH_SIZE
+        query = (db.session.query(*EXPORT_COLUMNS)
+                 .filter(Job.status.in_(statuses or ExportService.DEFAULT_STATUSES)))
+        if created_from:
+            query = query.filter(Job.created_at >= datetime.combine(created_from, datetime.min.time()))
+        if created_to:
+            query = query.filter(Job.created_at < datetime.combine(created_to + timedelta(days=1),
+                                                                   datetime.min.time()))
+        rows = iter(query.order_by(Job.id).yield_per(batch_size))
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def iter_csv(batches):
+        """Yield the CSV export as encoded chunks, one chunk per batch.
+
+        Text starting with a formula character is prefixed with ``'`` so
+        names and filenames chosen by students open as plain text.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for batch in batches:
+            writer.writerows([_csv_cell(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def iter_parquet(batches):
+        """Yield the Parquet export as byte chunks, one row group per batch.
+
+        Requires pyarrow; check ``parquet_available`` first.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('student_name', pa.string()),
+            ('student_email', pa.string()),
+            ('original_filename', pa.string()),
+            ('printer', pa.string()),
+            ('material', pa.string()),
+            ('color', pa.string()),
+            ('weight_g', pa.float64()),
+            ('time_min', pa.int64()),
+            ('cost', pa.float64()),
+            ('status', pa.string()),
+            ('created_at', pa.timestamp('us')),
+            ('updated_at', pa.timestamp('us')),
+        ])
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+            for batch in batches:
+                columns = [list(column) for column in zip(*batch)]
+                writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+                yield sink.take()
+        # The footer is written on close
+        yield sink.take()
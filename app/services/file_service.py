@@ -4,10 +4,11 @@ from werkzeug.utils import secure_filename
 from flask import current_app
 import os
 import shutil
-from datetime import datetime
 import mimetypes
 from filelock import FileLock
 from app.models.job import Job
+from app.services.metrics_service import FILE_MOVE_LOCK_WAIT_SECONDS
+import time
 
 class FileService:
     """Centralized service for handling file operations in the 3D print system."""
@@ -17,6 +18,8 @@ class FileService:
     @staticmethod
     def get_upload_path(status: str, filename: str) -> Path:
         """Get the full path for a file in a specific status directory."""
+        # Status members format as 'Status.PENDING' on Python 3.11+, so use the value
+        status = getattr(status, 'value', status)
         return Path(current_app.config['JOBS_ROOT']) / status / filename
     
     @staticmethod
@@ -51,12 +54,18 @@ class FileService:
         return f"{name_part}_{printer_part}_{color_part}_{job_id}{ext}"
     
     @staticmethod
-    def save_uploaded_file(file, status: str, filename: str) -> bool:
-        """Save an uploaded file to the appropriate directory."""
+    def save_uploaded_file(file, status: str, filename: str, job: Optional[Job] = None) -> bool:
+        """Save an uploaded file to the appropriate directory.
+        
+        When the job is given its ``file_size`` is recorded, which keeps the
+        storage usage totals current once the caller commits.
+        """
         try:
             upload_path = FileService.get_upload_path(status, filename)
             os.makedirs(upload_path.parent, exist_ok=True)
             file.save(str(upload_path))
+            if job is not None:
+                job.file_size = upload_path.stat().st_size
             return True
         except Exception as e:
             current_app.logger.error(f"Error saving file {filename}: {str(e)}")
@@ -71,7 +80,9 @@ class FileService:
             
             # Create lock file in the destination directory
             lock = FileLock(dst_path.parent / ".queue.lock")
+            wait_start = time.perf_counter()
             with lock:
+                FILE_MOVE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - wait_start, to_status=getattr(to_status, 'value', to_status))
                 os.makedirs(dst_path.parent, exist_ok=True)
                 shutil.move(str(src_path), str(dst_path))
             return True
@@ -80,12 +91,14 @@ class FileService:
             return False
     
     @staticmethod
-    def delete_file(status: str, filename: str) -> bool:
-        """Delete a file from a status directory."""
+    def delete_file(status: str, filename: str, job: Optional[Job] = None) -> bool:
+        """Delete a file from a status directory (clearing the job's ``file_size`` if given)."""
         try:
             file_path = FileService.get_upload_path(status, filename)
             if file_path.exists():
                 file_path.unlink()
+            if job is not None:
+                job.file_size = None
             return True
         except Exception as e:
             current_app.logger.error(f"Error deleting file {filename}: {str(e)}")
@@ -106,29 +119,6 @@ class FileService:
         """Get the MIME type of a file."""
         mime_type, _ = mimetypes.guess_type(filename)
         return mime_type or 'application/octet-stream'
-    
-    @staticmethod
-    def cleanup_old_files(status: str, max_age_days: int) -> int:
-        """Clean up files older than max_age_days in a status directory."""
-        try:
-            path = Path(current_app.config['JOBS_ROOT']) / status
-            if not path.exists():
-                return 0
-            
-            now = datetime.utcnow()
-            count = 0
-            
-            for file_path in path.glob('*'):
-                if file_path.is_file() and not file_path.name.startswith('.'):
-                    age = (now - datetime.fromtimestamp(file_path.stat().st_mtime)).days
-                    if age > max_age_days:
-                        file_path.unlink()
-                        count += 1
-            
-            return count
-        except Exception as e:
-            current_app.logger.error(f"Error cleaning up old files in {status}: {str(e)}")
-            return 0
 
 def atomic_move(src: Path, dst: Path):
     """Move a file atomically using file locking to prevent race conditions.
@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+from flask import current_app
+from extensions import db
+from app.models.job import Job, Status
+
+
+def mesh_extents(mesh) -> tuple:
+    """``(x, y, z)`` extents of a loaded trimesh mesh in millimetres."""
+    return tuple(round(float(extent), 2) for extent in mesh.extents)
+
+
+@lru_cache(maxsize=4096)
+def _extents(path: str, mtime_ns: int, size: int) -> tuple:
+    # trimesh (and numpy/scipy behind it) takes a while to import, so it is
+    # only loaded once a mesh actually needs measuring
+    import trimesh
+    return mesh_extents(trimesh.load(path, force='mesh'))
+
+
+class GeometryService:
+    """Measures uploaded models for scheduling and plate packing."""
+
+    @staticmethod
+    def bounding_box(path):
+        """Axis-aligned ``(x, y, z)`` extents of a model file in millimetres,
+        or None if it cannot be read."""
+        try:
+            stat = os.stat(path)
+            return _extents(str(path), stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            current_app.logger.warning(f"Could not measure {path}: {str(e)}")
+            return None
+
+    @staticmethod
+    def measure_job(job) -> bool:
+        """Store the bounding box of the job's file on the job if unknown.
+
+        Returns True if the job has a bounding box afterwards. Compressed
+        (archived) files are not measured.
+        """
+        if job.extents is not None:
+            return True
+        if job.is_compressed:
+            return False
+        extents = GeometryService.bounding_box(job.get_file_path())
+        if extents is None:
+            return False
+        job.bbox_x_mm, job.bbox_y_mm, job.bbox_z_mm = extents
+        return True
+
+    @staticmethod
+    def measure_confirmed() -> dict:
+        """Measure the Confirmed jobs whose bounding box is still unknown.
+
+        Boxes are normally taken from the mesh loaded for the thumbnail at
+        upload; this catches the rest outside of web requests, so the
+        scheduler and plate suggestions only ever read them. Returns the
+        number of jobs ``measured`` and ``failed``.
+        """
+        jobs = (Job.query.filter(Job.status == Status.CONFIRMED.value, Job.bbox_x_mm.is_(None))
+                .order_by(Job.id).all())
+        measured = sum(GeometryService.measure_job(job) for job in jobs)
+        db.session.commit()
+        return {'measured': measured, 'failed': len(jobs) - measured}
@@ -0,0 +1,151 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, tuple_
+from extensions import db
+from app.models.job import Job
+
+# Columns shown by the jobs table; nothing else is read from the rows
+LISTING_COLUMNS = (Job.id, Job.student_name, Job.student_email, Job.filename, Job.original_filename,
+                   Job.printer, Job.color, Job.material, Job.status, Job.cost, Job.created_at, Job.updated_at,
+                   Job.thumbnail_path)
+SORT_COLUMNS = {
+    'created_at': Job.created_at,
+    'updated_at': Job.updated_at,
+    'cost': Job.cost,
+}
+FILTER_COLUMNS = {
+    'status': Job.status,
+    'printer': Job.printer,
+    'material': Job.material,
+}
+
+
+class InvalidCursor(ValueError):
+    """A page cursor that was not produced by ``JobListingService``."""
+
+
+class JobListingService:
+    """Keyset-paginated job listing.
+
+    Pages are addressed by the ``(sort value, id)`` of the row at their edge
+    rather than by an offset, so every page is one index seek plus
+    ``PAGE_SIZE`` rows, however many jobs come before it.
+    """
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def encode_cursor(sort: str, value, job_id: int) -> str:
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps([sort, value, job_id], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str):
+        """Return the ``(sort value, id)`` stored in ``cursor`` for ``sort``."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            cursor_sort, value, job_id = json.loads(raw)
+            if cursor_sort != sort or not isinstance(job_id, int):
+                raise ValueError(cursor)
+            if sort == 'cost':
+                if value is not None and not isinstance(value, (int, float)):
+                    raise ValueError(cursor)
+            else:
+                value = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        return value, job_id
+
+    @staticmethod
+    def _seek(column, value, job_id, descending):
+        """Rows strictly after ``(value, job_id)`` in the listing order.
+
+        A row-value comparison, so the database walks the ``(column, id)``
+        index from the cursor. Costs can be NULL; NULLs always sort last, so a
+        cursor inside the NULL run only continues through it.
+        """
+        if value is None:
+            return and_(column.is_(None), Job.id < job_id if descending else Job.id > job_id)
+        key, edge = tuple_(column, Job.id), tuple_(value, job_id)
+        condition = key < edge if descending else key > edge
+        if column is Job.cost:
+            condition = or_(condition, column.is_(None))
+        return condition
+
+    @staticmethod
+    def _order(column, descending, reverse):
+        # Walking backwards reverses both the value and the NULL placement
+        if descending != reverse:
+            ordering = [column.desc(), Job.id.desc()]
+        else:
+            ordering = [column.asc(), Job.id.asc()]
+        if column is Job.cost:
+            ordering[0] = ordering[0].nullsfirst() if reverse else ordering[0].nullslast()
+        return ordering
+
+    @staticmethod
+    def _seek_before(column, value, job_id, descending):
+        """Rows strictly before ``(value, job_id)`` in the listing order."""
+        if value is None:
+            tie = Job.id > job_id if descending else Job.id < job_id
+            return or_(column.isnot(None), and_(column.is_(None), tie))
+        key, edge = tuple_(column, Job.id), tuple_(value, job_id)
+        return key > edge if descending else key < edge
+
+    @staticmethod
+    def list_jobs(filters: dict = None, sort: str = 'created_at', descending: bool = True,
+                  after: str = None, before: str = None, limit: int = None) -> dict:
+        """One page of jobs matching ``filters``.
+
+        ``filters`` may hold ``status``, ``printer``, ``material`` (exact
+        matches) and ``created_from`` / ``created_to`` (dates, both inclusive).
+        Pass the ``next_cursor`` of a page as ``after`` to get the following
+        page, or its ``prev_cursor`` as ``before`` for the preceding one.
+        Returns the rows (``LISTING_COLUMNS``) and the neighbouring cursors,
+        which are None at either end.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Invalid sort: {sort}")
+        filters = filters or {}
+        limit = min(limit or JobListingService.PAGE_SIZE, JobListingService.MAX_PAGE_SIZE)
+        column = SORT_COLUMNS[sort]
+
+        query = db.session.query(*LISTING_COLUMNS)
+        for name, filter_column in FILTER_COLUMNS.items():
+            if filters.get(name):
+                query = query.filter(filter_column == filters[name])
+        if filters.get('created_from'):
+            query = query.filter(Job.created_at >= datetime.combine(filters['created_from'], datetime.min.time()))
+        if filters.get('created_to'):
+            query = query.filter(Job.created_at < datetime.combine(filters['created_to'] + timedelta(days=1),
+                                                                   datetime.min.time()))
+
+        reverse = after is None and before is not None
+        if after is not None:
+            query = query.filter(JobListingService._seek(column, *JobListingService.decode_cursor(after, sort),
+                                                         descending))
+        elif reverse:
+            query = query.filter(JobListingService._seek_before(
+                column, *JobListingService.decode_cursor(before, sort), descending))
+
+        # One extra row tells whether there is another page in that direction
+        rows = query.order_by(*JobListingService._order(column, descending, reverse)).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if reverse:
+            rows.reverse()
+
+        def cursor(row):
+            return JobListingService.encode_cursor(sort, getattr(row, sort), row.id)
+
+        has_next = has_more if not reverse else True
+        has_prev = has_more if reverse else after is not None
+        return {
+            'jobs': rows,
+            'next_cursor': cursor(rows[-1]) if rows and has_next else None,
+            'prev_cursor': cursor(rows[0]) if rows and has_prev else None,
+        }
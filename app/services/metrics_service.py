@@ -0,0 +1,298 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Metric:
+    """Base class for metrics stored in per-thread shards.
+
+    Each thread writes only to its own shard, so updates on the request path
+    never contend on a lock. The shards are merged when the registry is
+    rendered, which only happens on a scrape.
+    """
+
+    TYPE = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            # Taken once per thread, never on subsequent updates
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _format_labels(self, key: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ''
+        body = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return '{' + body + '}'
+
+    def reset(self):
+        """Drop all recorded values (used by tests)."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> list:
+        return [f'{self.name}{self._format_labels(key)} {_format_value(value)}'
+                for key, value in sorted(self.collect().items())]
+
+
+class Gauge(_Metric):
+    """Gauge that can go up and down, or be computed at scrape time.
+
+    Gauges with a ``callback`` are evaluated lazily when rendered. The callback
+    returns a mapping of label tuples to values (or a plain number for an
+    unlabelled gauge).
+    """
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self._values = {}
+
+    def set(self, value: float, **labels):
+        # A single dict assignment is atomic under the GIL
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Increment the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def collect(self) -> dict:
+        if self.callback is not None:
+            result = self.callback()
+            if not isinstance(result, dict):
+                return {(): result}
+            return {key if isinstance(key, tuple) else (key,): value for key, value in result.items()}
+        totals = dict(self._values)
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> list:
+        return [f'{self.name}{self._format_labels(key)} {_format_value(value)}'
+                for key, value in sorted(self.collect().items())]
+
+    def reset(self):
+        super().reset()
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """Histogram with fixed cumulative buckets."""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        series = shard.get(key)
+        if series is None:
+            # [bucket counts..., +Inf count, sum]
+            series = shard[key] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for key, series in list(shard.items()):
+                merged = totals.setdefault(key, [0] * len(series))
+                for index, value in enumerate(list(series)):
+                    merged[index] += value
+        return totals
+
+    def render(self) -> list:
+        lines = []
+        for key, series in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._format_labels(key, {"le": _format_value(bound)})} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{self._format_labels(key, {"le": "+Inf"})} {cumulative}')
+            lines.append(f'{self.name}_sum{self._format_labels(key)} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{self._format_labels(key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics rendered in Prometheus text format."""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=(), callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every registered metric in the text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                samples = metric.render()
+            except Exception:
+                # A failing scrape-time callback must not break the whole scrape
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+registry = MetricsRegistry()
+
+# Request handling
+REQUEST_LATENCY = registry.histogram(
+    'printsystem_request_duration_seconds',
+    'HTTP request latency by blueprint endpoint.',
+    ('endpoint', 'method', 'status'))
+
+# Thumbnails
+THUMBNAIL_RENDER_SECONDS = registry.histogram(
+    'printsystem_thumbnail_render_seconds',
+    'Time spent rendering a model thumbnail.',
+    ('result',))
+THUMBNAIL_QUEUE_DEPTH = registry.gauge(
+    'printsystem_thumbnail_queue_depth',
+    'Thumbnail renders currently waiting or in progress.')
+
+# Email
+EMAIL_SEND_SECONDS = registry.histogram(
+    'printsystem_email_send_seconds',
+    'Time spent handing a message to the mail server.')
+EMAIL_FAILURES = registry.counter(
+    'printsystem_email_failures_total',
+    'Emails that could not be sent.')
+
+# Files
+FILE_MOVE_LOCK_WAIT_SECONDS = registry.histogram(
+    'printsystem_file_move_lock_wait_seconds',
+    'Time spent waiting for the status folder lock when moving a file.',
+    ('to_status',),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+
+# Job lifecycle, fed by committed job events
+JOB_TRANSITIONS = registry.counter(
+    'printsystem_job_transitions_total',
+    'Committed job status transitions.',
+    ('from_status', 'to_status'))
+JOB_STATUS_DURATION = registry.histogram(
+    'printsystem_job_status_duration_seconds',
+    'Time jobs spent in a status before leaving it.',
+    ('status',),
+    buckets=(60, 300, 900, 3600, 4 * 3600, 12 * 3600, 86400, 2 * 86400, 4 * 86400, 7 * 86400, 14 * 86400))
+
+# Submission limits
+SUBMISSIONS_REJECTED = registry.counter(
+    'printsystem_submissions_rejected_total',
+    'Submissions refused by a rate limit (ip, email) or because uploads were saturated (busy).',
+    ('reason',))
+UPLOADS_IN_PROGRESS = registry.gauge(
+    'printsystem_uploads_in_progress',
+    'Submissions holding an upload slot in this worker.')
+
+# Student status page
+STUDENT_STATUS_REQUESTS = registry.counter(
+    'printsystem_student_status_requests_total',
+    'Student status page views by how they were answered (not_modified, hit, miss).',
+    ('result',))
@@ -0,0 +1,175 @@
+from collections import defaultdict
+from app.models.job import Job, Status
+from app.models.printer import Printer
+
+
+class _Skyline:
+    """Bottom-left skyline packing of rectangles onto one plate.
+
+    The skyline is the upper outline of everything placed so far, kept as
+    ``[x, y, width]`` segments from left to right. A rectangle goes where its
+    top edge ends up lowest (then leftmost), resting on the highest segment
+    it spans; space hidden under it is given up, which keeps every placement
+    O(segments).
+    """
+
+    def __init__(self, width: float, depth: float):
+        self.width = width
+        self.depth = depth
+        self.segments = [[0.0, 0.0, width]]
+
+    def _rest_height(self, index: int, width: float):
+        """Height a rectangle of ``width`` starting at segment ``index`` rests at, or None."""
+        x = self.segments[index][0]
+        if x + width > self.width:
+            return None
+        y, remaining = 0.0, width
+        for segment in self.segments[index:]:
+            y = max(y, segment[1])
+            remaining -= segment[2]
+            if remaining <= 0:
+                break
+        return y
+
+    def find(self, width: float, depth: float):
+        """Best ``(top, x, index, y)`` for a rectangle, or None if it does not fit."""
+        best = None
+        for index in range(len(self.segments)):
+            y = self._rest_height(index, width)
+            if y is None or y + depth > self.depth:
+                continue
+            candidate = (y + depth, self.segments[index][0], index, y)
+            if best is None or candidate < best:
+                best = candidate
+        return best
+
+    def place(self, index: int, width: float, top: float):
+        x = self.segments[index][0]
+        self.segments.insert(index, [x, top, width])
+        # Trim or drop the segments now under the new one
+        end = x + width
+        i = index + 1
+        while i < len(self.segments) and self.segments[i][0] < end:
+            segment = self.segments[i]
+            overlap = end - segment[0]
+            if overlap >= segment[2]:
+                del self.segments[i]
+                continue
+            segment[0] += overlap
+            segment[2] -= overlap
+            break
+        # Merge neighbours of equal height
+        i = 0
+        while i < len(self.segments) - 1:
+            if self.segments[i][1] == self.segments[i + 1][1]:
+                self.segments[i][2] += self.segments[i + 1][2]
+                del self.segments[i + 1]
+            else:
+                i += 1
+
+
+class PlateService:
+    """Suggests groups of small parts to print together on one build plate."""
+
+    # Millimetres kept between parts on a plate
+    SPACING_MM = 5
+    # Parts taking more of the plate than this print alone
+    MAX_PART_FRACTION = 0.25
+    # Longest combined print time of one plate
+    MAX_PLATE_MINUTES = 24 * 60
+
+    @staticmethod
+    def pack(parts, plate, spacing: float = None, max_minutes: float = None) -> list:
+        """Pack ``parts`` onto as few plates of ``plate`` (x, y mm) as first fit allows.
+
+        ``parts`` are dicts with ``id``, ``width`` and ``depth`` (footprint in
+        mm) and optionally ``time_min``. Parts are placed largest first, each
+        on the first open plate it fits (turned if that fits better) without
+        going over ``max_minutes`` of print time. Returns the plates as dicts
+        with ``parts`` (``id``, ``x``, ``y``, ``width``, ``depth``,
+        ``rotated``), ``time_min`` and ``utilization`` of the plate area.
+        Parts that fit no plate at all are left out.
+        """
+        spacing = PlateService.SPACING_MM if spacing is None else spacing
+        max_minutes = PlateService.MAX_PLATE_MINUTES if max_minutes is None else max_minutes
+        plate_width, plate_depth = plate
+        free_area = (plate_width + spacing) * (plate_depth + spacing)
+        plates = []
+        for part in sorted(parts, key=lambda p: (-max(p['width'], p['depth']), -p['width'] * p['depth'], p['id'])):
+            minutes = part.get('time_min') or 0
+            # Every part is padded by the spacing; so is the plate, so parts
+            # may still touch its edges
+            width, depth = part['width'] + spacing, part['depth'] + spacing
+            for candidate in plates + [None]:
+                if candidate is None:
+                    candidate = {'skyline': _Skyline(plate_width + spacing, plate_depth + spacing),
+                                 'parts': [], 'time_min': 0, 'area': 0, 'padded_area': 0}
+                    is_new = True
+                else:
+                    is_new = False
+                if candidate['parts'] and candidate['time_min'] + minutes > max_minutes:
+                    continue
+                if candidate['padded_area'] + width * depth > free_area:
+                    continue  # cannot fit however it is placed
+                skyline = candidate['skyline']
+                options = [(skyline.find(width, depth), width, depth, False),
+                           (skyline.find(depth, width), depth, width, True)]
+                options = [option for option in options if option[0] is not None]
+                if not options:
+                    continue
+                (top, x, index, y), placed_width, placed_depth, rotated = min(options, key=lambda o: o[0][:2])
+                skyline.place(index, placed_width, top)
+                candidate['parts'].append({
+                    'id': part['id'], 'x': round(x, 1), 'y': round(y, 1),
+                    'width': round(placed_width - spacing, 1), 'depth': round(placed_depth - spacing, 1),
+                    'rotated': rotated,
+                })
+                candidate['time_min'] += minutes
+                candidate['area'] += part['width'] * part['depth']
+                candidate['padded_area'] += width * depth
+                if is_new:
+                    plates.append(candidate)
+                break
+        return [{
+            'parts': candidate['parts'],
+            'time_min': candidate['time_min'],
+            'utilization': round(candidate['area'] / (plate_width * plate_depth), 3),
+        } for candidate in plates]
+
+    @staticmethod
+    def suggest() -> dict:
+        """Suggested plates of Confirmed jobs with the same printer model, material and color.
+
+        Each group is packed onto the build plate of its printer model; only
+        plates holding two or more jobs are suggested. Jobs requested for a
+        model the lab does not own, large parts and jobs not yet measured
+        (see ``GeometryService.measure_confirmed``) are not grouped. Nothing
+        is written.
+        """
+        plates = {}
+        for printer in Printer.query.order_by(Printer.id):
+            plates.setdefault(printer.model, (printer.build_x_mm, printer.build_y_mm))
+
+        confirmed = (Job.query.filter_by(status=Status.CONFIRMED.value)
+                     .filter(Job.printer.in_(list(plates))).order_by(Job.id).all())
+        unmeasured = [job.id for job in confirmed if job.extents is None]
+
+        groups = defaultdict(list)
+        for job in confirmed:
+            if job.extents is None:
+                continue
+            plate = plates[job.printer]
+            if job.bbox_x_mm * job.bbox_y_mm > PlateService.MAX_PART_FRACTION * plate[0] * plate[1]:
+                continue
+            groups[(job.printer, job.material, job.color)].append(
+                {'id': job.id, 'width': job.bbox_x_mm, 'depth': job.bbox_y_mm, 'time_min': job.time_min})
+
+        suggestions = []
+        for (model, material, color), parts in sorted(groups.items(), key=lambda item: tuple(map(str, item[0]))):
+            if len(parts) < 2:
+                continue
+            for plate in PlateService.pack(parts, plates[model]):
+                if len(plate['parts']) > 1:
+                    suggestions.append(dict(plate, printer_model=model, material=material, color=color,
+                                            plate_mm=list(plates[model])))
+        return {'plates': suggestions, 'unmeasured': unmeasured}
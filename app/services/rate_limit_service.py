@@ -0,0 +1,207 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, flash, render_template, request
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from app.models.rate_limit import RateLimitBucket
+from app.services.metrics_service import SUBMISSIONS_REJECTED, UPLOADS_IN_PROGRESS
+
+# Seconds a client refused for a full upload slot is asked to wait
+BUSY_RETRY_AFTER = 5
+# Seconds between deletions of idle rows from the shared bucket table
+PRUNE_INTERVAL_SECONDS = 600
+
+
+class MemoryBuckets:
+    """Token buckets held by this process, least recently used first.
+
+    When more than ``max_keys`` clients are tracked the oldest bucket is
+    dropped, which only means that client starts again with a full bucket.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, burst: float, rate: float, now: float = None) -> float:
+        """Take one token; return 0 if it was available, else seconds until it will be."""
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class DatabaseBuckets:
+    """Token buckets in the ``rate_limit_buckets`` table, shared by every worker.
+
+    Each take is one conditional UPDATE that refills and spends a token in the
+    same statement, so concurrent workers cannot both spend the last token.
+    It runs on its own connection and never touches the request's session.
+    """
+
+    def __init__(self, idle_seconds: float):
+        self.idle_seconds = idle_seconds
+        self._pruned_at = 0.0
+
+    def take(self, key: str, burst: float, rate: float, now: float = None) -> float:
+        now = time.time() if now is None else now
+        table = RateLimitBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updated_at) * rate
+        refilled = case((refilled > burst, burst), else_=refilled)
+        for _ in range(3):
+            try:
+                with db.engine.begin() as conn:
+                    spent = conn.execute(update(table)
+                                         .where(table.c.key == key, refilled >= 1)
+                                         .values(tokens=refilled - 1, updated_at=now))
+                    if spent.rowcount:
+                        wait = 0.0
+                    else:
+                        row = conn.execute(select(table.c.tokens, table.c.updated_at)
+                                           .where(table.c.key == key)).first()
+                        if row is None:
+                            conn.execute(insert(table).values(key=key, tokens=burst - 1, updated_at=now))
+                            wait = 0.0
+                        else:
+                            tokens = min(burst, row.tokens + max(0.0, now - row.updated_at) * rate)
+                            wait = (1 - tokens) / rate
+                    self._prune(conn, now)
+                return wait
+            except IntegrityError:
+                # Another worker created the bucket first; spend from theirs
+                continue
+        raise RuntimeError(f'Could not update rate limit bucket {key}')
+
+    def _prune(self, conn, now):
+        # A bucket idle long enough to refill completely is the same as no bucket
+        if now - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+            return
+        self._pruned_at = now
+        conn.execute(delete(RateLimitBucket.__table__)
+                     .where(RateLimitBucket.__table__.c.updated_at < now - self.idle_seconds))
+
+
+class RateLimiter:
+    """Per-client submission limits: ``limits`` maps a scope to (burst, per hour)."""
+
+    def __init__(self, buckets, limits: dict):
+        self.buckets = buckets
+        self.limits = limits
+
+    def check(self, scope: str, client: str, now: float = None) -> float:
+        """Spend one submission for ``client``; return 0 if allowed, else seconds to wait."""
+        burst, per_hour = self.limits[scope]
+        if not burst or not per_hour:
+            return 0.0
+        return self.buckets.take(f'{scope}:{client}', burst, per_hour / 3600.0, now)
+
+
+class AdmissionControl:
+    """Caps the uploads this worker processes at once.
+
+    A request waits up to ``wait_seconds`` for a slot and is turned away if
+    none frees up, so a burst queues briefly instead of slowing every request.
+    """
+
+    def __init__(self, max_concurrent: int, wait_seconds: float):
+        self.max_concurrent = max_concurrent
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def acquire(self) -> bool:
+        if self._slots is None:
+            return True
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            return False
+        UPLOADS_IN_PROGRESS.inc()
+        return True
+
+    def release(self):
+        if self._slots is not None:
+            UPLOADS_IN_PROGRESS.dec()
+            self._slots.release()
+
+
+def get_rate_limiter() -> RateLimiter:
+    return current_app.extensions['rate_limiter']
+
+
+def get_admission_control() -> AdmissionControl:
+    return current_app.extensions['admission_control']
+
+
+def init_rate_limiting(app):
+    limits = {
+        'ip': (app.config.get('SUBMIT_IP_BURST', 20), app.config.get('SUBMIT_IP_PER_HOUR', 60)),
+        'email': (app.config.get('SUBMIT_EMAIL_BURST', 5), app.config.get('SUBMIT_EMAIL_PER_HOUR', 20)),
+        'status_link': (app.config.get('STATUS_LINK_BURST', 3), app.config.get('STATUS_LINK_PER_HOUR', 6)),
+    }
+    if app.config.get('RATE_LIMIT_BACKEND', 'memory') == 'database':
+        # Drop rows once even the slowest bucket would be full again
+        idle_seconds = max((burst / per_hour * 3600 for burst, per_hour in limits.values() if per_hour), default=3600)
+        buckets = DatabaseBuckets(idle_seconds)
+    else:
+        buckets = MemoryBuckets()
+    app.extensions['rate_limiter'] = RateLimiter(buckets, limits)
+    app.extensions['admission_control'] = AdmissionControl(
+        app.config.get('SUBMIT_MAX_CONCURRENT', 1),
+        app.config.get('SUBMIT_ADMISSION_WAIT', 2),
+    )
+
+
+def _refuse(reason, message, status, retry_after):
+    SUBMISSIONS_REJECTED.inc(reason=reason)
+    current_app.logger.warning(f'Submission refused ({reason}) from {request.remote_addr}')
+    flash(message, 'error')
+    response = current_app.make_response((render_template('main/submit.html'), status))
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def limit_submissions(view):
+    """Apply the per-IP and per-email limits and admission control to POSTs of ``view``.
+
+    Limits are checked first so a client over its limit never waits for a slot.
+    ``RATE_LIMIT_ENABLED`` turns off only the limits; admission control is
+    turned off with ``SUBMIT_MAX_CONCURRENT = 0``.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        if request.method != 'POST':
+            return view(*args, **kwargs)
+
+        if current_app.config.get('RATE_LIMIT_ENABLED', True):
+            limiter = get_rate_limiter()
+            wait = limiter.check('ip', request.remote_addr or 'unknown')
+            if wait:
+                return _refuse('ip', 'Too many submissions from your network. Please try again later.', 429, wait)
+            email = (request.form.get('student_email') or '').strip().lower()
+            if email:
+                wait = limiter.check('email', email)
+                if wait:
+                    return _refuse('email', 'Too many submissions for this email address. '
+                                   'Please try again later.', 429, wait)
+
+        admission = get_admission_control()
+        if not admission.acquire():
+            return _refuse('busy', 'The print system is busy processing other uploads. '
+                           'Please try again in a few seconds.', 503, BUSY_RETRY_AFTER)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission.release()
+    return decorated_function
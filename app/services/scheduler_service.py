@@ -0,0 +1,211 @@
+import heapq
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db
+from app.models.job import Job, Status
+from app.models.printer import Printer, PrinterStatus
+
+
+def _minutes_from(now, when) -> float:
+    return (when - now).total_seconds() / 60
+
+
+class SchedulerService:
+    """Assigns confirmed jobs to the lab's printers.
+
+    ``plan`` is a list scheduler driven by a heap of printers keyed by when
+    each next comes free: the earliest-free printer takes the oldest
+    confirmed job it can print, where a job can be printed if it was
+    requested for that printer model (or for none we own), its material is
+    supported and its bounding box fits the build volume. Besides a heap of
+    all its candidates by age, each kind of printer (model, build volume and
+    materials) keeps one per (material, color), so a job matching what is
+    loaded may jump ahead of older jobs by up to one changeover; any other
+    choice pays the changeover in printer time. A job sits in the heaps of
+    every kind of printer that could take it and is skipped once assigned
+    elsewhere, so a plan costs O((jobs * kinds + printers) * log jobs).
+    """
+
+    @staticmethod
+    def plan(printers, jobs, changeover_minutes: float = 30) -> dict:
+        """Plan per-printer queues.
+
+        ``printers`` are dicts with ``id``, ``model``, ``build`` (x, y, z mm),
+        ``materials`` (empty for any), ``free_at`` (minutes from now) and
+        ``loaded`` ((material, color) or None). ``jobs`` are dicts with
+        ``id``, ``printer`` (requested model), ``material``, ``color``,
+        ``time_min``, ``extents`` ((x, y, z) mm or None) and ``ready``
+        (minutes from now, usually negative). Returns ``queues`` mapping
+        printer ids to ordered ``{job_id, start, end, changeover}`` entries
+        (minutes from now) and the ids of ``unschedulable`` jobs.
+        """
+        models = {printer['model'] for printer in printers}
+        # Printers of one model, build volume and material list can take the
+        # same jobs, so they share candidate heaps
+        classes, plates, class_of = {}, [], []
+        for printer in printers:
+            key = (printer['model'], tuple(printer['build']), tuple(printer['materials']))
+            if key not in classes:
+                classes[key] = len(plates)
+                short, long = sorted(printer['build'][:2])
+                plates.append((printer['model'], printer['materials'], short, long, printer['build'][2]))
+            class_of.append(classes[key])
+
+        # Per class: a heap of (ready, print minutes, job index) over all
+        # candidates, and one per (material, color)
+        oldest = [[] for _ in plates]
+        by_group = [{} for _ in plates]
+        groups = []
+        unschedulable = []
+        for index, job in enumerate(jobs):
+            extents = job['extents']
+            if extents and None not in extents:
+                short, long = sorted(extents[:2])
+                height = extents[2]
+            else:
+                short = long = height = 0  # unknown until measured; assumed to fit
+            restricted = job['printer'] in models
+            entry = (job['ready'], job['time_min'] or 0, index)
+            group = (job['material'], job['color'])
+            groups.append(group)
+            placed = False
+            for c, (model, materials, plate_short, plate_long, plate_height) in enumerate(plates):
+                if restricted and job['printer'] != model:
+                    continue
+                if materials and job['material'] not in materials:
+                    continue
+                if short > plate_short or long > plate_long or height > plate_height:
+                    continue
+                oldest[c].append(entry)
+                by_group[c].setdefault(group, []).append(entry)
+                placed = True
+            if not placed:
+                unschedulable.append(job['id'])
+        for heap in oldest:
+            heapq.heapify(heap)
+        for class_groups in by_group:
+            for heap in class_groups.values():
+                heapq.heapify(heap)
+
+        def head(heap):
+            while heap and assigned[heap[0][2]]:
+                heapq.heappop(heap)
+            return heap[0] if heap else None
+
+        assigned = [False] * len(jobs)
+        loaded = [printer['loaded'] for printer in printers]
+        queues = {printer['id']: [] for printer in printers}
+        free = [(printer['free_at'], i) for i, printer in enumerate(printers) if oldest[class_of[i]]]
+        heapq.heapify(free)
+        while free:
+            free_at, i = heapq.heappop(free)
+            c = class_of[i]
+            first = head(oldest[c])
+            if first is None:
+                continue  # everything this printer could take went elsewhere
+            # The oldest job overall pays a changeover unless it matches what is
+            # loaded; the oldest of the loaded material and color does not
+            same = head(by_group[c].get(loaded[i], []))
+            if loaded[i] is None or groups[first[2]] == loaded[i]:
+                ready, minutes, index = first
+                changeover = 0
+            elif same is not None and same <= (first[0] + changeover_minutes,) + first[1:]:
+                ready, minutes, index = same
+                changeover = 0
+            else:
+                ready, minutes, index = first
+                changeover = changeover_minutes
+            assigned[index] = True
+            loaded[i] = groups[index]
+            start = max(free_at + changeover, ready)
+            queues[printers[i]['id']].append({
+                'job_id': jobs[index]['id'], 'start': start, 'end': start + minutes, 'changeover': bool(changeover),
+            })
+            heapq.heappush(free, (start + minutes, i))
+        return {'queues': queues, 'unschedulable': unschedulable}
+
+    @staticmethod
+    def build(now: datetime = None, apply: bool = False) -> dict:
+        """Plan the queues of the available printers from the database.
+
+        Printers finish their current print (a Printing job assigned to them)
+        before taking the next. Jobs without a bounding box (see
+        ``GeometryService.measure_confirmed``) are assumed to fit and listed
+        as ``unmeasured``. Only with ``apply`` is anything written: the
+        assignment is saved on the jobs as ``printer_id`` and ``queue_position``.
+        """
+        now = now or datetime.utcnow()
+        changeover_minutes = current_app.config.get('SCHEDULER_CHANGEOVER_MINUTES', 30)
+        printers = (Printer.query.filter_by(status=PrinterStatus.AVAILABLE.value)
+                    .order_by(Printer.id).all())
+
+        busy = {}
+        printing = Job.query.filter(Job.status == Status.PRINTING.value, Job.printer_id.isnot(None))
+        for job in printing:
+            finishes = max(_minutes_from(now, job.updated_at) + (job.time_min or 0), 0)
+            if finishes >= busy.get(job.printer_id, (0,))[0]:
+                busy[job.printer_id] = (finishes, (job.material, job.color))
+
+        confirmed = (Job.query.filter_by(status=Status.CONFIRMED.value)
+                     .order_by(Job.updated_at, Job.id).all())
+        unmeasured = [job.id for job in confirmed if job.extents is None]
+
+        def loaded(printer):
+            if printer.loaded_material is None:
+                return None
+            return (printer.loaded_material, printer.loaded_color)
+
+        result = SchedulerService.plan(
+            [{
+                'id': printer.id,
+                'model': printer.model,
+                'build': (printer.build_x_mm, printer.build_y_mm, printer.build_z_mm),
+                'materials': printer.materials,
+                'free_at': busy.get(printer.id, (0,))[0],
+                'loaded': busy[printer.id][1] if printer.id in busy else loaded(printer),
+            } for printer in printers],
+            [{
+                'id': job.id,
+                'printer': job.printer,
+                'material': job.material,
+                'color': job.color,
+                'time_min': job.time_min,
+                'extents': job.extents,
+                'ready': _minutes_from(now, job.updated_at),
+            } for job in confirmed],
+            changeover_minutes,
+        )
+
+        jobs = {job.id: job for job in confirmed}
+        if apply:
+            for job in confirmed:
+                job.printer_id = job.queue_position = None
+            for printer_id, queue in result['queues'].items():
+                for position, entry in enumerate(queue):
+                    jobs[entry['job_id']].printer_id = printer_id
+                    jobs[entry['job_id']].queue_position = position
+            db.session.commit()
+
+        def at(minutes):
+            return (now + timedelta(minutes=minutes)).isoformat()
+
+        return {
+            'generated_at': now.isoformat(),
+            'changeover_minutes': changeover_minutes,
+            'printers': [dict(
+                printer.to_dict(),
+                free_at=at(busy.get(printer.id, (0,))[0]),
+                queue=[{
+                    'job_id': entry['job_id'],
+                    'original_filename': jobs[entry['job_id']].original_filename,
+                    'material': jobs[entry['job_id']].material,
+                    'color': jobs[entry['job_id']].color,
+                    'time_min': jobs[entry['job_id']].time_min,
+                    'starts_at': at(entry['start']),
+                    'ends_at': at(entry['end']),
+                    'changeover': entry['changeover'],
+                } for entry in result['queues'][printer.id]],
+            ) for printer in printers],
+            'unschedulable': result['unschedulable'],
+            'unmeasured': unmeasured,
+        }
@@ -0,0 +1,151 @@
+import re
+from flask import current_app
+from sqlalchemy import DDL, bindparam, desc, event, or_, text
+from extensions import db
+from app.models.job import Job
+
+# Columns staff search over, in bm25 weight order
+SEARCH_COLUMNS = ('student_name', 'student_email', 'original_filename', 'printer', 'color', 'material', 'notes')
+BM25_WEIGHTS = (10.0, 8.0, 6.0, 2.0, 3.0, 3.0, 1.0)
+RESULT_COLUMNS = (Job.id, Job.student_name, Job.student_email, Job.original_filename, Job.printer,
+                  Job.color, Job.material, Job.status, Job.created_at)
+
+_columns = ', '.join(SEARCH_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+# External-content FTS5 index over the jobs table, kept in sync by triggers.
+# Status changes do not touch the indexed columns, so they skip the index.
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5({_columns}, content='jobs', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+    f"INSERT INTO jobs_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+    f"INSERT INTO jobs_fts(jobs_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF {_columns} ON jobs BEGIN "
+    f"INSERT INTO jobs_fts(jobs_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO jobs_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+)
+SQLITE_DROP_DDL = ('DROP TABLE IF EXISTS jobs_fts',)
+SQLITE_OBJECTS = ('jobs_fts', 'jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au')
+
+# Postgres needs no triggers: a GIN expression index over the same document
+POSTGRES_DOCUMENT = "to_tsvector('simple', " + " || ' ' || ".join(
+    f"coalesce({column}, '')" for column in SEARCH_COLUMNS) + ")"
+POSTGRES_DDL = (f'CREATE INDEX IF NOT EXISTS ix_jobs_search ON jobs USING GIN ({POSTGRES_DOCUMENT})',)
+
+for _statement in SQLITE_DDL:
+    event.listen(Job.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in SQLITE_DROP_DDL:
+    event.listen(Job.__table__, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_DDL:
+    event.listen(Job.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+
+def missing_sqlite_objects(connection) -> list:
+    """Names of the FTS5 table and triggers that do not exist.
+
+    SQLite drops a table's triggers when a batch migration rebuilds it, and
+    search then silently stops seeing new and edited jobs.
+    """
+    present = {name for (name,) in connection.execute(
+        text('SELECT name FROM sqlite_master WHERE name IN :names').bindparams(bindparam('names', expanding=True)),
+        {'names': list(SQLITE_OBJECTS)})}
+    return [name for name in SQLITE_OBJECTS if name not in present]
+
+
+def repair_sqlite_index(connection) -> list:
+    """Recreate whatever is missing and re-index every job. Returns the names
+    that were missing."""
+    missing = missing_sqlite_objects(connection)
+    if missing:
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+    return missing
+
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchService:
+    """Full-text job search with prefix matching and relevance ranking."""
+
+    MAX_TERMS = 8
+
+    @staticmethod
+    def tokenize(query: str) -> list:
+        """Split a free-text query into lowercase search terms."""
+        return [term.lower() for term in _TOKEN_RE.findall(query or '')][:SearchService.MAX_TERMS]
+
+    @staticmethod
+    def search(query: str, limit: int = 20) -> list:
+        """Jobs matching every term of ``query`` as a prefix, best match first.
+
+        Returns rows of ``RESULT_COLUMNS``. Uses FTS5 with bm25 on SQLite, the
+        GIN tsvector index with ts_rank on Postgres, and LIKE elsewhere.
+        """
+        terms = SearchService.tokenize(query)
+        if not terms:
+            return []
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            return SearchService._search_sqlite(terms, limit)
+        if dialect == 'postgresql':
+            return SearchService._search_postgres(terms, limit)
+        return SearchService._search_like(terms, limit)
+
+    @staticmethod
+    def _search_sqlite(terms, limit):
+        # Quoting every term keeps FTS5 operators in user input literal
+        match = ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        ranked = text(
+            f'SELECT rowid AS id, bm25(jobs_fts, {weights}) AS rank FROM jobs_fts '
+            'WHERE jobs_fts MATCH :match ORDER BY rank LIMIT :limit'
+        ).columns(id=db.Integer, rank=db.Float).subquery()
+        return (db.session.query(*RESULT_COLUMNS)
+                .join(ranked, ranked.c.id == Job.id)
+                .order_by(ranked.c.rank)
+                .params(match=match, limit=limit).all())
+
+    @staticmethod
+    def _search_postgres(terms, limit):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        rank = text(f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', :tsquery))")
+        return (db.session.query(*RESULT_COLUMNS)
+                .filter(text(f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', :tsquery)"))
+                .order_by(desc(rank), Job.created_at.desc())
+                .params(tsquery=tsquery).limit(limit).all())
+
+    @staticmethod
+    def _search_like(terms, limit):
+        query = db.session.query(*RESULT_COLUMNS)
+        for term in terms:
+            pattern = f'%{term}%'
+            query = query.filter(or_(*(getattr(Job, column).ilike(pattern) for column in SEARCH_COLUMNS)))
+        return query.order_by(Job.created_at.desc()).limit(limit).all()
+
+    @staticmethod
+    def rebuild_index():
+        """Re-index every job (after bulk loads that bypassed the triggers)."""
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+            db.session.commit()
+
+    @staticmethod
+    def check_index(repair: bool = False) -> list:
+        """Names of missing SQLite search triggers or tables, recreated (and the
+        index rebuilt) when ``repair`` is set."""
+        if db.engine.dialect.name != 'sqlite':
+            return []
+        connection = db.session.connection()
+        if not repair:
+            return missing_sqlite_objects(connection)
+        missing = repair_sqlite_index(connection)
+        db.session.commit()
+        if missing:
+            current_app.logger.warning(f"Search index was missing {', '.join(missing)}; recreated and rebuilt")
+        return missing
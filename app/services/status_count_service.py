@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from extensions import db
+from app.models.job import Job
+
+_DELTAS_KEY = 'status_count_deltas'
+
+
+class StatusCountCache:
+    """In-memory job counts per status.
+
+    Filled by a single ``GROUP BY status`` query, then kept current from the
+    session events below as jobs are created, change status or are deleted.
+    A periodic reconcile against the database corrects any drift, e.g. from
+    other worker processes or rows changed outside the ORM.
+    """
+
+    def __init__(self, reconcile_seconds: float = 60):
+        self.reconcile_seconds = reconcile_seconds
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self.updated_at = None
+
+    def reconcile(self) -> dict:
+        """Reload the counts from the database."""
+        rows = db.session.query(Job.status, func.count(Job.id)).group_by(Job.status).all()
+        with self._lock:
+            self._counts = {status: count for status, count in rows}
+            self._loaded_at = time.monotonic()
+            self.updated_at = datetime.utcnow()
+        return dict(self._counts)
+
+    def apply(self, deltas: dict):
+        """Apply committed per-status deltas."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for status, delta in deltas.items():
+                self._counts[status] = max(self._counts.get(status, 0) + delta, 0)
+            self.updated_at = datetime.utcnow()
+
+    def get_counts(self) -> dict:
+        """Return a copy of the counts, reconciling if they are stale."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.reconcile_seconds:
+            return self.reconcile()
+        return dict(self._counts)
+
+
+def get_status_count_cache() -> StatusCountCache:
+    return current_app.extensions['status_count_cache']
+
+
+def get_status_counts() -> dict:
+    """Counts for every status folder plus any other status present in the DB."""
+    counts = get_status_count_cache().get_counts()
+    for status in current_app.config['STATUS_FOLDERS']:
+        counts.setdefault(status, 0)
+    return counts
+
+
+def init_status_counts(app):
+    app.extensions['status_count_cache'] = StatusCountCache(
+        app.config.get('STATUS_COUNT_RECONCILE_SECONDS', 60)
+    )
+
+
+def _status_value(value):
+    if value is None:
+        return Job.__table__.c.status.default.arg
+    return getattr(value, 'value', value)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_status_deltas(session, flush_context):
+    deltas = session.info.setdefault(_DELTAS_KEY, Counter())
+    for obj in session.new:
+        if isinstance(obj, Job):
+            deltas[_status_value(obj.status)] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            history = inspect(obj).attrs.status.history
+            old = history.deleted[0] if history.deleted else obj.status
+            deltas[_status_value(old)] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Job) and obj not in session.deleted:
+            history = inspect(obj).attrs.status.history
+            if history.added and history.deleted:
+                deltas[_status_value(history.deleted[0])] -= 1
+                deltas[_status_value(history.added[0])] += 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_status_deltas(session):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas or not has_app_context():
+        return
+    cache = current_app.extensions.get('status_count_cache')
+    if cache is not None:
+        cache.apply(deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_status_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
@@ -0,0 +1,195 @@
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from extensions import db
+from app.models.job import Job
+from app.models.storage import StorageUsage, StorageSnapshot
+from app.services.counter_service import increment_counters
+
+_TRACKED_ATTRS = ('status', 'file_size', 'student_email')
+_DELTAS_KEY = 'storage_usage_deltas'
+
+
+class StorageService:
+    """Disk usage of job files, answered from the database.
+
+    ``Job.file_size`` is set when a file is saved or compressed, and the
+    per-status and per-student totals in ``storage_usage`` follow the job rows
+    in the same transaction, so a failed move or a rollback never skews them.
+    """
+
+    FORECAST_WINDOW_DAYS = 30
+
+    @staticmethod
+    def get_usage(top: int = 10) -> dict:
+        """Totals per status, the biggest students and the largest jobs."""
+        rows = StorageUsage.query.all()
+        by_status = {status: {'bytes': 0, 'files': 0} for status in current_app.config['STATUS_FOLDERS']}
+        students = []
+        for row in rows:
+            entry = {'bytes': row.bytes, 'files': row.files}
+            if row.scope == 'status':
+                by_status[row.key] = entry
+            elif row.files:
+                students.append(dict(entry, student_email=row.key))
+        students.sort(key=lambda entry: entry['bytes'], reverse=True)
+
+        largest = (Job.query.filter(Job.file_size.isnot(None))
+                   .order_by(Job.file_size.desc()).limit(top).all())
+        return {
+            'total_bytes': sum(entry['bytes'] for entry in by_status.values()),
+            'by_status': by_status,
+            'top_students': students[:top],
+            'largest_jobs': [{
+                'id': job.id,
+                'filename': job.filename,
+                'status': job.status,
+                'student_email': job.student_email,
+                'bytes': job.file_size,
+            } for job in largest],
+        }
+
+    @staticmethod
+    def rebuild() -> int:
+        """Backfill unknown file sizes and recompute all totals.
+
+        Only jobs without a recorded size are stat'ed (one stat each); the
+        totals are then recomputed with two GROUP BY queries. Returns the
+        number of sizes filled in.
+        """
+        filled = 0
+        for job in Job.query.filter(Job.file_size.is_(None)).all():
+            try:
+                job.file_size = job.get_file_path().stat().st_size
+                filled += 1
+            except FileNotFoundError:
+                continue
+        db.session.flush()
+
+        db.session.query(StorageUsage).delete()
+        for scope, column in (('status', Job.status), ('student', Job.student_email)):
+            rows = (db.session.query(column, func.coalesce(func.sum(Job.file_size), 0), func.count(Job.id))
+                    .group_by(column).all())
+            db.session.add_all(StorageUsage(scope=scope, key=key, bytes=total, files=count)
+                               for key, total, count in rows)
+        db.session.commit()
+        return filled
+
+    @staticmethod
+    def record_snapshot(now: datetime = None) -> StorageSnapshot:
+        """Store today's disk usage for the capacity forecast (one statvfs call)."""
+        usage = shutil.disk_usage(current_app.config['JOBS_ROOT'])
+        jobs_bytes = (db.session.query(func.coalesce(func.sum(StorageUsage.bytes), 0))
+                      .filter(StorageUsage.scope == 'status').scalar())
+        snapshot = StorageSnapshot(taken_at=now or datetime.utcnow(), disk_total=usage.total,
+                                   disk_used=usage.used, jobs_bytes=jobs_bytes)
+        db.session.add(snapshot)
+        db.session.commit()
+        return snapshot
+
+    @staticmethod
+    def forecast(now: datetime = None) -> dict:
+        """Linear forecast of the days left until DISK_SPACE_THRESHOLD is reached.
+
+        Fits a least-squares line through the snapshots of the last
+        ``FORECAST_WINDOW_DAYS`` days. ``days_until_threshold`` is None when
+        usage is flat or shrinking, or there are fewer than two snapshots.
+        """
+        now = now or datetime.utcnow()
+        threshold = current_app.config['DISK_SPACE_THRESHOLD']
+        snapshots = (StorageSnapshot.query
+                     .filter(StorageSnapshot.taken_at >= now - timedelta(days=StorageService.FORECAST_WINDOW_DAYS))
+                     .order_by(StorageSnapshot.taken_at).all())
+        result = {'threshold': threshold, 'snapshots': len(snapshots),
+                  'bytes_per_day': None, 'days_until_threshold': None}
+        if len(snapshots) < 2:
+            return result
+
+        xs = [(s.taken_at - snapshots[0].taken_at).total_seconds() / 86400 for s in snapshots]
+        ys = [s.disk_used for s in snapshots]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        if not variance:
+            return result
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+        result['bytes_per_day'] = round(slope)
+
+        latest = snapshots[-1]
+        remaining = threshold * latest.disk_total - latest.disk_used
+        if remaining <= 0:
+            result['days_until_threshold'] = 0
+        elif slope > 0:
+            elapsed = (now - latest.taken_at).total_seconds() / 86400
+            result['days_until_threshold'] = max(round(remaining / slope - elapsed, 1), 0)
+        return result
+
+
+def _contribution(attrs: dict) -> dict:
+    size = attrs['file_size'] or 0
+    status = getattr(attrs['status'], 'value', attrs['status']) or Job.__table__.c.status.default.arg
+    return {('status', status): (size, 1), ('student', attrs['student_email']): (size, 1)}
+
+
+def _old_attrs(job) -> dict:
+    state = inspect(job)
+    values = {}
+    for name in _TRACKED_ATTRS:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else getattr(job, name)
+    return values
+
+
+def _new_attrs(job) -> dict:
+    return {name: getattr(job, name) for name in _TRACKED_ATTRS}
+
+
+# Load the previous value whenever a tracked attribute is set, so the change
+# can be subtracted from the old totals even if the job had been expired
+for _name in _TRACKED_ATTRS:
+    event.listen(getattr(Job, _name), 'set', lambda target, value, oldvalue, initiator: None,
+                 active_history=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_storage_deltas(session, flush_context, instances):
+    # Collected before the flush, while deleted rows can still be loaded
+    deltas = session.info.setdefault(_DELTAS_KEY, defaultdict(lambda: [0, 0]))
+
+    def add(contribution, sign):
+        for key, (size, files) in contribution.items():
+            deltas[key][0] += sign * size
+            deltas[key][1] += sign * files
+
+    for obj in session.new:
+        if isinstance(obj, Job):
+            add(_contribution(_new_attrs(obj)), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            add(_contribution(_old_attrs(obj)), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Job) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRS):
+                add(_contribution(_old_attrs(obj)), -1)
+                add(_contribution(_new_attrs(obj)), 1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_storage_deltas(session, flush_context):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    connection = session.connection()
+    for (scope, key), (size, files) in deltas.items():
+        if not size and not files:
+            continue
+        increment_counters(connection, StorageUsage.__table__, {'scope': scope, 'key': key},
+                           {'bytes': size, 'files': files})
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_storage_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
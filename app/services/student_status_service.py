@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from app.models.job import Job
+from app.services.metrics_service import STUDENT_STATUS_REQUESTS
+
+
+class StudentStatusCache:
+    """Rendered job lists of the student status page, per student email.
+
+    Each entry is stored under the version it was rendered for (see
+    ``StudentStatusService.version``). A status change in any worker bumps
+    the version, so a stale entry is never served; it is simply replaced.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # email -> (version, html)
+
+    def get(self, email, version):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(email)
+            return entry[1]
+
+    def put(self, email, version, html):
+        with self._lock:
+            self._entries[email] = (version, html)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class StudentStatusService:
+    """Lookups behind the token-authenticated student status page."""
+
+    @staticmethod
+    def version(email: str) -> str:
+        """A short hash that changes whenever the student's jobs may look different.
+
+        Covers the number of jobs and the latest ``updated_at`` among them
+        (bumped by every status change), read from the
+        ``ix_jobs_student_email_updated_at`` index alone. Queue estimates drift
+        with other students' jobs, so the version also rolls over every
+        ``STUDENT_STATUS_CACHE_SECONDS``.
+        """
+        count, last_change = (db.session.query(func.count(Job.id), func.max(Job.updated_at))
+                              .filter(func.lower(Job.student_email) == email).one())
+        window = int(time.time() // current_app.config.get('STUDENT_STATUS_CACHE_SECONDS', 60))
+        key = f'{email}|{count}|{last_change}|{window}'
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def has_jobs(email: str) -> bool:
+        return db.session.query(Job.query.filter(func.lower(Job.student_email) == email).exists()).scalar()
+
+    @staticmethod
+    def get_jobs(email: str) -> list:
+        """The student's jobs, most recently changed first."""
+        return (Job.query.filter(func.lower(Job.student_email) == email)
+                .order_by(Job.updated_at.desc(), Job.id.desc()).all())
+
+    @staticmethod
+    def render_jobs(email: str, version: str, render) -> str:
+        """The student's job list as HTML, from the cache while ``version`` is current.
+
+        ``render`` is called with the jobs on a miss.
+        """
+        cache = get_student_status_cache()
+        html = cache.get(email, version)
+        if html is None:
+            STUDENT_STATUS_REQUESTS.inc(result='miss')
+            html = render(StudentStatusService.get_jobs(email))
+            cache.put(email, version, html)
+        else:
+            STUDENT_STATUS_REQUESTS.inc(result='hit')
+        return html
+
+
+def get_student_status_cache() -> StudentStatusCache:
+    return current_app.extensions['student_status_cache']
+
+
+def init_student_status(app):
+    app.extensions['student_status_cache'] = StudentStatusCache(
+        app.config.get('STUDENT_STATUS_CACHE_SIZE', 1024),
+    )
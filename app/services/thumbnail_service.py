@@ -1,16 +1,75 @@
+import io
 import os
-import trimesh
-import pyrender
-import numpy as np
-from PIL import Image
+import re
 from flask import current_app
 from app.models.job import Status
+from app.services.geometry_service import mesh_extents
+from app.services.metrics_service import THUMBNAIL_RENDER_SECONDS, THUMBNAIL_QUEUE_DEPTH
+import time
+import hashlib
+from functools import lru_cache
+
+# Square sizes written for every model, in pixels. The largest is the render
+# itself and is kept as ``<job id>.png``, the name thumbnails always had.
+THUMBNAIL_SIZES = (64, 128, 400)
+# Encoder options per format; PNG is the fallback every browser shows
+THUMBNAIL_FORMATS = {
+    'avif': {'quality': 60, 'speed': 8},
+    'webp': {'quality': 80, 'method': 4},
+    'png': {'optimize': True},
+}
+THUMBNAIL_MIMETYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'png': 'image/png'}
+# Tiles per row of a sprite sheet
+SPRITE_COLUMNS = 16
+
+# '12.png' (full size) or '12_64.webp'
+_THUMBNAIL_NAME = re.compile(r'^(\d+)(?:_(\d+))?\.(avif|webp|png)$')
+
+@lru_cache(maxsize=4096)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    # mtime and size are part of the cache key so a re-rendered file gets a new hash
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def thumbnail_name(job_id: int, size: int, fmt: str) -> str:
+    """File name of one size and format of a job's thumbnail."""
+    if size == max(THUMBNAIL_SIZES) and fmt == 'png':
+        return f'{job_id}.png'
+    return f'{job_id}_{size}.{fmt}'
+
+@lru_cache(maxsize=64)
+def _compose_sprite(tiles: tuple, size: int, fmt: str) -> bytes:
+    # ``tiles`` holds (path, version) pairs, so a re-rendered thumbnail is a new key
+    from PIL import Image
+    rows = -(-len(tiles) // SPRITE_COLUMNS)
+    sheet = Image.new('RGBA', (min(len(tiles), SPRITE_COLUMNS) * size, rows * size), (0, 0, 0, 0))
+    for index, (path, _) in enumerate(tiles):
+        with Image.open(path) as tile:
+            tile = tile.convert('RGBA')
+            if tile.size != (size, size):
+                tile = tile.resize((size, size), Image.LANCZOS)
+            sheet.paste(tile, ((index % SPRITE_COLUMNS) * size, (index // SPRITE_COLUMNS) * size))
+    buffer = io.BytesIO()
+    sheet.save(buffer, format=fmt.upper(), **THUMBNAIL_FORMATS[fmt])
+    return buffer.getvalue()
 
 class ThumbnailService:
     """Service for generating thumbnails of 3D models."""
     
     @staticmethod
     def generate_thumbnail(job):
+        """Generate a thumbnail and record render duration metrics."""
+        start = time.perf_counter()
+        with THUMBNAIL_QUEUE_DEPTH.track_inprogress():
+            thumbnail_path = ThumbnailService._render_thumbnail(job)
+        THUMBNAIL_RENDER_SECONDS.observe(
+            time.perf_counter() - start,
+            result='success' if thumbnail_path else 'failure'
+        )
+        return thumbnail_path
+
+    @staticmethod
+    def _render_thumbnail(job):
         """Generate a thumbnail image for a 3D model file.
         
         Args:
@@ -30,9 +89,18 @@ class ThumbnailService:
             # Skip thumbnail generation in test environment
             if current_app.config.get('TESTING'):
                 return None
+
+            # The rendering stack (trimesh, pyrender/OpenGL, numpy, PIL) costs
+            # about a second and tens of MB per process, so it is only loaded
+            # by processes that actually render
+            import numpy as np
+            import pyrender
+            import trimesh
+            from PIL import Image
                 
-            # Load the mesh
+            # Load the mesh, and keep its bounding box for the scheduler
             mesh = trimesh.load(file_path, force='mesh')
+            job.bbox_x_mm, job.bbox_y_mm, job.bbox_z_mm = mesh_extents(mesh)
             
             # Center the mesh
             mesh.apply_translation(-mesh.bounds.mean(axis=0))
@@ -63,24 +131,116 @@ class ThumbnailService:
                 [0.0, 0.0, 0.0, 1.0]
             ]))
             
-            # Render
-            r = pyrender.OffscreenRenderer(400, 400)
+            # Render once at the largest size
+            r = pyrender.OffscreenRenderer(max(THUMBNAIL_SIZES), max(THUMBNAIL_SIZES))
             color, _ = r.render(scene)
             r.delete()
             
-            # Convert to PIL Image and save
-            image = Image.fromarray(color)
-            
             # Create thumbnails directory if it doesn't exist
-            thumbnails_dir = os.path.join(current_app.config['JOBS_ROOT'], 'thumbnails')
+            thumbnails_dir = current_app.config['THUMBNAILS_DIR']
             os.makedirs(thumbnails_dir, exist_ok=True)
             
-            # Save thumbnail
-            thumbnail_path = os.path.join('thumbnails', f'{job.filename}.png')
-            image.save(os.path.join(current_app.config['JOBS_ROOT'], thumbnail_path))
+            # Save every size and format from the one render
+            ThumbnailService._save_sizes(Image.fromarray(color), job.id, thumbnails_dir)
             
-            return thumbnail_path
+            return os.path.join('thumbnails', thumbnail_name(job.id, max(THUMBNAIL_SIZES), 'png'))
             
         except Exception as e:
             current_app.logger.error(f"Thumbnail generation failed for job {job.id} ({job.filename}): {str(e)}")
-            return None 
\ No newline at end of file
+            return None 
+
+    @staticmethod
+    def get_thumbnail_file(filename):
+        """Get the absolute path of a thumbnail inside THUMBNAILS_DIR, or None."""
+        thumbnails_dir = current_app.config['THUMBNAILS_DIR']
+        path = os.path.join(thumbnails_dir, os.path.basename(filename))
+        return path if os.path.isfile(path) else None
+
+    @staticmethod
+    def _save_sizes(image, job_id, thumbnails_dir):
+        """Write every size in WebP and PNG (and AVIF if enabled) from one render."""
+        from PIL import Image, features
+        formats = ['webp', 'png']
+        if current_app.config.get('THUMBNAIL_AVIF') and features.check('avif'):
+            formats.insert(0, 'avif')
+        # The full-size PNG is written last: its content hash versions the whole set
+        largest = max(THUMBNAIL_SIZES)
+        for size in sorted(THUMBNAIL_SIZES, reverse=True):
+            resized = image if size == largest else image.resize((size, size), Image.LANCZOS)
+            for fmt in THUMBNAIL_FORMATS:
+                path = os.path.join(thumbnails_dir, thumbnail_name(job_id, size, fmt))
+                if fmt not in formats:
+                    # Left over from an earlier render with other settings
+                    if os.path.exists(path):
+                        os.remove(path)
+                elif (size, fmt) != (largest, 'png'):
+                    resized.save(path, format=fmt.upper(), **THUMBNAIL_FORMATS[fmt])
+        image.save(os.path.join(thumbnails_dir, thumbnail_name(job_id, largest, 'png')),
+                   format='PNG', **THUMBNAIL_FORMATS['png'])
+
+    @staticmethod
+    def get_thumbnail_formats(job_id):
+        """Formats a job's thumbnail was rendered in at every size, best first.
+
+        Empty for thumbnails from before multiple sizes were rendered, which
+        exist only as the full-size PNG.
+        """
+        thumbnails_dir = current_app.config['THUMBNAILS_DIR']
+        smallest = min(THUMBNAIL_SIZES)
+        return [fmt for fmt in THUMBNAIL_FORMATS
+                if os.path.isfile(os.path.join(thumbnails_dir, thumbnail_name(job_id, smallest, fmt)))]
+
+    @staticmethod
+    def get_thumbnail_mimetype(filename):
+        return THUMBNAIL_MIMETYPES.get(os.path.splitext(filename)[1].lstrip('.').lower(), 'image/png')
+
+    @staticmethod
+    def get_thumbnail_version(path):
+        """Get a short content hash of a thumbnail, used to version its URL.
+
+        Every size and format of a job comes from one render, so they all share
+        the version of the full-size PNG.
+        """
+        match = _THUMBNAIL_NAME.match(os.path.basename(path))
+        if match and match.group(2):
+            full_size = os.path.join(os.path.dirname(path), thumbnail_name(int(match.group(1)), max(THUMBNAIL_SIZES), 'png'))
+            if os.path.isfile(full_size):
+                path = full_size
+        stat = os.stat(path)
+        return _content_hash(path, stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def get_sprite_tiles(job_ids, size):
+        """``(job_id, path, version)`` of each job's thumbnail at ``size``, for a sprite sheet.
+
+        Jobs without a thumbnail are left out. Older thumbnails without the
+        size are scaled from the full-size PNG.
+        """
+        thumbnails_dir = current_app.config['THUMBNAILS_DIR']
+        tiles = []
+        for job_id in job_ids:
+            full_size = os.path.join(thumbnails_dir, thumbnail_name(job_id, max(THUMBNAIL_SIZES), 'png'))
+            if not os.path.isfile(full_size):
+                continue
+            path = os.path.join(thumbnails_dir, thumbnail_name(job_id, size, 'png'))
+            if not os.path.isfile(path):
+                path = full_size
+            tiles.append((job_id, path, ThumbnailService.get_thumbnail_version(full_size)))
+        return tiles
+
+    @staticmethod
+    def get_sprite_version(tiles, size):
+        """Short hash identifying a sprite sheet's tiles and their versions."""
+        key = f'{size}|' + ','.join(f'{job_id}:{version}' for job_id, _, version in tiles)
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def build_sprite(tiles, size):
+        """One image of ``tiles`` in rows of ``SPRITE_COLUMNS``, as ``(bytes, mimetype)``.
+
+        Recent sheets are kept in memory, keyed by their tiles' versions.
+        """
+        from PIL import features
+        fmt = 'webp' if features.check('webp') else 'png'
+        data = _compose_sprite(tuple((path, version) for _, path, version in tiles), size, fmt)
+        return data, THUMBNAIL_MIMETYPES[fmt]
@@ -1,26 +1,101 @@
+import calendar
+import threading
+import time
+from collections import OrderedDict
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
+
+class VerifiedTokenCache:
+    """Small LRU of verified confirmation tokens, with a TTL.
+
+    Email clients and link scanners open the same confirmation URL many
+    times; a hit skips the signature check. Entries map a token to its job id
+    and signing time, so expiry is still enforced exactly. Tokens marked used
+    after a confirmation are answered without a database lookup until the
+    token itself would have expired. Both are per process.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._verified = OrderedDict()  # token -> (job_id, signed_at, cached_at)
+        self._used = OrderedDict()  # token -> signed_at
+
+    def get(self, token):
+        """``(job_id, signed_at)`` of a recently verified token, or None."""
+        with self._lock:
+            entry = self._verified.get(token)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] > self.ttl:
+                del self._verified[token]
+                return None
+            self._verified.move_to_end(token)
+            return entry[0], entry[1]
+
+    def put(self, token, job_id, signed_at: int):
+        with self._lock:
+            self._verified[token] = (job_id, signed_at, time.monotonic())
+            self._verified.move_to_end(token)
+            while len(self._verified) > self.maxsize:
+                self._verified.popitem(last=False)
+
+    def is_used(self, token) -> bool:
+        with self._lock:
+            signed_at = self._used.get(token)
+            if signed_at is None:
+                return False
+            if time.time() - signed_at > TokenService.DEFAULT_EXPIRY:
+                del self._used[token]  # expired anyway; the signature check says so
+                return False
+            return True
+
+    def mark_used(self, token, signed_at: int):
+        with self._lock:
+            self._verified.pop(token, None)
+            self._used[token] = signed_at
+            self._used.move_to_end(token)
+            while len(self._used) > self.maxsize:
+                self._used.popitem(last=False)
+
+
+def _token_state():
+    """The app's serializer and verified-token cache, rebuilt when SECRET_KEY changes."""
+    secret_key = current_app.config['SECRET_KEY']
+    state = current_app.extensions.get('token_service')
+    if state is None or state[0] != secret_key:
+        cache = VerifiedTokenCache(current_app.config.get('TOKEN_CACHE_SIZE', 1024),
+                                   current_app.config.get('TOKEN_CACHE_TTL', 300))
+        state = (secret_key, URLSafeTimedSerializer(secret_key), cache)
+        current_app.extensions['token_service'] = state
+    return state[1], state[2]
+
+
 class TokenService:
     """Service for generating and verifying tokens."""
-    
+
     SALT = 'student-job-confirmation'
     DEFAULT_EXPIRY = 7 * 24 * 3600  # 7 days in seconds
-    
+    # Status page links are signed for a student's email rather than a job
+    STATUS_SALT = 'student-job-status'
+    STATUS_EXPIRY = 30 * 24 * 3600  # 30 days in seconds
+
     @staticmethod
     def generate_token(job):
         """Generate a secure token for job confirmation."""
-        serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+        serializer, _ = _token_state()
         return serializer.dumps(job.id, salt=TokenService.SALT)
-    
+
     @staticmethod
     def verify_token(token, expiration=None):
         """Verify a job confirmation token.
-        
+
         Args:
             token (str): The token to verify
             expiration (int): Token expiration time in seconds (default: 7 days)
-            
+
         Returns:
             tuple: (job_id, error_message)
                 - If valid: (job_id, None)
@@ -28,14 +103,24 @@ class TokenService:
         """
         if expiration is None:
             expiration = TokenService.DEFAULT_EXPIRY
-            
-        serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+
+        serializer, cache = _token_state()
+        if cache.is_used(token):
+            return None, "This job has already been confirmed."
+        cached = cache.get(token)
+        if cached is not None:
+            job_id, signed_at = cached
+            if int(time.time()) - signed_at > expiration:
+                return None, "The confirmation link has expired."
+            return job_id, None
         try:
-            job_id = serializer.loads(
+            job_id, signed_at = serializer.loads(
                 token,
                 salt=TokenService.SALT,
-                max_age=expiration
+                max_age=expiration,
+                return_timestamp=True
             )
+            cache.put(token, job_id, calendar.timegm(signed_at.utctimetuple()))
             return job_id, None
         except SignatureExpired:
             return None, "The confirmation link has expired."
@@ -43,4 +128,41 @@ class TokenService:
             return None, "Invalid confirmation link."
         except Exception as e:
             current_app.logger.error(f"Error verifying token: {str(e)}")
-            return None, "An error occurred while processing your request." 
\ No newline at end of file
+            return None, "An error occurred while processing your request."
+
+    @staticmethod
+    def invalidate_token(token):
+        """Mark a token as used once its job is confirmed.
+
+        Later visits are turned away by ``verify_token`` without a database
+        lookup. Only this process remembers; other workers still find the job
+        is no longer Pending.
+        """
+        serializer, cache = _token_state()
+        try:
+            _, signed_at = serializer.loads(token, salt=TokenService.SALT, return_timestamp=True)
+        except BadSignature:
+            return
+        cache.mark_used(token, calendar.timegm(signed_at.utctimetuple()))
+
+    @staticmethod
+    def generate_status_token(student_email):
+        """Generate a token for the status page of every job of ``student_email``."""
+        serializer, _ = _token_state()
+        return serializer.dumps(student_email.strip().lower(), salt=TokenService.STATUS_SALT)
+
+    @staticmethod
+    def verify_status_token(token):
+        """Verify a status page token.
+
+        Returns:
+            tuple: (student_email, error_message), as for ``verify_token``
+        """
+        serializer, _ = _token_state()
+        try:
+            return serializer.loads(token, salt=TokenService.STATUS_SALT,
+                                    max_age=TokenService.STATUS_EXPIRY), None
+        except SignatureExpired:
+            return None, "The status link has expired. Please request a new one."
+        except BadSignature:
+            return None, "Invalid status link."
@@ -0,0 +1,186 @@
+"""Compare waitress worker occupancy for send_file and X-Accel-Redirect downloads.
+
+Starts the app under waitress on a local port, then runs concurrent staff
+downloads of one large job file while a probe thread times a cheap request.
+With ``send_file`` every download holds a waitress thread for the whole
+transfer; with ``x-accel`` the app only returns headers and nginx would stream
+the body, so the threads are released almost immediately.
+
+Usage:
+    python benchmarks/bench_download_delivery.py --size-mb 50 --clients 8 --threads 4
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from waitress import create_server  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.models.job import Job, Status  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class OccupancyMiddleware:
+    """Record how long each request keeps a worker busy, including the body."""
+
+    def __init__(self, app):
+        self.app = app
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        path = environ.get('PATH_INFO', '')
+        result = self.app(environ, start_response)
+
+        def body():
+            try:
+                yield from result
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+                with self.lock:
+                    self.durations.setdefault(path, []).append(time.perf_counter() - start)
+
+        return body()
+
+
+def make_config(root):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(root, "bench.db")}'
+        JOBS_ROOT = os.path.join(root, 'jobs')
+        THUMBNAILS_DIR = os.path.join(root, 'jobs', 'thumbnails')
+        SECRET_KEY = 'bench'
+    return BenchConfig
+
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', '/staff/login', body=f'password={Config.STAFF_PASSWORD}',
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def download(port, path, cookie, client_mbps, results):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    start = time.perf_counter()
+    conn.request('GET', path, headers={'Cookie': cookie})
+    response = conn.getresponse()
+    received = 0
+    chunk_seconds = (64 * 1024 * 8) / (client_mbps * 1e6) if client_mbps else 0
+    while True:
+        chunk = response.read(64 * 1024)
+        if not chunk:
+            break
+        received += len(chunk)
+        if chunk_seconds:
+            time.sleep(chunk_seconds)
+    results.append({'seconds': time.perf_counter() - start, 'bytes': received,
+                    'x_accel': response.getheader('X-Accel-Redirect')})
+
+
+def probe(port, stop, latencies):
+    while not stop.is_set():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        start = time.perf_counter()
+        conn.request('GET', '/api/status-counts')
+        conn.getresponse().read()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+
+
+def run_mode(mode, args, root):
+    config = make_config(root)
+    config.DOWNLOAD_DELIVERY = mode
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        job = Job.query.first()
+        if job is None:
+            job = Job(student_name='Bench User', student_email='bench@example.com',
+                      filename='BenchUser_PrusaMK4S_Blue_1.stl', original_filename='bench.stl',
+                      status=Status.UPLOADED.value, printer='Prusa MK4S', color='Blue')
+            db.session.add(job)
+            db.session.commit()
+            path = os.path.join(config.JOBS_ROOT, job.status, job.filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(os.urandom(args.size_mb * 1024 * 1024))
+        job_id = job.id
+
+    middleware = OccupancyMiddleware(app.wsgi_app)
+    app.wsgi_app = middleware
+    server = create_server(app, host='127.0.0.1', port=0, threads=args.threads)
+    port = server.effective_port
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        cookie = login(port)
+        results, latencies, stop = [], [], threading.Event()
+        prober = threading.Thread(target=probe, args=(port, stop, latencies))
+        prober.start()
+        start = time.perf_counter()
+        clients = [threading.Thread(target=download,
+                                    args=(port, f'/job/{job_id}/file', cookie, args.client_mbps, results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        wall = time.perf_counter() - start
+        stop.set()
+        prober.join()
+    finally:
+        server.close()
+
+    occupancy = middleware.durations.get(f'/job/{job_id}/file', [])
+    return {
+        'mode': mode,
+        'downloads': len(results),
+        'bytes_from_app': sum(r['bytes'] for r in results),
+        'wall_seconds': round(wall, 3),
+        'worker_seconds_total': round(sum(occupancy), 3),
+        'worker_seconds_mean': round(statistics.mean(occupancy), 4) if occupancy else None,
+        'probe_p50_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        'probe_max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=4, help='waitress worker threads')
+    parser.add_argument('--client-mbps', type=float, default=200,
+                        help='simulated client link speed (0 = unthrottled)')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+    # Queue depth warnings are expected when clients outnumber threads
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as root:
+        results = [run_mode(mode, args, root) for mode in ('send_file', 'x-accel')]
+
+    for result in results:
+        print(f"{result['mode']:>10}: {result['downloads']} downloads, "
+              f"{result['bytes_from_app'] / 1e6:.1f} MB through Python, "
+              f"worker busy {result['worker_seconds_total']}s total "
+              f"({result['worker_seconds_mean']}s each), "
+              f"probe p50 {result['probe_p50_ms']} ms / max {result['probe_max_ms']} ms")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Measure what importing the web app costs a fresh worker process.
+
+Each run starts a new interpreter with ``-X importtime`` and imports
+``--module`` (the app factory module by default), then reports the median
+total import time, the peak RSS of a separate fresh process after the same
+import, the packages whose modules took longest to import, and whether any
+of the rendering stack (trimesh, pyrender, numpy, PIL, OpenGL, scipy) was
+loaded. Web workers should not load the rendering stack; see
+tests/test_import_footprint.py.
+
+Usage:
+    python benchmarks/bench_import.py --repeat 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ('trimesh', 'pyrender', 'numpy', 'PIL', 'OpenGL', 'scipy')
+
+FOOTPRINT_SCRIPT = """
+import json, resource, sys
+import {module}
+try:
+    # ru_maxrss survives fork and exec, so prefer this process's own high-water mark
+    with open('/proc/self/status') as f:
+        rss_mb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+print(json.dumps({{'rss_mb': round(rss_mb, 1),
+                  'heavy': sorted(name for name in {heavy!r} if name in sys.modules)}}))
+"""
+
+
+def import_times(module):
+    """Total import microseconds, and the time spent in each top-level package's
+    own modules, from ``-X importtime``."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    packages = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us)
+        total += int(self_us)
+    return total, packages
+
+
+def footprint(module):
+    """Peak RSS and heavy modules loaded after importing ``module`` in a fresh process."""
+    script = FOOTPRINT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    totals, packages = [], defaultdict(list)
+    for _ in range(args.repeat):
+        total, per_package = import_times(args.module)
+        totals.append(total)
+        for name, micros in per_package.items():
+            packages[name].append(micros)
+    result = dict(footprint(args.module), module=args.module,
+                  import_ms=round(statistics.median(totals) / 1000, 1),
+                  slowest=[{'module': name, 'ms': round(statistics.median(micros) / 1000, 1)}
+                           for name, micros in sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+                           [:args.top]])
+
+    print(f"import {result['module']}: {result['import_ms']} ms, peak RSS {result['rss_mb']} MB")
+    print(f"rendering stack loaded: {', '.join(result['heavy']) or 'none'}")
+    for entry in result['slowest']:
+        print(f"{entry['ms']:>10} ms  {entry['module']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
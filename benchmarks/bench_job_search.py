@@ -0,0 +1,129 @@
+"""Time full-text job search over a large synthetic jobs table.
+
+Seeds a temporary SQLite database with ``--jobs`` rows (through the FTS5
+triggers, like real inserts), then times typical front-desk queries through
+``SearchService.search`` and compares them with a LIKE scan over the same
+columns.
+
+Usage:
+    python benchmarks/bench_job_search.py --jobs 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.services.search_service import SearchService  # noqa: E402
+from config import Config  # noqa: E402
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Skyler',
+               'Maria', 'Wei', 'Priya', 'Omar', 'Sofia', 'Liam', 'Noah', 'Emma', 'Olivia', 'Lucas']
+LAST_NAMES = ['Smith', 'Chen', 'Garcia', 'Patel', 'Nguyen', 'Kim', 'Brown', 'Lopez', 'Martin', 'Khan']
+PARTS = ['bracket', 'gear', 'enclosure', 'hinge', 'mount', 'knob', 'clip', 'housing', 'spacer', 'figurine']
+PRINTERS = ['Prusa MK4S', 'Prusa XL', 'Raise3D Pro 2', 'Formlabs Form 3']
+COLORS = ['Blue', 'Red', 'Black', 'White', 'Green', 'Orange', 'Gray', 'Clear']
+MATERIALS = ['PLA', 'PETG', 'ABS', 'TPU', 'Resin']
+NOTES = ['needs supports', 'for senior design', 'rush please', 'thin walls', '', '', '']
+QUERIES = ['alex blue pla', 'chen', 'gear petg', 'prusa xl red', 'rush', 'mar', 'enclosure black abs',
+           'priya.patel', 'form resin clear', 'zzz-no-match']
+
+
+def make_config(root):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(root, "bench.db")}'
+        JOBS_ROOT = os.path.join(root, 'jobs')
+        THUMBNAILS_DIR = os.path.join(root, 'jobs', 'thumbnails')
+        MAINTENANCE_FOLDER = os.path.join(root, 'maintenance')
+
+        @staticmethod
+        def init_app(app):
+            pass
+    return BenchConfig
+
+
+def seed(count, rng):
+    start = datetime.utcnow() - timedelta(days=365 * 3)
+    rows = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = start + timedelta(minutes=i * 15)
+        rows.append({
+            'student_name': f'{first} {last}',
+            'student_email': f'{first.lower()}.{last.lower()}{rng.randint(1, 99)}@example.edu',
+            'filename': f'{first}{last}_{i}.stl',
+            'original_filename': f'{rng.choice(PARTS)}_v{rng.randint(1, 9)}.stl',
+            'status': 'Completed',
+            'printer': rng.choice(PRINTERS),
+            'color': rng.choice(COLORS),
+            'material': rng.choice(MATERIALS),
+            'notes': rng.choice(NOTES),
+            'reject_reasons': '[]',
+            'created_at': created,
+            'updated_at': created,
+        })
+        if len(rows) == 10000:
+            db.session.execute(Job.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Job.__table__.insert(), rows)
+    db.session.commit()
+
+
+def time_queries(search, repeat):
+    timings = {}
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[query] = {'hits': len(results), 'median_ms': round(statistics.median(samples), 2),
+                          'max_ms': round(max(samples), 2)}
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        app = create_app(make_config(root))
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            seed(args.jobs, random.Random(42))
+            seed_seconds = time.perf_counter() - start
+
+            results = {
+                'jobs': args.jobs,
+                'seed_seconds': round(seed_seconds, 1),
+                'fts': time_queries(lambda q: SearchService.search(q, limit=20), args.repeat),
+                'like': time_queries(lambda q: SearchService._search_like(SearchService.tokenize(q), 20), args.repeat),
+            }
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{args.jobs} jobs seeded in {results['seed_seconds']}s")
+    print(f"{'query':<24}{'hits':>6}{'fts ms':>10}{'like ms':>10}")
+    for query in QUERIES:
+        fts, like = results['fts'][query], results['like'][query]
+        print(f"{query:<24}{fts['hits']:>6}{fts['median_ms']:>10}{like['median_ms']:>10}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
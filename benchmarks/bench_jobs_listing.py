@@ -0,0 +1,139 @@
+"""Time the keyset-paginated jobs listing at different table sizes.
+
+For each ``--sizes`` entry a temporary SQLite database is seeded with that
+many jobs, then the first page, a page deep into the listing (reached through
+its cursor) and a filtered page are timed through
+``JobListingService.list_jobs``, next to the same deep page fetched with
+OFFSET. Keyset pages should take the same time at every size.
+
+Usage:
+    python benchmarks/bench_jobs_listing.py --sizes 1000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db  # noqa: E402
+from app.models.job import Job, Status  # noqa: E402
+from app.services.job_listing_service import JobListingService, LISTING_COLUMNS  # noqa: E402
+from config import Config  # noqa: E402
+
+PRINTERS = ['Prusa MK4S', 'Prusa XL', 'Form 3+']
+MATERIALS = ['PLA', 'PETG', 'ABS', 'TPU', 'Resin']
+STATUSES = [status.value for status in Status]
+
+
+def make_config(root):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(root, "bench.db")}'
+        JOBS_ROOT = os.path.join(root, 'jobs')
+        THUMBNAILS_DIR = os.path.join(root, 'jobs', 'thumbnails')
+        MAINTENANCE_FOLDER = os.path.join(root, 'maintenance')
+
+        @staticmethod
+        def init_app(app):
+            pass
+    return BenchConfig
+
+
+def seed(count, rng):
+    start = datetime.utcnow() - timedelta(days=365 * 3)
+    step = timedelta(days=365 * 3) / count
+    rows = []
+    for i in range(count):
+        created = start + step * i
+        rows.append({
+            'student_name': f'Student {i}',
+            'student_email': f'student{i % 5000}@example.edu',
+            'filename': f'job_{i}.stl',
+            'original_filename': f'part_{i}.stl',
+            'status': rng.choice(STATUSES),
+            'printer': rng.choice(PRINTERS),
+            'color': 'Blue',
+            'material': rng.choice(MATERIALS),
+            'cost': round(rng.uniform(2, 40), 2) if rng.random() < 0.8 else None,
+            'reject_reasons': '[]',
+            'created_at': created,
+            'updated_at': created + timedelta(hours=rng.randint(0, 96)),
+        })
+        if len(rows) == 10000:
+            db.session.execute(Job.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Job.__table__.insert(), rows)
+    db.session.commit()
+
+
+def median_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def cursor_at(depth):
+    """Cursor of the row ``depth`` rows into the listing (found once, not timed)."""
+    row = (db.session.query(*LISTING_COLUMNS).order_by(Job.created_at.desc(), Job.id.desc())
+           .offset(depth - 1).limit(1).one())
+    return JobListingService.encode_cursor('created_at', row.created_at, row.id)
+
+
+def run(size, repeat):
+    with tempfile.TemporaryDirectory() as root:
+        app = create_app(make_config(root))
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            seed(size, random.Random(42))
+            seed_seconds = round(time.perf_counter() - start, 1)
+
+            depth = size * 9 // 10
+            after = cursor_at(depth)
+            page_size = JobListingService.PAGE_SIZE
+            result = {
+                'jobs': size,
+                'seed_seconds': seed_seconds,
+                'first_page_ms': median_ms(lambda: JobListingService.list_jobs(), repeat),
+                'deep_page_ms': median_ms(lambda: JobListingService.list_jobs(after=after), repeat),
+                'deep_offset_ms': median_ms(
+                    lambda: db.session.query(*LISTING_COLUMNS)
+                    .order_by(Job.created_at.desc(), Job.id.desc()).offset(depth).limit(page_size).all(),
+                    repeat),
+                'filtered_page_ms': median_ms(
+                    lambda: JobListingService.list_jobs({'status': 'Printing', 'material': 'PETG'}), repeat),
+                'cost_page_ms': median_ms(lambda: JobListingService.list_jobs(sort='cost'), repeat),
+            }
+            db.session.remove()
+            db.engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = [run(size, args.repeat) for size in args.sizes]
+    columns = ('first_page_ms', 'deep_page_ms', 'deep_offset_ms', 'filtered_page_ms', 'cost_page_ms')
+    print(f"{'jobs':>9}" + ''.join(f'{column:>18}' for column in columns))
+    for result in results:
+        print(f"{result['jobs']:>9}" + ''.join(f'{result[column]:>18}' for column in columns))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Simulate scheduling a backlog of confirmed jobs across a printer fleet.
+
+A fleet of ``--printers`` units of the lab's three models and ``--jobs``
+confirmed jobs with random materials, colors, footprints and print times are
+generated, then ``SchedulerService.plan`` is timed and its plan compared with
+plain first-come-first-served dispatch (each job, oldest first, goes to the
+compatible printer that frees up first, whatever is loaded on it). Both pay
+the same changeover time; the comparison shows what batching by material
+and color saves.
+
+Usage:
+    python benchmarks/bench_scheduler.py --printers 20 --jobs 1000
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.printer import fits_build_volume  # noqa: E402
+from app.services.scheduler_service import SchedulerService  # noqa: E402
+
+FDM = ['PLA', 'PETG', 'ABS', 'TPU']
+MODELS = [
+    # model, build volume, materials, share of the fleet
+    ('Prusa MK4S', (250, 210, 220), FDM, 0.6),
+    ('Prusa XL', (360, 360, 360), FDM, 0.25),
+    ('Form 3+', (145, 145, 185), ['Resin'], 0.15),
+]
+COLORS = ['Black', 'White', 'Gray', 'Blue', 'Red']
+
+
+def make_fleet(count, rng):
+    printers = []
+    for i in range(count):
+        model, build, materials, _ = rng.choices(MODELS, weights=[m[3] for m in MODELS])[0]
+        printers.append({
+            'id': i + 1, 'model': model, 'build': build, 'materials': materials,
+            'free_at': rng.choice([0, 0, rng.uniform(0, 240)]),
+            'loaded': (rng.choice(materials), rng.choice(COLORS)),
+        })
+    return printers
+
+
+def make_jobs(count, rng):
+    jobs = []
+    for i in range(count):
+        model, build, materials, _ = rng.choices(MODELS, weights=[m[3] for m in MODELS])[0]
+        # Most parts are small; a few need most of the plate
+        scale = rng.choice([0.1, 0.2, 0.3, 0.5, 0.9])
+        jobs.append({
+            'id': i + 1,
+            'printer': model if rng.random() < 0.7 else 'Any',
+            'material': rng.choice(materials),
+            'color': rng.choice(COLORS[:2]) if rng.random() < 0.7 else rng.choice(COLORS),
+            'time_min': rng.randint(20, 600),
+            'extents': tuple(round(side * scale * rng.uniform(0.5, 1), 1) for side in build),
+            'ready': -float(count - i),
+        })
+    return jobs
+
+
+def fcfs(printers, jobs, changeover_minutes):
+    """Oldest job first onto the compatible printer that frees up first."""
+    free = [(printer['free_at'], i) for i, printer in enumerate(printers)]
+    loaded = [printer['loaded'] for printer in printers]
+    queues = {printer['id']: [] for printer in printers}
+    for job in sorted(jobs, key=lambda job: job['ready']):
+        skipped = []
+        while free:
+            free_at, i = heapq.heappop(free)
+            printer = printers[i]
+            if (job['printer'] in ('Any', printer['model']) and job['material'] in printer['materials']
+                    and fits_build_volume(printer['build'], job['extents'])):
+                break
+            skipped.append((free_at, i))
+        else:
+            free = skipped
+            heapq.heapify(free)
+            continue
+        group = (job['material'], job['color'])
+        changeover = 0 if group == loaded[i] else changeover_minutes
+        loaded[i] = group
+        start = free_at + changeover
+        queues[printer['id']].append({'job_id': job['id'], 'start': start, 'end': start + job['time_min'],
+                                      'changeover': bool(changeover)})
+        for entry in skipped + [(start + job['time_min'], i)]:
+            heapq.heappush(free, entry)
+    return {'queues': queues}
+
+
+def summarize(result, jobs):
+    entries = [entry for queue in result['queues'].values() for entry in queue]
+    ready = {job['id']: job['ready'] for job in jobs}
+    return {
+        'scheduled': len(entries),
+        'changeovers': sum(entry['changeover'] for entry in entries),
+        'makespan_hours': round(max((entry['end'] for entry in entries), default=0) / 60, 1),
+        'mean_wait_hours': round(statistics.mean(entry['start'] - ready[entry['job_id']] for entry in entries) / 60, 1),
+    }
+
+
+def run(printer_count, job_count, changeover_minutes, repeat, seed):
+    rng = random.Random(seed)
+    printers = make_fleet(printer_count, rng)
+    jobs = make_jobs(job_count, rng)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        planned = SchedulerService.plan(printers, jobs, changeover_minutes)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'printers': printer_count,
+        'jobs': job_count,
+        'plan_ms': round(statistics.median(samples), 2),
+        'unschedulable': len(planned['unschedulable']),
+        'scheduler': summarize(planned, jobs),
+        'fcfs': summarize(fcfs(printers, jobs, changeover_minutes), jobs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--printers', type=int, nargs='+', default=[20])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--changeover', type=float, default=30)
+    parser.add_argument('--repeat', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = [run(printers, jobs, args.changeover, args.repeat, args.seed)
+               for printers in args.printers for jobs in args.jobs]
+    print(f"{'printers':>9}{'jobs':>7}{'plan_ms':>9}  {'':<10}{'changeovers':>12}{'makespan_h':>11}{'mean_wait_h':>12}")
+    for result in results:
+        for name in ('scheduler', 'fcfs'):
+            stats = result[name]
+            print(f"{result['printers']:>9}{result['jobs']:>7}{result['plan_ms'] if name == 'scheduler' else '':>9}  "
+                  f"{name:<10}{stats['changeovers']:>12}{stats['makespan_hours']:>11}{stats['mean_wait_hours']:>12}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Microbenchmarks of the services and hot paths, for pytest-benchmark.
+
+Covers filename generation, cost calculation, file moves, upload saves,
+token round-trips, approval email rendering, dashboard rendering with N jobs
+and thumbnail rendering per mesh size. Inputs come from a fixed seed, so runs
+on the same machine are comparable. The file is named so that the regular test
+run does not collect it; pass it to pytest explicitly and keep the JSON, then
+compare two runs with ``benchmarks/compare_benchmarks.py``.
+
+Thumbnail benchmarks are skipped when no OpenGL context can be created. On
+headless Linux they render through EGL unless ``PYOPENGL_PLATFORM`` is set.
+
+Usage:
+    pytest benchmarks/bench_services.py --benchmark-json=bench-new.json
+    python benchmarks/compare_benchmarks.py bench-base.json bench-new.json --threshold 15
+"""
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    # Must be set before pyrender first imports OpenGL
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+
+from werkzeug.datastructures import FileStorage  # noqa: E402
+from app import create_app, db, mail  # noqa: E402
+from app.models.job import Job, Status  # noqa: E402
+from app.services.email_service import EmailService  # noqa: E402
+from app.services.file_service import FileService  # noqa: E402
+from app.services.thumbnail_service import ThumbnailService  # noqa: E402
+from app.services.token_service import TokenService, _token_state  # noqa: E402
+from config import Config  # noqa: E402
+
+SEED = 20240601
+PRINTERS = ('Prusa MK4S', 'Prusa XL', 'Raise3D Pro 2 Plus', 'Formlabs Form 3')
+COLORS = ('Black', 'White', 'Blue', 'Red', 'Orange', 'Clear')
+STATUSES = (Status.UPLOADED, Status.PENDING, Status.CONFIRMED, Status.PRINTING, Status.COMPLETED)
+
+
+@pytest.fixture
+def app(tmp_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        JOBS_ROOT = str(tmp_path / 'jobs')
+        THUMBNAILS_DIR = str(tmp_path / 'jobs' / 'thumbnails')
+        SECRET_KEY = 'bench'
+        MAIL_SUPPRESS_SEND = True
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_job(**fields):
+    values = dict(student_name='Bench Student', student_email='bench@example.edu', filename='BenchStudent_1.stl',
+                  original_filename='part.stl', printer='Prusa MK4S', color='Blue', material='PLA')
+    values.update(fields)
+    job = Job(**values)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def seed_jobs(count):
+    rng = random.Random(SEED)
+    jobs = []
+    for i in range(count):
+        status = rng.choice(STATUSES)
+        jobs.append(Job(student_name=f'Student {i}', student_email=f'student{i}@example.edu',
+                        filename=f'Student{i}_Filament_Blue_{i}.stl', original_filename=f'part_{i}.stl',
+                        printer=rng.choice(PRINTERS), color=rng.choice(COLORS), material='PLA',
+                        status=status.value, weight_g=round(rng.uniform(5, 300), 1),
+                        time_min=rng.randint(20, 900), cost=round(rng.uniform(2, 30), 2)))
+    db.session.add_all(jobs)
+    db.session.commit()
+
+
+def write_file(app, status, filename, size):
+    path = os.path.join(app.config['JOBS_ROOT'], status, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(random.Random(SEED).randbytes(size))
+    return path
+
+
+def test_secure_job_filename(benchmark, app):
+    rng = random.Random(SEED)
+    names = [(f'Student Näme {rng.randint(0, 10 ** 6)}', rng.choice(PRINTERS), rng.choice(COLORS),
+              f'My Part (v{i}).STL') for i in range(100)]
+
+    def generate():
+        for name in names:
+            FileService.secure_job_filename(*name)
+
+    benchmark(generate)
+
+
+def test_calculate_cost(benchmark, app):
+    job = Job(weight_g=42.5, time_min=185, material='PLA')
+    assert benchmark(job.calculate_cost) > 0
+
+
+@pytest.mark.parametrize('size_mb', [1, 25])
+def test_move_file(benchmark, app, size_mb):
+    write_file(app, Status.UPLOADED.value, 'move.stl', size_mb * 1024 * 1024)
+
+    def round_trip():
+        assert FileService.move_file('move.stl', Status.UPLOADED, Status.PENDING)
+        assert FileService.move_file('move.stl', Status.PENDING, Status.UPLOADED)
+
+    benchmark(round_trip)
+
+
+@pytest.mark.parametrize('size_mb', [1, 10, 50])
+def test_save_uploaded_file(benchmark, app, size_mb):
+    data = random.Random(SEED).randbytes(size_mb * 1024 * 1024)
+    benchmark.extra_info['bytes'] = len(data)
+
+    def save():
+        upload = FileStorage(stream=io.BytesIO(data), filename='upload.stl')
+        assert FileService.save_uploaded_file(upload, Status.UPLOADED.value, 'upload.stl')
+
+    benchmark(save)
+
+
+def test_token_round_trip(benchmark, app):
+    job = make_job()
+    _, cache = _token_state()
+
+    def round_trip():
+        cache._verified.clear()  # measure the signature check, not a cache hit
+        assert TokenService.verify_token(TokenService.generate_token(job)) == (job.id, None)
+
+    benchmark(round_trip)
+
+
+def test_token_verify_cached(benchmark, app):
+    token = TokenService.generate_token(make_job())
+    TokenService.verify_token(token)
+    benchmark(TokenService.verify_token, token)
+
+
+def test_approval_email_render(benchmark, app):
+    job = make_job(weight_g=42.5, time_min=185, cost=12.35)
+
+    def render():
+        with app.test_request_context(), mail.record_messages() as outbox:
+            EmailService.send_job_approval_email(
+                student_email=job.student_email, filename=job.original_filename, cost=job.cost,
+                hours=3, minutes=5, material=job.material,
+                confirm_url=f'https://print.example.edu/job/confirm/{TokenService.generate_token(job)}',
+                estimated_completion='Thursday afternoon')
+            return outbox[0].as_bytes()
+
+    assert b'confirm' in benchmark(render)
+
+
+@pytest.mark.parametrize('jobs', [100, 1000])
+def test_dashboard_render(benchmark, app, jobs):
+    seed_jobs(jobs)
+    client = app.test_client()
+    client.post('/staff/login', data={'password': app.config['STAFF_PASSWORD']})
+
+    def render():
+        response = client.get('/dashboard')
+        assert response.status_code == 200
+        return response
+
+    benchmark(render)
+
+
+@pytest.mark.parametrize('subdivisions', [3, 5, 7])  # 1,280, 20,480 and 327,680 faces
+def test_thumbnail_render(benchmark, app, subdivisions):
+    import trimesh
+    mesh = trimesh.creation.icosphere(subdivisions=subdivisions, radius=40)
+    job = make_job(filename=f'sphere_{subdivisions}.stl')
+    mesh.export(write_file(app, Status.UPLOADED.value, job.filename, 0))
+    benchmark.extra_info['faces'] = len(mesh.faces)
+    if ThumbnailService.generate_thumbnail(job) is None:
+        pytest.skip('thumbnail rendering is unavailable (no OpenGL context)')
+
+    benchmark.pedantic(ThumbnailService.generate_thumbnail, args=(job,), rounds=5, warmup_rounds=1)
@@ -0,0 +1,60 @@
+"""Compare two pytest-benchmark JSON files and flag regressions.
+
+Matches benchmarks by name and compares one statistic (the median by
+default). A benchmark whose statistic grew by more than ``--threshold``
+percent is a regression, and the exit status is 1 if there is any.
+Benchmarks that exist in only one of the files are listed but never fail
+the comparison.
+
+Usage:
+    python benchmarks/compare_benchmarks.py bench-base.json bench-new.json --threshold 15
+"""
+import argparse
+import json
+import sys
+
+
+def load(path, stat):
+    with open(path) as f:
+        data = json.load(f)
+    return {bench['name']: bench['stats'][stat] for bench in data['benchmarks']}
+
+
+def compare(baseline, current, threshold):
+    """``(name, old, new, change)`` for benchmarks in both runs, and the regressed names."""
+    rows, regressions = [], []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append((name, old, new, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10, help='allowed slowdown in percent')
+    parser.add_argument('--stat', default='median', choices=('min', 'median', 'mean', 'max'))
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline, args.stat), load(args.current, args.stat)
+    rows, regressions = compare(baseline, current, args.threshold)
+
+    print(f"{'benchmark':<40}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, old, new, change in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:<40}{old * 1000:>14.3f}{new * 1000:>14.3f}{change:>9.1f}%{flag}')
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f'{name:<40} missing from {args.current}')
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f'{name:<40} new, no baseline')
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:g}% in {args.stat}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+"""Replay a mix of lab traffic against the app and report per-route latency.
+
+Starts the app under waitress on a local port, with its mail going to a local
+SMTP sink, and runs ``--users`` virtual users for ``--duration`` seconds.
+Each user repeatedly picks an action by weight:
+
+- ``submit``: a student uploads a synthetic binary STL (sizes drawn from
+  ``--sizes-kb``)
+- ``dashboard``, ``jobs``, ``status``: staff poll the dashboard, the jobs list
+  and ``/api/status-counts``
+- ``approve``: staff approve an uploaded job, which emails a confirmation link
+- ``confirm``: a student opens a link caught by the sink and confirms
+- ``download``: staff download an uploaded job's file
+
+Approvals and confirmations only run when there is work for them; until then
+the user polls the dashboard instead. The report lists throughput, p50/p95/p99
+latency and the error rate of every route. ``--out`` writes it as JSON, and
+``--baseline`` compares the run against an earlier file: a route whose p95
+grew, or whose throughput fell, by more than ``--threshold`` percent, or whose
+error rate rose, is listed as a regression and the exit status is 1.
+
+To load a running deployment instead, pass ``--url`` and point its
+``MAIL_SERVER``/``MAIL_PORT`` at the sink (``--smtp-port``).
+
+Usage:
+    python benchmarks/load_test.py --users 8 --duration 60 --out load.json
+    python benchmarks/load_test.py --users 8 --duration 60 --baseline load.json
+"""
+import argparse
+import email
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config  # noqa: E402
+
+DEFAULT_MIX = 'submit=15,dashboard=30,jobs=10,status=20,approve=10,confirm=8,download=7'
+CONFIRM_RE = re.compile(r'/job/confirm/([A-Za-z0-9_.\-]+)')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Accept mail like an SMTP server and keep it, so confirmation links can be followed."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(('127.0.0.1', port), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.confirm_tokens = deque()
+
+    def deliver(self, data):
+        message = email.message_from_bytes(data)
+        parts = message.walk() if message.is_multipart() else [message]
+        text = ' '.join((part.get_payload(decode=True) or b'').decode('utf-8', 'replace')
+                        for part in parts if not part.is_multipart())
+        with self.lock:
+            self.received += 1
+            self.confirm_tokens.extend(dict.fromkeys(CONFIRM_RE.findall(text)))
+
+    def take_token(self):
+        with self.lock:
+            return self.confirm_tokens.popleft() if self.confirm_tokens else None
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 load-test sink')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith('DATA'):
+                self.reply('354 end with <CRLF>.<CRLF>')
+                lines = []
+                for raw in iter(self.rfile.readline, b''):
+                    if raw in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(raw[1:] if raw.startswith(b'..') else raw)
+                self.server.deliver(b''.join(lines))
+                self.reply('250 queued')
+            elif command.startswith('QUIT'):
+                self.reply('221 bye')
+                return
+            else:
+                # EHLO, HELO, MAIL, RCPT, RSET and NOOP all succeed
+                self.reply('250 ok')
+
+
+def synthetic_stl(size_kb, rng):
+    """A binary STL of about ``size_kb`` kilobytes.
+
+    Small triangles scattered over a 40 mm sphere, so the mesh covers the
+    thumbnail about as a real part does instead of filling it many times over.
+    """
+    count = max(1, (size_kb * 1024 - 84) // 50)
+    header = b'load-test'.ljust(80, b' ') + struct.pack('<I', count)
+    triangle = struct.Struct('<12fH')
+    body = bytearray()
+    for _ in range(count):
+        x, y, z = (rng.gauss(0, 1) for _ in range(3))
+        scale = 40 / (math.sqrt(x * x + y * y + z * z) or 1)
+        center = (50 + x * scale, 50 + y * scale, 50 + z * scale)
+        vertices = [c + rng.uniform(-1.5, 1.5) for _ in range(3) for c in center]
+        body += triangle.pack(0.0, 0.0, 1.0, *vertices, 0)
+    return header + bytes(body)
+
+
+def multipart(fields, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Latencies and errors per route, shared by all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, route, seconds, ok):
+        with self.lock:
+            latencies, errors = self.samples.setdefault(route, ([], [0]))
+            latencies.append(seconds)
+            errors[0] += not ok
+
+    def report(self, elapsed):
+        routes = {}
+        for route, (latencies, errors) in sorted(self.samples.items()):
+            ordered = sorted(latencies)
+            routes[route] = {
+                'requests': len(ordered),
+                'errors': errors[0],
+                'error_rate': round(errors[0] / len(ordered), 4),
+                'rps': round(len(ordered) / elapsed, 2),
+                **{f'p{pct}_ms': round(percentile(ordered, pct) * 1000, 2) for pct in (50, 95, 99)},
+                'max_ms': round(ordered[-1] * 1000, 2),
+            }
+        total = sum(route['requests'] for route in routes.values())
+        errors = sum(route['errors'] for route in routes.values())
+        return {
+            'requests': total,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'rps': round(total / elapsed, 2),
+        }, routes
+
+
+class VirtualUser(threading.Thread):
+    """One client connection replaying weighted actions until told to stop."""
+
+    def __init__(self, target, cookie, mix, uploads, sink, shared, recorder, stop, seed):
+        super().__init__(daemon=True)
+        self.target = target
+        self.cookie = cookie
+        self.mix = mix
+        self.uploads = uploads
+        self.sink = sink
+        self.shared = shared
+        self.recorder = recorder
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.conn = None
+
+    def request(self, route, method, path, body=None, headers=None, expect=(200,), location=None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.target.hostname, self.target.port, timeout=60)
+            self.conn.request(method, self.target.path.rstrip('/') + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            ok = response.status in expect and (
+                location is None or urlsplit(response.getheader('Location', '')).path.endswith(location))
+        except (OSError, http.client.HTTPException):
+            self.conn = None
+            response, data, ok = None, b'', False
+        self.recorder.add(route, time.perf_counter() - start, ok)
+        return response, data
+
+    def run(self):
+        actions, weights = zip(*self.mix.items())
+        while not self.stop.is_set():
+            getattr(self, 'do_' + self.rng.choices(actions, weights)[0])()
+
+    def do_submit(self):
+        size_kb, content = self.rng.choice(self.uploads)
+        tag = 'lt' + uuid.uuid4().hex[:12]
+        body, content_type = multipart({
+            'student_name': f'Load {tag}',
+            'student_email': f'{tag}@example.edu',
+            'printer': 'Prusa MK4S',
+            'color': 'Blue',
+            'material': 'PLA',
+        }, f'part_{size_kb}kb.stl', content)
+        response, _ = self.request('POST /submit', 'POST', '/submit', body, {'Content-Type': content_type},
+                                   expect=(302,), location='/submission-confirmed')
+        if response is not None and response.status == 302:
+            self.shared.put('tags', tag)
+
+    def do_dashboard(self):
+        self.request('GET /dashboard', 'GET', '/dashboard')
+
+    def do_jobs(self):
+        self.request('GET /jobs', 'GET', '/jobs')
+
+    def do_status(self):
+        self.request('GET /api/status-counts', 'GET', '/api/status-counts')
+
+    def uploaded_job(self):
+        """The tag and id of a job this run submitted that is still Uploaded, if any."""
+        tag = self.shared.take('tags')
+        if tag is None:
+            return None, None
+        response, data = self.request('GET /api/jobs/search', 'GET', f'/api/jobs/search?q={tag}')
+        if response is None or response.status != 200:
+            return None, None
+        results = json.loads(data)['results']
+        return (tag, results[0]['id']) if results and results[0]['status'] == 'Uploaded' else (None, None)
+
+    def do_approve(self):
+        _, job_id = self.uploaded_job()
+        if job_id is None:
+            return self.do_dashboard()
+        body = 'weight_g=25&time_min=90&printer=Prusa+MK4S&material=PLA&color=Blue'
+        self.request('POST /job/<id>/approve', 'POST', f'/job/{job_id}/approve', body,
+                     {'Content-Type': 'application/x-www-form-urlencoded'}, expect=(302,), location='/jobs')
+
+    def do_confirm(self):
+        token = self.sink.take_token() if self.sink else None
+        if token is None:
+            return self.do_dashboard()
+        path = f'/job/confirm/{token}'
+        response, _ = self.request('GET /job/confirm/<token>', 'GET', path)
+        if response is not None and response.status == 200:
+            self.request('POST /job/confirm/<token>', 'POST', path, b'',
+                         {'Content-Type': 'application/x-www-form-urlencoded'})
+
+    def do_download(self):
+        tag, job_id = self.uploaded_job()
+        if job_id is None:
+            return self.do_dashboard()
+        self.request('GET /job/<id>/file', 'GET', f'/job/{job_id}/file')
+        self.shared.put('tags', tag)  # still Uploaded, so it can be approved later
+
+
+class SharedWork:
+    """Job tags handed between users: submissions feed approvals and downloads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues = {}
+
+    def put(self, name, item):
+        if item is not None:
+            with self.lock:
+                self.queues.setdefault(name, deque()).append(item)
+
+    def take(self, name):
+        with self.lock:
+            queue = self.queues.get(name)
+            return queue.popleft() if queue else None
+
+
+def login(target):
+    conn = http.client.HTTPConnection(target.hostname, target.port)
+    conn.request('POST', target.path.rstrip('/') + '/staff/login', body=f'password={Config.STAFF_PASSWORD}',
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie')
+    if response.status != 302 or not cookie:
+        raise SystemExit(f'staff login failed with HTTP {response.status}')
+    return cookie.split(';', 1)[0]
+
+
+def start_local_app(root, args, smtp_port):
+    from waitress import create_server
+    from app import create_app, db
+
+    class LoadTestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url or f'sqlite:///{os.path.join(root, "load.db")}'
+        JOBS_ROOT = os.path.join(root, 'jobs')
+        THUMBNAILS_DIR = os.path.join(root, 'jobs', 'thumbnails')
+        SECRET_KEY = 'load-test'
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = smtp_port
+        MAIL_USE_TLS = False
+        RATE_LIMIT_ENABLED = False  # every virtual user submits from the same address
+
+    app = create_app(LoadTestConfig)
+    with app.app_context():
+        db.create_all()
+    server = create_server(app, host='127.0.0.1', port=0, threads=args.threads)
+    threading.Thread(target=server.run, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.effective_port}'
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if not hasattr(VirtualUser, 'do_' + name.strip()):
+            raise SystemExit(f'unknown action in --mix: {name}')
+        if float(weight) > 0:
+            mix[name.strip()] = float(weight)
+    return mix
+
+
+def compare(result, baseline, threshold):
+    """Routes that got slower, handled less traffic or failed more than in ``baseline``."""
+    regressions = []
+    for route, old in baseline['routes'].items():
+        new = result['routes'].get(route)
+        if new is None:
+            continue
+        if old['p95_ms'] and new['p95_ms'] > old['p95_ms'] * (1 + threshold / 100):
+            regressions.append(f"{route}: p95 {old['p95_ms']} -> {new['p95_ms']} ms")
+        if old['rps'] and new['rps'] < old['rps'] * (1 - threshold / 100):
+            regressions.append(f"{route}: throughput {old['rps']} -> {new['rps']} req/s")
+        if new['error_rate'] > old['error_rate']:
+            regressions.append(f"{route}: error rate {old['error_rate']:.2%} -> {new['error_rate']:.2%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='action=weight pairs')
+    parser.add_argument('--sizes-kb', default='50,500,2000,8000', help='synthetic STL sizes')
+    parser.add_argument('--threads', type=int, default=4, help='waitress worker threads (local instance)')
+    parser.add_argument('--database-url', help='database for the local instance (default: sqlite in a temp dir)')
+    parser.add_argument('--url', help='load this running instance instead of starting one')
+    parser.add_argument('--smtp-port', type=int, default=0, help='port of the SMTP sink (default: any free port)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results from an earlier run')
+    parser.add_argument('--threshold', type=float, default=20, help='allowed regression in percent')
+    args = parser.parse_args()
+    # Queue depth warnings are expected when users outnumber threads
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    uploads = [(size, synthetic_stl(size, rng)) for size in map(int, args.sizes_kb.split(','))]
+    sink = SMTPSink(args.smtp_port)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as root:
+        server = None
+        if args.url:
+            url = args.url
+        else:
+            server, url = start_local_app(root, args, sink.server_address[1])
+        try:
+            target = urlsplit(url)
+            cookie = login(target)
+            recorder, shared, stop = Recorder(), SharedWork(), threading.Event()
+            users = [VirtualUser(target, cookie, mix, uploads, sink, shared, recorder, stop, args.seed + i)
+                     for i in range(args.users)]
+            start = time.perf_counter()
+            for user in users:
+                user.start()
+            time.sleep(args.duration)
+            stop.set()
+            for user in users:
+                user.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            if server is not None:
+                time.sleep(0.5)  # let workers finish the responses users already read
+                server.close()
+            sink.shutdown()
+
+    totals, routes = recorder.report(elapsed)
+    result = {
+        'meta': {
+            'target': args.url or 'local',
+            'users': args.users,
+            'threads': None if args.url else args.threads,
+            'duration_s': round(elapsed, 2),
+            'mix': mix,
+            'sizes_kb': [size for size, _ in uploads],
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - elapsed)),
+        },
+        'totals': dict(totals, emails=sink.received),
+        'routes': routes,
+    }
+
+    print(f"{totals['requests']} requests in {elapsed:.1f}s ({totals['rps']} req/s), "
+          f"{totals['errors']} errors, {sink.received} emails caught")
+    print(f"{'route':<28}{'req':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>9}")
+    for route, stats in routes.items():
+        print(f"{route:<28}{stats['requests']:>7}{stats['rps']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['error_rate']:>9.1%}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     INSTANCE_DIR = os.path.join(BASE_DIR, 'instance')
     JOBS_ROOT = os.path.join(BASE_DIR, 'jobs')
+    THUMBNAILS_DIR = os.path.join(JOBS_ROOT, 'thumbnails')
     
     # Status folders
     UPLOADED_FOLDER = 'Uploaded'
@@ -39,6 +40,11 @@ class Config:
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
     ALLOWED_EXTENSIONS = {'stl', 'obj', '3mf'}
     
+    # File downloads: 'send_file' (always stream from Python), 'x-accel' (always
+    # hand off to nginx) or 'auto' (hand off when nginx sends X-Sendfile-Type)
+    DOWNLOAD_DELIVERY = os.environ.get('DOWNLOAD_DELIVERY', 'auto')
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '/uploads/')
+    
     # Email Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'localhost')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 8025))
@@ -53,10 +59,72 @@ class Config:
     # Staff Authentication
     STAFF_PASSWORD = os.environ.get('STAFF_PASSWORD') or 'staff_password' # IMPORTANT: Change default in production or set via ENV!
     
+    # Bearer token required on /metrics; unset leaves it open (restrict it in nginx.conf)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Status counts cache (seconds between reconciles against the DB)
+    STATUS_COUNT_RECONCILE_SECONDS = int(os.environ.get('STATUS_COUNT_RECONCILE_SECONDS', 60))
+    
+    # Turnaround estimates (days of job history used, seconds between reconciles against the DB)
+    TURNAROUND_HISTORY_DAYS = int(os.environ.get('TURNAROUND_HISTORY_DAYS', 90))
+    TURNAROUND_RECONCILE_SECONDS = int(os.environ.get('TURNAROUND_RECONCILE_SECONDS', 300))
+    
+    # Verified confirmation tokens remembered per worker (entries, seconds)
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 300))
+    
+    # Print queue scheduling (minutes a material or color swap costs a printer)
+    SCHEDULER_CHANGEOVER_MINUTES = int(os.environ.get('SCHEDULER_CHANGEOVER_MINUTES', 30))
+    
+    # Submission limits: token buckets per client IP and per student email
+    # (burst, refills per hour; 0 disables one), kept per worker ('memory') or
+    # shared through the database ('database'); uploads processed at once per
+    # worker (0 = no cap) and seconds a submission may wait for a free slot.
+    # Behind a reverse proxy, set TRUSTED_PROXY_COUNT so the client IP is read
+    # from X-Forwarded-For.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    SUBMIT_IP_BURST = int(os.environ.get('SUBMIT_IP_BURST', 20))
+    SUBMIT_IP_PER_HOUR = int(os.environ.get('SUBMIT_IP_PER_HOUR', 60))
+    SUBMIT_EMAIL_BURST = int(os.environ.get('SUBMIT_EMAIL_BURST', 5))
+    SUBMIT_EMAIL_PER_HOUR = int(os.environ.get('SUBMIT_EMAIL_PER_HOUR', 20))
+    SUBMIT_MAX_CONCURRENT = int(os.environ.get('SUBMIT_MAX_CONCURRENT', 1))
+    SUBMIT_ADMISSION_WAIT = float(os.environ.get('SUBMIT_ADMISSION_WAIT', 2))
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    
+    # Also write AVIF thumbnails (smaller than WebP, but slower to encode)
+    THUMBNAIL_AVIF = os.environ.get('THUMBNAIL_AVIF', 'false').lower() == 'true'
+    
+    # Student status page: links emailed per address (burst, per hour), seconds
+    # before queue estimates on a cached page are recomputed, pages cached per worker
+    STATUS_LINK_BURST = int(os.environ.get('STATUS_LINK_BURST', 3))
+    STATUS_LINK_PER_HOUR = int(os.environ.get('STATUS_LINK_PER_HOUR', 6))
+    STUDENT_STATUS_CACHE_SECONDS = int(os.environ.get('STUDENT_STATUS_CACHE_SECONDS', 60))
+    STUDENT_STATUS_CACHE_SIZE = int(os.environ.get('STUDENT_STATUS_CACHE_SIZE', 1024))
+    
+    # Serving (python -m app.serve): worker processes, waitress threads and open
+    # connections per worker, seconds before an idle connection is closed,
+    # requests before a worker is recycled (0 = never, plus up to the jitter so
+    # workers do not restart together) and seconds a draining worker may take
+    SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.environ.get('SERVER_PORT', 8080))
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 2))
+    WAITRESS_THREADS = int(os.environ.get('WAITRESS_THREADS', 8))
+    WAITRESS_CONNECTION_LIMIT = int(os.environ.get('WAITRESS_CONNECTION_LIMIT', 200))
+    WAITRESS_CHANNEL_TIMEOUT = int(os.environ.get('WAITRESS_CHANNEL_TIMEOUT', 120))
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 1000))
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 100))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+    
     # Maintenance
     MAINTENANCE_FOLDER = os.path.join(BASE_DIR, 'maintenance')
     DISK_SPACE_THRESHOLD = 0.9
     
+    # Compressed archival tier (zstd level, archiver threads, read limit in bytes/s; 0 = unthrottled)
+    ARCHIVE_ZSTD_LEVEL = int(os.environ.get('ARCHIVE_ZSTD_LEVEL', 10))
+    ARCHIVE_WORKERS = int(os.environ.get('ARCHIVE_WORKERS', 2))
+    ARCHIVE_IO_BYTES_PER_SECOND = int(os.environ.get('ARCHIVE_IO_BYTES_PER_SECOND', 20 * 1024 * 1024))
+    
     # Create required directories
     @staticmethod
     def init_app(app):
@@ -67,6 +135,9 @@ class Config:
         for folder in Config.STATUS_FOLDERS:
             os.makedirs(os.path.join(Config.JOBS_ROOT, folder), exist_ok=True)
         
+        # Create thumbnails directory
+        os.makedirs(Config.THUMBNAILS_DIR, exist_ok=True)
+        
         # Create maintenance directory
         os.makedirs(Config.MAINTENANCE_FOLDER, exist_ok=True)
 
@@ -83,6 +154,7 @@ class TestingConfig(Config):
     SERVER_NAME = 'localhost:5000'
     APPLICATION_ROOT = '/'
     PREFERRED_URL_SCHEME = 'http'
+    RATE_LIMIT_ENABLED = False  # tests that cover the limits enable it
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
@@ -58,6 +58,12 @@ def get_metadata():
     return target_metadata_obj
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the SQLite FTS5 search table and its shadow tables (jobs_fts_data,
+    jobs_fts_idx, ...); they are created by raw DDL and not in the metadata."""
+    return not (type_ == 'table' and name.startswith('jobs_fts'))
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -72,7 +78,8 @@ def run_migrations_offline():
     """
     url = flask_app_instance.config.get('SQLALCHEMY_DATABASE_URI')
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -102,6 +109,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=get_metadata(),
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
 
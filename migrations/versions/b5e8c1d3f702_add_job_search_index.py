@@ -0,0 +1,39 @@
+"""Add full-text search index over jobs
+
+Revision ID: b5e8c1d3f702
+Revises: 9b2d4f6a8c13
+Create Date: 2026-10-19 05:30:00.000000
+
+"""
+from alembic import op
+from app.services.search_service import SQLITE_DDL, SQLITE_DROP_DDL, POSTGRES_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8c1d3f702'
+down_revision = '9b2d4f6a8c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Index the jobs that already exist
+        op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        for statement in SQLITE_DROP_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_jobs_search')
@@ -0,0 +1,55 @@
+"""Keep the status of archived jobs and mark the archive with archived_at
+
+Revision ID: e7b3d1f4a826
+Revises: d4f8a2c6e913
+Create Date: 2026-10-20 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3d1f4a826'
+down_revision = 'd4f8a2c6e913'
+branch_labels = None
+depends_on = None
+
+# Jobs archived before the event log existed have no transition to read the
+# outcome from; those with rejection reasons were rejected
+RESTORE_STATUS = """
+UPDATE jobs SET archived_at = updated_at, status = COALESCE(
+    (SELECT e.from_status FROM job_events e
+     WHERE e.job_id = jobs.id AND e.to_status = 'Archived'
+     ORDER BY e.id DESC LIMIT 1),
+    CASE WHEN reject_reasons IS NOT NULL AND reject_reasons != '[]' THEN 'Rejected' ELSE 'Completed' END)
+WHERE status = 'Archived'
+"""
+
+REBUILD_STATUS_USAGE = (
+    "DELETE FROM storage_usage WHERE scope = 'status'",
+    "INSERT INTO storage_usage (scope, key, bytes, files) "
+    "SELECT 'status', status, COALESCE(SUM(file_size), 0), COUNT(id) FROM jobs GROUP BY status",
+)
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('archived_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_jobs_status_archived_at_updated_at', ['status', 'archived_at', 'updated_at'], unique=False)
+
+    op.execute(RESTORE_STATUS)
+    for statement in REBUILD_STATUS_USAGE:
+        op.execute(statement)
+
+
+def downgrade():
+    op.execute("UPDATE jobs SET status = 'Archived' WHERE archived_at IS NOT NULL")
+    for statement in REBUILD_STATUS_USAGE:
+        op.execute(statement)
+
+    # Rebuilding the table would lose the expression index and search triggers;
+    # SQLite 3.35+ drops the column in place
+    with op.batch_alter_table('jobs', schema=None, recreate='never') as batch_op:
+        batch_op.drop_index('ix_jobs_status_archived_at_updated_at')
+        batch_op.drop_column('archived_at')
@@ -1,28 +1,118 @@
 import os
-from flask import Blueprint, send_file, abort, current_app
-from werkzeug.utils import safe_join
+from flask import Blueprint, send_file, abort, current_app, request, url_for
 from app.models.job import Job
-from config import Config
+from app.blueprints.main import staff_required
+from app.services.download_service import DownloadService
+from app.services.thumbnail_service import (
+    ThumbnailService, THUMBNAIL_MIMETYPES, THUMBNAIL_SIZES, SPRITE_COLUMNS, thumbnail_name
+)
+from app.services.job_listing_service import JobListingService
 
 file_bp = Blueprint('file', __name__)
 
+# Versioned thumbnail URLs never change content, so browsers may keep them for a year
+THUMBNAIL_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
 @file_bp.route('/open_file/<int:job_id>')
+@staff_required
 def open_file(job_id):
     job = Job.query.get_or_404(job_id)
-    # Build path to the file in its current status folder
-    path = os.path.join(Config.JOBS_ROOT, job.status, job.filename)
-    if not os.path.exists(path):
-        abort(404)
-    # Let Flask send it inline in the browser
-    return send_file(path, as_attachment=False)
+    # Let Flask send the file from its current status folder inline in the browser
+    return DownloadService.send_job_file(job, as_attachment=False)
 
 @file_bp.route('/thumbnail/<filename>')
 def serve_thumbnail(filename):
-    # current_app.root_path is the 'app' directory.
-    # Thumbnails are saved in 'app/thumbnails/'
-    thumbnails_dir = os.path.join(current_app.root_path, 'thumbnails')
-    path = safe_join(thumbnails_dir, filename)
-    if not os.path.exists(path):
-        print(f"DEBUG: Thumbnail not found at path: {path}") # Added for debugging
+    path = ThumbnailService.get_thumbnail_file(filename)
+    if not path:
+        current_app.logger.debug(f"Thumbnail not found: {filename}")
+        abort(404)
+    version = ThumbnailService.get_thumbnail_version(path)
+    mimetype = ThumbnailService.get_thumbnail_mimetype(path)
+    if request.args.get('v') == version:
+        response = send_file(path, mimetype=mimetype, etag=version, max_age=THUMBNAIL_IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+    else:
+        # Unversioned or stale URL: allow caching, but revalidate every time
+        response = send_file(path, mimetype=mimetype, etag=version, max_age=0)
+    return response
+
+@file_bp.route('/thumbnails/sprite')
+@staff_required
+def thumbnail_sprite():
+    """The thumbnails of several jobs tiled into one image, for lists of jobs."""
+    size = request.args.get('size', min(THUMBNAIL_SIZES), type=int)
+    if size not in THUMBNAIL_SIZES or size == max(THUMBNAIL_SIZES):
+        abort(400)
+    ids = request.args.get('ids', '').split(',')
+    if not all(job_id.isdigit() for job_id in ids) or len(ids) > JobListingService.MAX_PAGE_SIZE:
+        abort(400)
+    tiles = ThumbnailService.get_sprite_tiles([int(job_id) for job_id in ids], size)
+    if not tiles:
         abort(404)
-    return send_file(path, mimetype='image/png') 
\ No newline at end of file
+    version = ThumbnailService.get_sprite_version(tiles, size)
+    data, mimetype = ThumbnailService.build_sprite(tiles, size)
+    response = current_app.response_class(data, mimetype=mimetype)
+    response.set_etag(version)
+    if request.args.get('v') == version:
+        response.cache_control.max_age = THUMBNAIL_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = 0
+    return response.make_conditional(request)
+
+@file_bp.app_template_global()
+def thumbnail_url(job):
+    """Content-hash versioned thumbnail URL for a job, or None if it has no thumbnail."""
+    if not job.thumbnail_path:
+        return None
+    path = ThumbnailService.get_thumbnail_file(job.thumbnail_path)
+    if not path:
+        return None
+    return url_for('file.serve_thumbnail', filename=os.path.basename(path),
+                   v=ThumbnailService.get_thumbnail_version(path))
+
+@file_bp.app_template_global()
+def thumbnail_srcset(job):
+    """Responsive sources of a job's thumbnail, or None if it has no thumbnail.
+
+    Returns ``{'src': ..., 'srcset': ..., 'sources': [(mimetype, srcset), ...]}``:
+    a PNG ``src`` and ``srcset`` for the ``<img>``, and a srcset per better
+    format for ``<source>`` elements. Thumbnails rendered before multiple
+    sizes get only ``src``.
+    """
+    src = thumbnail_url(job)
+    if src is None:
+        return None
+    formats = ThumbnailService.get_thumbnail_formats(job.id)
+    if not formats:
+        return {'src': src, 'srcset': None, 'sources': []}
+    # One render versions every size and format
+    version = ThumbnailService.get_thumbnail_version(ThumbnailService.get_thumbnail_file(job.thumbnail_path))
+
+    def srcset(fmt):
+        return ', '.join(f"{url_for('file.serve_thumbnail', filename=thumbnail_name(job.id, size, fmt), v=version)} {size}w"
+                         for size in THUMBNAIL_SIZES)
+
+    return {
+        'src': url_for('file.serve_thumbnail', filename=thumbnail_name(job.id, THUMBNAIL_SIZES[1], 'png'), v=version),
+        'srcset': srcset('png') if 'png' in formats else None,
+        'sources': [(THUMBNAIL_MIMETYPES[fmt], srcset(fmt)) for fmt in formats if fmt != 'png'],
+    }
+
+@file_bp.app_template_global()
+def thumbnail_sprite_sheet(jobs, size=None):
+    """A sprite sheet of the jobs' thumbnails, or None if none has one.
+
+    Returns ``{'url': ..., 'columns': ..., 'rows': ..., 'tiles': {job_id: (column, row)}}``.
+    """
+    size = size or min(THUMBNAIL_SIZES)
+    tiles = ThumbnailService.get_sprite_tiles([job.id for job in jobs if job.thumbnail_path], size)
+    if not tiles:
+        return None
+    return {
+        'url': url_for('file.thumbnail_sprite', ids=','.join(str(job_id) for job_id, _, _ in tiles), size=size,
+                       v=ThumbnailService.get_sprite_version(tiles, size)),
+        'columns': min(len(tiles), SPRITE_COLUMNS),
+        'rows': -(-len(tiles) // SPRITE_COLUMNS),
+        'tiles': {job_id: (index % SPRITE_COLUMNS, index // SPRITE_COLUMNS) for index, (job_id, _, _) in enumerate(tiles)},
+    }
@@ -4,11 +4,8 @@ from flask import Blueprint, render_template, request, flash, redirect, url_for,
 from flask_login import current_user, login_required
 from app.models.job import Job, Status
 from extensions import db
+from app.services.thumbnail_service import ThumbnailService
 from config import Config
-import trimesh
-import pyrender
-from PIL import Image
-import numpy as np
 
 submit_bp = Blueprint('submit', __name__)
 
@@ -79,54 +76,12 @@ def submit():
             current_app.logger.info(f'New job {job.id} ({job.filename}) created successfully for {current_user.username} ({current_user.email}).')
 
             try:
-                # Generate thumbnail
-                mesh = trimesh.load(dest)
-                # Center the mesh
-                mesh.apply_translation(-mesh.bounds.mean(axis=0))
-                # Scale to fit in a unit cube
-                scale = 1.0 / mesh.extents.max()
-                mesh.apply_scale(scale)
-
-                # Create pyrender scene
-                pyrender_scene = pyrender.Scene()
-                pyrender_mesh = pyrender.Mesh.from_trimesh(mesh)
-                pyrender_scene.add(pyrender_mesh)
-
-                # Add camera
-                camera = pyrender.PerspectiveCamera(yfov=np.pi / 3.0)
-                camera_pose = np.array([
-                    [1.0, 0.0, 0.0, 0.0],
-                    [0.0, 1.0, 0.0, 0.0],
-                    [0.0, 0.0, 1.0, 2.0],
-                    [0.0, 0.0, 0.0, 1.0]
-                ])
-                pyrender_scene.add(camera, pose=camera_pose)
-
-                # Add light
-                light_pose = np.array([
-                    [1.0, 0.0, 0.0, 1.0],
-                    [0.0, 1.0, 0.0, 1.0],
-                    [0.0, 0.0, 1.0, 1.0],
-                    [0.0, 0.0, 0.0, 1.0]
-                ])
-                light = pyrender.DirectionalLight(color=np.ones(3), intensity=3.0)
-                pyrender_scene.add(light, pose=light_pose)
-
-                # Offscreen rendering
-                r = pyrender.OffscreenRenderer(viewport_width=256, viewport_height=256)
-                color, _ = r.render(pyrender_scene)
-                r.delete()
-
-                thumb_img = Image.fromarray(color)
-                thumbnails_dir = os.path.join(Config.BASE_DIR, 'thumbnails')
-                os.makedirs(thumbnails_dir, exist_ok=True)
-                thumbnail_filename = f"{job.id}.png"
-                thumbnail_path = os.path.join(thumbnails_dir, thumbnail_filename)
-                thumb_img.save(thumbnail_path)
-                # Store relative path for serving
-                job.thumbnail_path = f"thumbnails/{thumbnail_filename}"
-                db.session.commit()
-                current_app.logger.info(f'Thumbnail generated successfully for job {job.id} at {thumbnail_path}')
+                # Same renderer and set of sizes as the main submit view
+                thumbnail_path = ThumbnailService.generate_thumbnail(job)
+                if thumbnail_path:
+                    job.thumbnail_path = thumbnail_path
+                    db.session.commit()
+                    current_app.logger.info(f'Thumbnail generated successfully for job {job.id} at {thumbnail_path}')
             except Exception as e:
                 current_app.logger.error(f"Thumbnail generation failed for job {job.id} ({new_filename}): {e}", exc_info=True)
                 # Continue even if thumbnail generation fails
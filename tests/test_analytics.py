@@ -0,0 +1,145 @@
+import unittest
+from datetime import datetime, date, timedelta
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.analytics import UsageRollup
+from app.services.analytics_service import AnalyticsService
+from app.services.archive_service import ArchiveService
+from config import TestingConfig
+
+
+class TestUsageRollups(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_job(self, material='PLA'):
+        job = Job(
+            student_name='Test Student',
+            student_email='test@example.edu',
+            filename='test.stl',
+            original_filename='test.stl',
+            printer='Prusa XL',
+            color='Blue',
+            material=material
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def complete(self, job, weight_g, cost):
+        job.weight_g, job.cost = weight_g, cost
+        for status in (Status.PENDING, Status.CONFIRMED, Status.PRINTING, Status.COMPLETED):
+            job.update_status(status)
+            db.session.commit()
+
+    def report(self, period='week'):
+        today = datetime.utcnow().date()
+        return AnalyticsService.get_report(period, today, today)
+
+    def test_transitions_update_rollups(self):
+        """Test that submissions and status transitions are counted as they commit"""
+        self.complete(self.create_job(), weight_g=40, cost=4.5)
+        self.complete(self.create_job(material='PETG'), weight_g=10, cost=2.5)
+        rejected = self.create_job()
+        rejected.update_status(Status.REJECTED)
+        db.session.commit()
+
+        for period in ('day', 'week'):
+            totals = self.report(period)['totals']
+            self.assertEqual((totals['submitted'], totals['approved'], totals['rejected'], totals['printed']),
+                             (3, 2, 1, 2))
+            self.assertEqual(totals['grams'], 50)
+            self.assertEqual(totals['revenue'], 7.0)
+            self.assertEqual(totals['avg_turnaround_hours'], 0.0)
+        by_material = {row['key']: row for row in self.report()['by_material']}
+        self.assertEqual(by_material['PETG']['grams'], 10)
+        self.assertEqual(by_material['PLA']['submitted'], 2)
+        self.assertEqual(UsageRollup.query.filter_by(period='day').count(), 2)
+
+    def test_rollback_discards_counts(self):
+        """Test that a rolled back transition is not counted"""
+        job = self.create_job()
+        job.update_status(Status.REJECTED)
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.report()['totals']['rejected'], 0)
+        self.assertEqual(self.report()['totals']['submitted'], 1)
+
+    def test_report_reads_only_rollups(self):
+        """Test that reports survive the jobs table being emptied, and zero-fill idle periods"""
+        self.complete(self.create_job(), weight_g=40, cost=4.5)
+        db.session.execute(Job.__table__.delete())
+        db.session.commit()
+        today = datetime.utcnow().date()
+        report = AnalyticsService.get_report('day', today - timedelta(days=6), today)
+        self.assertEqual(len(report['series']), 7)
+        self.assertEqual([entry['printed'] for entry in report['series']], [0] * 6 + [1])
+
+    def test_rebuild_matches_incremental_totals(self):
+        """Test that the backfill reproduces the incrementally maintained totals"""
+        self.complete(self.create_job(), weight_g=40, cost=4.5)
+        self.create_job(material='PETG').update_status(Status.REJECTED)
+        self.create_job().update_status(Status.PENDING)
+        db.session.commit()
+        incremental = self.report()['totals']
+
+        db.session.query(UsageRollup).delete()
+        db.session.commit()
+        self.assertEqual(AnalyticsService.rebuild(), 3)
+        self.assertEqual(self.report()['totals'], incremental)
+
+    def test_rebuild_counts_archived_jobs_from_their_events(self):
+        """Test that a rebuild after archiving keeps prints, grams and revenue on the day they happened"""
+        completed = self.create_job()
+        self.complete(completed, weight_g=40, cost=4.5)
+        rejected = self.create_job()
+        rejected.update_status(Status.REJECTED)
+        db.session.commit()
+        incremental = self.report('day')['totals']
+
+        # Archived a month later, long after the last status change
+        for job in (completed, rejected):
+            job.updated_at = datetime.utcnow() + timedelta(days=31)
+        ArchiveService.archive_jobs([completed, rejected])
+        self.assertTrue(completed.is_archived)
+
+        self.assertEqual(AnalyticsService.rebuild(), 2)
+        totals = self.report('day')['totals']
+        self.assertEqual(totals, incremental)
+        self.assertEqual((totals['printed'], totals['grams'], totals['revenue'], totals['rejected']), (1, 40, 4.5, 1))
+
+    def test_weeks_start_on_monday(self):
+        """Test that weekly buckets start on Monday"""
+        job = self.create_job()
+        job.update_status(Status.REJECTED)
+        job.updated_at = datetime(2026, 10, 18, 23, 0)  # a Sunday
+        db.session.commit()
+        row = UsageRollup.query.filter_by(period='week').filter(UsageRollup.rejected > 0).one()
+        self.assertEqual(row.period_start, date(2026, 10, 12))
+
+    def test_reports_page_and_api(self):
+        """Test the staff reports page and JSON endpoint"""
+        self.complete(self.create_job(), weight_g=40, cost=4.5)
+        self.assertEqual(self.client.get('/reports').status_code, 302)
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        response = self.client.get('/reports?period=day')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('$4.50', response.get_data(as_text=True))
+
+        data = self.client.get('/api/reports/usage?period=week').get_json()
+        self.assertEqual(len(data['series']), 12)
+        self.assertEqual(data['totals']['printed'], 1)
+        self.assertEqual(self.client.get('/api/reports/usage?period=year').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from app import create_app, db
+from app.maintenance.cleanup import run_maintenance
+from app.models.job import Job, Status
+from app.services.archive_service import ArchiveService, IOThrottle
+from config import TestingConfig
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config['MAINTENANCE_FOLDER'] = os.path.join(self.app.config['JOBS_ROOT'], 'maintenance')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+        # An ASCII STL compresses like the real uploads do
+        facet = (b'facet normal 0 0 1\n outer loop\n  vertex 1.000000 2.000000 3.000000\n'
+                 b'  vertex 4.000000 5.000000 6.000000\n  vertex 7.000000 8.000000 9.000000\n'
+                 b' endloop\nendfacet\n')
+        self.content = b'solid part\n' + facet * 5000 + b'endsolid part\n'
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def create_job(self, status, age_days=60):
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='part.stl',
+            status=status.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        job.filename = f'JohnSmith_PrusaMK4S_Blue_{job.id}.stl'
+        job.updated_at = datetime.utcnow() - timedelta(days=age_days)
+        db.session.commit()
+        (self.test_jobs_root / job.status / job.filename).write_bytes(self.content)
+        return job
+
+    def test_maintenance_compresses_completed_and_rejected_jobs(self):
+        """Test that old jobs are compressed into the archival tier"""
+        completed = self.create_job(Status.COMPLETED)
+        rejected = self.create_job(Status.REJECTED)
+        originals = [self.test_jobs_root / job.status / job.filename for job in (completed, rejected)]
+
+        stats = run_maintenance()
+
+        for job, status, original in zip((completed, rejected), (Status.COMPLETED, Status.REJECTED), originals):
+            # The outcome is kept; only the file moves to the archival tier
+            self.assertEqual(job.status, status.value)
+            self.assertTrue(job.is_archived)
+            self.assertEqual(job.get_file_path().parent.name, 'Archived')
+            self.assertTrue(job.is_compressed)
+            self.assertFalse(original.exists())
+            self.assertEqual(job.get_file_path().stat().st_size, job.compressed_size)
+            self.assertLess(job.compressed_size, len(self.content) / 10)
+        self.assertEqual(stats['stages']['archive_rejected']['archived'], 1)
+        self.assertEqual(stats['stages']['archive_completed']['compressed_bytes'], completed.compressed_size)
+
+    def test_download_decompresses_on_the_fly(self):
+        """Test that archived files download as the original bytes"""
+        job = self.create_job(Status.COMPLETED)
+        ArchiveService.archive_jobs([job])
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+
+        response = self.client.get(f'/job/{job.id}/file', headers={
+            'X-Sendfile-Type': 'X-Accel-Redirect', 'Range': 'bytes=0-9'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Accel-Redirect', response.headers)
+        self.assertEqual(response.headers['Accept-Ranges'], 'none')
+        self.assertEqual(int(response.headers['Content-Length']), len(self.content))
+        self.assertEqual(response.data, self.content)
+
+        response = self.client.get(f'/open_file/{job.id}', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_failed_compression_keeps_original(self):
+        """Test that a job stays put when its file cannot be compressed"""
+        job = self.create_job(Status.COMPLETED)
+        self.app.config['ARCHIVE_ZSTD_LEVEL'] = 1000
+        outcomes = ArchiveService.archive_jobs([job])
+        self.assertEqual(outcomes[job.id], ('failed', None))
+        self.assertFalse(job.is_archived)
+        self.assertTrue(job.get_file_path().exists())
+        self.assertEqual(os.listdir(self.test_jobs_root / 'Archived'), [])
+
+    def test_deleting_archived_job_removes_compressed_file(self):
+        """Test file cleanup for compressed jobs"""
+        job = self.create_job(Status.COMPLETED)
+        ArchiveService.archive_jobs([job])
+        path = job.get_file_path()
+        db.session.delete(job)
+        db.session.commit()
+        self.assertFalse(path.exists())
+
+    def test_io_throttle_limits_rate(self):
+        """Test that the shared throttle spaces out reads"""
+        throttle = IOThrottle(1024 * 1024)
+        start = time.monotonic()
+        for _ in range(5):
+            throttle.consume(64 * 1024)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+from pathlib import Path
+from app import create_app, db
+from app.models.job import Job, Status
+from config import TestingConfig
+
+
+class TestDownloadDelivery(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+
+        self.job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='JohnSmith_PrusaMK4S_Blue_1.stl',
+            original_filename='my part.stl',
+            status=Status.UPLOADED.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(self.job)
+        db.session.commit()
+        (self.test_jobs_root / self.job.status / self.job.filename).write_bytes(b'x' * 4096)
+
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def test_auto_mode_without_nginx_streams_file(self):
+        """Test that the file is sent by the app when no proxy announces X-Accel"""
+        response = self.client.get(f'/job/{self.job.id}/file')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Accel-Redirect', response.headers)
+        self.assertEqual(len(response.data), 4096)
+
+    def test_auto_mode_behind_nginx_redirects_internally(self):
+        """Test that nginx gets an internal redirect instead of the file body"""
+        response = self.client.get(f'/job/{self.job.id}/file',
+                                   headers={'X-Sendfile-Type': 'X-Accel-Redirect'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Accel-Redirect'],
+                         '/uploads/Uploaded/JohnSmith_PrusaMK4S_Blue_1.stl')
+        self.assertEqual(response.data, b'')
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        self.assertIn('my part.stl', response.headers['Content-Disposition'])
+
+    def test_forced_modes(self):
+        """Test the send_file and x-accel settings override the proxy header"""
+        self.app.config['DOWNLOAD_DELIVERY'] = 'send_file'
+        response = self.client.get(f'/open_file/{self.job.id}',
+                                   headers={'X-Sendfile-Type': 'X-Accel-Redirect'})
+        self.assertNotIn('X-Accel-Redirect', response.headers)
+
+        self.app.config['DOWNLOAD_DELIVERY'] = 'x-accel'
+        response = self.client.get(f'/open_file/{self.job.id}')
+        self.assertIn('X-Accel-Redirect', response.headers)
+        self.assertTrue(response.headers['Content-Disposition'].startswith('inline'))
+
+    def test_auth_check_still_runs_in_flask(self):
+        """Test that logged out users never get an internal redirect"""
+        self.client.get('/staff/logout')
+        response = self.client.get(f'/job/{self.job.id}/file',
+                                   headers={'X-Sendfile-Type': 'X-Accel-Redirect'})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('X-Accel-Redirect', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.job_event import JobEvent
+from app.services.email_service import EmailService
+from app.services.estimate_service import get_turnaround_estimator, describe_estimate
+from app.services.token_service import TokenService
+from config import TestingConfig
+
+
+class TestTurnaroundEstimate(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def create_job(self, status, time_min, printer='Prusa XL'):
+        job = Job(
+            student_name='Test Student',
+            student_email='test@example.edu',
+            filename=f'job_{status.value}_{time_min}.stl',
+            original_filename='part.stl',
+            printer=printer,
+            color='Blue',
+            material='PLA',
+            time_min=time_min,
+            weight_g=20,
+            cost=5.0,
+            status=status.value
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def add_history(self, status, hours, count=2):
+        db.session.add_all(JobEvent(job_id=1000 + i, from_status=status, to_status='Next', created_at=self.now,
+                                    elapsed_seconds=int(hours * 3600)) for i in range(count))
+        db.session.commit()
+
+    def test_queue_ahead_dominates_when_busy(self):
+        """Test that queued print time on the same printer delays the estimate"""
+        self.create_job(Status.CONFIRMED, 300)
+        self.create_job(Status.PRINTING, 120)
+        self.create_job(Status.CONFIRMED, 600, printer='Form 3+')
+        self.add_history(Status.CONFIRMED.value, hours=2)
+        job = self.create_job(Status.PENDING, 60)
+
+        estimate = get_turnaround_estimator().estimate(job, now=self.now)
+        self.assertEqual(estimate['queue_minutes_ahead'], 420)
+        # 420 queued minutes ahead plus its own hour, rounded up to the hour
+        self.assertEqual(estimate['hours'], 8)
+        self.assertEqual(describe_estimate(estimate), 'in about 8 hours')
+
+    def test_history_dominates_when_idle(self):
+        """Test that typical waits in Pending and Confirmed apply to an empty queue"""
+        self.add_history(Status.PENDING.value, hours=20)
+        self.add_history(Status.CONFIRMED.value, hours=30)
+        job = self.create_job(Status.PENDING, 90)
+        estimate = get_turnaround_estimator().estimate(job, now=self.now)
+        self.assertEqual(estimate['queue_minutes_ahead'], 0)
+        self.assertEqual(estimate['hours'], 52)
+        self.assertEqual(describe_estimate(estimate), 'in about 3 days')
+        self.assertIsNone(get_turnaround_estimator().estimate(self.create_job(Status.UPLOADED, 90)))
+
+    def test_aggregates_follow_committed_events(self):
+        """Test that transitions update the aggregates without reloading them"""
+        estimator = get_turnaround_estimator()
+        queued = self.create_job(Status.CONFIRMED, 100)
+        self.assertEqual(estimator.queue_minutes('Prusa XL'), 100)
+
+        job = self.create_job(Status.PENDING, 50)
+        job.updated_at = self.now - timedelta(hours=3)
+        db.session.commit()
+        with patch.object(estimator, 'reconcile', wraps=estimator.reconcile) as reconcile:
+            job.update_status(Status.CONFIRMED)
+            db.session.commit()
+            self.assertEqual(estimator.queue_minutes('Prusa XL'), 150)
+            self.assertAlmostEqual(estimator.average_seconds(Status.PENDING.value), 3 * 3600, delta=5)
+            queued.update_status(Status.PRINTING)
+            db.session.commit()
+            self.assertEqual(estimator.queue_minutes('Prusa XL'), 150)
+            reconcile.assert_not_called()
+
+    def test_confirmation_page_and_approval_email_show_estimate(self):
+        """Test that students see the estimate after confirming and in the approval email"""
+        job = self.create_job(Status.PENDING, 90)
+        pending_dir = self.test_jobs_root / Status.PENDING.value
+        os.makedirs(pending_dir, exist_ok=True)
+        (pending_dir / job.filename).write_bytes(b'solid part\nendsolid part\n')
+
+        token = TokenService.generate_token(job)
+        response = self.client.post(f'/job/confirm/{token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Estimated Ready', response.get_data(as_text=True))
+        self.assertIn('In about 2 hours', response.get_data(as_text=True))
+
+        with patch.object(EmailService, 'send_email', return_value=True) as send_email:
+            EmailService.send_job_approval_email('test@example.edu', 'part.stl', 5.0, 1, 30, 'PLA',
+                                                 'http://localhost/confirm', estimated_completion='in about 5 hours')
+        body, html = send_email.call_args[0][2], send_email.call_args[0][3]
+        self.assertIn('Estimated Ready: in about 5 hours', body)
+        self.assertIn('in about 5 hours', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+from datetime import datetime, date
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.export_service import ExportService, EXPORT_FIELDS
+from app.maintenance.cleanup import main as cleanup_main
+from config import TestingConfig
+
+
+class TestJobExport(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def seed(self, count, status=Status.COMPLETED.value, created_at=datetime(2026, 3, 1)):
+        rows = [{
+            'student_name': f'Student {i}',
+            'student_email': f'student{i}@example.edu',
+            'filename': f'job_{i}.stl',
+            'original_filename': f'part_{i}.stl',
+            'status': status,
+            'printer': 'Prusa XL',
+            'material': 'PLA',
+            'weight_g': 12.5,
+            'time_min': 90,
+            'cost': 4.25,
+            'reject_reasons': '[]',
+            'created_at': created_at,
+            'updated_at': created_at,
+        } for i in range(count)]
+        db.session.execute(Job.__table__.insert(), rows)
+        db.session.commit()
+
+    def login(self):
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+
+    def test_csv_endpoint_streams_filtered_rows(self):
+        """Test that the CSV export is streamed and honours the status and date filters"""
+        self.seed(30)
+        self.seed(5, status=Status.REJECTED.value)
+        self.seed(7, created_at=datetime(2026, 9, 1))
+        self.assertEqual(self.client.get('/api/jobs/export').status_code, 302)
+        self.login()
+
+        response = self.client.get('/api/jobs/export?to=2026-06-30')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(len(rows), 31)
+        self.assertEqual(rows[1][EXPORT_FIELDS.index('cost')], '4.25')
+
+        response = self.client.get('/api/jobs/export?status=Completed&status=Rejected')
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 43)
+        self.assertEqual(self.client.get('/api/jobs/export?from=March').status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/export?format=xlsx').status_code, 400)
+
+    def test_default_export_includes_archived_completed_jobs(self):
+        """Test that archiving does not drop completed jobs from the default export"""
+        self.seed(3)
+        self.seed(2, status=Status.REJECTED.value)
+        db.session.execute(Job.__table__.update().values(archived_at=datetime(2026, 4, 1)))
+        db.session.commit()
+        rows = [row for batch in ExportService.iter_batches() for row in batch]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row.status for row in rows}, {Status.COMPLETED.value})
+
+    def test_csv_defuses_formulas(self):
+        """Test that student text cannot run as a spreadsheet formula"""
+        self.seed(1)
+        db.session.execute(Job.__table__.update().values(
+            student_name='=HYPERLINK("http://evil.example","x")', original_filename='@SUM(A1).stl',
+            material='-PLA'))
+        db.session.commit()
+        data = b''.join(ExportService.iter_csv(ExportService.iter_batches())).decode()
+        row = list(csv.reader(io.StringIO(data)))[1]
+        self.assertEqual(row[EXPORT_FIELDS.index('student_name')], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row[EXPORT_FIELDS.index('original_filename')], "'@SUM(A1).stl")
+        self.assertEqual(row[EXPORT_FIELDS.index('material')], "'-PLA")
+        self.assertEqual(row[EXPORT_FIELDS.index('cost')], '4.25')
+
+    def test_memory_stays_flat(self):
+        """Test that peak memory does not grow with the number of exported rows"""
+        def peak(count):
+            db.session.execute(Job.__table__.delete())
+            self.seed(count)
+            tracemalloc.start()
+            for _ in ExportService.iter_csv(ExportService.iter_batches(batch_size=500)):
+                pass
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak_bytes
+
+        small, large = peak(1000), peak(20000)
+        self.assertLess(large, small * 1.5)
+
+    @unittest.skipUnless(ExportService.parquet_available(), 'pyarrow is not installed')
+    def test_parquet_row_groups(self):
+        """Test that Parquet is written one row group per batch"""
+        import pyarrow.parquet as pq
+        self.seed(25)
+        data = b''.join(ExportService.iter_parquet(ExportService.iter_batches(batch_size=10)))
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column_names, list(EXPORT_FIELDS))
+        self.assertEqual(table.column('weight_g').to_pylist()[0], 12.5)
+
+    def test_cli_export(self):
+        """Test the maintenance CLI export subcommand"""
+        self.seed(12)
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        output = os.path.join(folder, 'jobs.csv')
+        with patch('app.create_app', return_value=self.app):
+            self.assertEqual(cleanup_main(['export', '--from', str(date(2026, 1, 1)), '-o', output]), 0)
+        with open(output, newline='') as f:
+            self.assertEqual(len(list(csv.reader(f))), 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import os
+import re
+import shutil
+from pathlib import Path
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.file_service import FileService
+from config import TestingConfig
+
+
+class TestHttpCaching(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        # Set up test directories
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        self.thumbnails_dir = Path(self.app.config['THUMBNAILS_DIR'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def login_staff(self):
+        """Helper method to login as staff"""
+        return self.client.post('/staff/login', data={
+            'password': self.app.config['STAFF_PASSWORD']
+        }, follow_redirects=True)
+
+    def create_job(self, with_thumbnail=True, content=b'solid test\nendsolid test\n'):
+        """Helper to create a job with a model file and a thumbnail."""
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='test.stl',
+            status=Status.UPLOADED.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        job.filename = f'JohnSmith_PrusaMK4S_Blue_{job.id}.stl'
+        (self.test_jobs_root / job.status / job.filename).write_bytes(content)
+        if with_thumbnail:
+            (self.thumbnails_dir / f'{job.id}.png').write_bytes(os.urandom(20000))
+            job.thumbnail_path = f'thumbnails/{job.id}.png'
+        db.session.commit()
+        return job
+
+    def load_dashboard(self, cache):
+        """Load the dashboard and its thumbnails like a browser with an HTTP cache.
+
+        Returns the number of image bytes transferred.
+        """
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        transferred = 0
+        for src in re.findall(r'<img src="([^"]+)"', html):
+            src = src.replace('&amp;', '&')
+            cached = cache.get(src)
+            if cached and 'immutable' in cached['cache_control']:
+                continue
+            headers = {'If-None-Match': cached['etag']} if cached else {}
+            response = self.client.get(src, headers=headers)
+            self.assertIn(response.status_code, (200, 304))
+            transferred += len(response.data)
+            if response.status_code == 200:
+                cache[src] = {
+                    'etag': response.headers['ETag'],
+                    'cache_control': response.headers.get('Cache-Control', ''),
+                }
+        return transferred
+
+    def test_second_dashboard_load_transfers_almost_no_image_bytes(self):
+        """Test that thumbnails are fetched once and then served from cache"""
+        for _ in range(3):
+            self.create_job()
+        self.login_staff()
+
+        cache = {}
+        first = self.load_dashboard(cache)
+        second = self.load_dashboard(cache)
+
+        self.assertEqual(len(cache), 3)
+        self.assertGreaterEqual(first, 3 * 20000)
+        self.assertEqual(second, 0)
+
+    def test_thumbnail_url_changes_with_content(self):
+        """Test that a re-rendered thumbnail gets a new immutable URL"""
+        job = self.create_job()
+        self.login_staff()
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        old_src = re.search(r'<img src="([^"]+)"', html).group(1).replace('&amp;', '&')
+
+        response = self.client.get(old_src)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+
+        (self.thumbnails_dir / f'{job.id}.png').write_bytes(os.urandom(20000))
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        new_src = re.search(r'<img src="([^"]+)"', html).group(1).replace('&amp;', '&')
+        self.assertNotEqual(old_src, new_src)
+
+        # The old URL must not be cached as immutable any more
+        response = self.client.get(old_src)
+        self.assertNotIn('immutable', response.headers['Cache-Control'])
+
+    def test_download_conditional_get(self):
+        """Test strong ETags and 304 responses for model downloads"""
+        job = self.create_job(with_thumbnail=False)
+        self.login_staff()
+
+        response = self.client.get(f'/job/{job.id}/file')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('private', response.headers['Cache-Control'])
+
+        response = self.client.get(f'/job/{job.id}/file', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        response = self.client.get(f'/job/{job.id}/file',
+                                   headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        # The ETag survives moving the file to another status folder
+        FileService.move_file(job.filename, Status.UPLOADED.value, Status.PENDING.value)
+        job.status = Status.PENDING.value
+        db.session.commit()
+        response = self.client.get(f'/open_file/{job.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_open_file_requires_staff(self):
+        """Test that the open file route is no longer public"""
+        job = self.create_job(with_thumbnail=False)
+        response = self.client.get(f'/open_file/{job.id}')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/staff/login', response.location)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The rendering stack; only processes that render thumbnails may load it
+HEAVY_MODULES = ('trimesh', 'pyrender', 'numpy', 'PIL', 'OpenGL', 'scipy')
+# Peak RSS of a fresh process after importing the app. About 65 MB without
+# the rendering stack and 165 MB with it.
+RSS_BUDGET_MB = 110
+
+# Peak RSS is read from /proc where available: ru_maxrss is inherited from the
+# parent across fork and exec, so it would report the test runner's peak
+SCRIPT = """
+import json, resource, sys
+import app
+try:
+    with open('/proc/self/status') as f:
+        rss_mb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+print(json.dumps({'rss_mb': rss_mb, 'loaded': sorted(name for name in %r if name in sys.modules)}))
+""" % (HEAVY_MODULES,)
+
+
+class TestImportFootprint(unittest.TestCase):
+    def test_web_app_does_not_load_rendering_stack(self):
+        """Test that importing the app in a fresh worker stays light"""
+        result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        footprint = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(footprint['loaded'], [], 'see benchmarks/bench_import.py for what pulled them in')
+        self.assertLess(footprint['rss_mb'], RSS_BUDGET_MB)
+
+
+if __name__ == '__main__':
+    unittest.main()
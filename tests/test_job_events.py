@@ -0,0 +1,113 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.job_event import JobEvent
+from app.services.event_service import JobEventService, job_events_committed
+from app.services.metrics_service import JOB_TRANSITIONS
+from config import TestingConfig
+
+
+class TestJobEvents(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        self.published = []
+        job_events_committed.connect(self.on_events)
+
+    def tearDown(self):
+        job_events_committed.disconnect(self.on_events)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def on_events(self, sender, events, **extra):
+        self.published.append(events)
+
+    def create_job(self):
+        job = Job(
+            student_name='Test Student',
+            student_email='test@example.edu',
+            filename='test.stl',
+            original_filename='test.stl',
+            printer='Prusa XL',
+            color='Blue',
+            material='PLA'
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def test_transitions_are_logged_with_actor_and_payload(self):
+        """Test that creation and every transition are appended in order"""
+        job = self.create_job()
+        job.updated_at = datetime.utcnow() - timedelta(hours=2)
+        db.session.commit()
+        job.update_status(Status.PENDING, actor='staff', payload={'cost': 4.5})
+        db.session.commit()
+        job.update_status(Status.CONFIRMED, actor='test@example.edu')
+        db.session.commit()
+
+        history = JobEventService.history(job.id)
+        self.assertEqual([(e.from_status, e.to_status) for e in history],
+                         [(None, 'Uploaded'), ('Uploaded', 'Pending'), ('Pending', 'Confirmed')])
+        self.assertEqual(history[1].actor, 'staff')
+        self.assertEqual(history[1].payload, {'cost': 4.5})
+        self.assertAlmostEqual(history[1].elapsed_seconds, 7200, delta=5)
+        self.assertEqual(JobEventService.time_in_status()['Uploaded']['count'], 1)
+
+    def test_rolled_back_transition_is_not_logged_or_published(self):
+        """Test that events share the transaction of the transition"""
+        job = self.create_job()
+        self.published.clear()
+        job.update_status(Status.REJECTED, actor='staff')
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(JobEvent.query.filter_by(to_status='Rejected').count(), 0)
+        self.assertEqual(self.published, [])
+
+    def test_unflushed_transition_is_dropped_on_rollback(self):
+        """Test that a transition rolled back before any flush is not written by the next one"""
+        job = self.create_job()
+        job.update_status(Status.REJECTED, actor='staff')
+        db.session.rollback()
+        self.assertEqual(job.status, Status.UPLOADED.value)
+        job.update_status(Status.PENDING, actor='staff')
+        db.session.commit()
+        self.assertEqual([(e.from_status, e.to_status) for e in JobEventService.history(job.id)],
+                         [(None, 'Uploaded'), ('Uploaded', 'Pending')])
+
+    def test_bulk_transitions_publish_once_after_commit(self):
+        """Test that a bulk operation writes all events in one commit and publishes them together"""
+        jobs = [self.create_job() for _ in range(5)]
+        self.published.clear()
+        before = JOB_TRANSITIONS.collect().get(('Uploaded', 'Rejected'), 0)
+        for job in jobs:
+            job.update_status(Status.REJECTED, actor='maintenance')
+        db.session.commit()
+        self.assertEqual(len(self.published), 1)
+        self.assertEqual([event['job_id'] for event in self.published[0]], [job.id for job in jobs])
+        self.assertEqual(JOB_TRANSITIONS.collect()[('Uploaded', 'Rejected')] - before, 5)
+
+    def test_events_outlive_the_job(self):
+        """Test that the audit trail is kept after a job is deleted"""
+        job = self.create_job()
+        job_id = job.id
+        db.session.delete(job)
+        db.session.commit()
+        self.assertEqual(len(JobEventService.history(job_id)), 1)
+
+    def test_events_endpoint(self):
+        """Test the staff-only audit trail API"""
+        job = self.create_job()
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}/events').status_code, 302)
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        data = self.client.get(f'/api/jobs/{job.id}/events').get_json()
+        self.assertEqual([event['to_status'] for event in data['events']], ['Uploaded'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime, timedelta, date
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.job_listing_service import JobListingService, InvalidCursor
+from config import TestingConfig
+
+
+class TestJobListing(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_jobs(self, count):
+        start = datetime(2026, 1, 1)
+        jobs = []
+        for i in range(count):
+            job = Job(
+                student_name=f'Student {i}',
+                student_email=f'student{i}@example.edu',
+                filename=f'job_{i}.stl',
+                original_filename=f'part_{i}.stl',
+                printer='Prusa XL' if i % 2 else 'Prusa MK4S',
+                color='Blue',
+                material='PETG' if i % 3 == 0 else 'PLA',
+                cost=None if i % 4 == 0 else float(i % 5),
+            )
+            # Pairs of jobs share a timestamp so ties are broken by id
+            job.created_at = job.updated_at = start + timedelta(hours=i // 2)
+            if i % 5 == 0:
+                job.status = Status.COMPLETED.value
+            jobs.append(job)
+        db.session.add_all(jobs)
+        db.session.commit()
+        return jobs
+
+    def walk(self, **kwargs):
+        """Follow next cursors through every page, then walk back with prev cursors."""
+        pages, after = [], None
+        while True:
+            page = JobListingService.list_jobs(after=after, limit=4, **kwargs)
+            pages.append([row.id for row in page['jobs']])
+            if not page['next_cursor']:
+                break
+            after = page['next_cursor']
+
+        back, before = [pages[-1]], page['prev_cursor']
+        while before:
+            page = JobListingService.list_jobs(before=before, limit=4, **kwargs)
+            back.insert(0, [row.id for row in page['jobs']])
+            before = page['prev_cursor']
+        self.assertEqual(back, pages)
+        return [job_id for ids in pages for job_id in ids]
+
+    def test_pages_cover_every_sort_in_order(self):
+        """Test that walking the cursors returns every job once, in sort order"""
+        jobs = self.create_jobs(23)
+        newest_first = sorted(jobs, key=lambda job: (job.created_at, job.id), reverse=True)
+        self.assertEqual(self.walk(), [job.id for job in newest_first])
+        self.assertEqual(self.walk(sort='updated_at', descending=False),
+                         [job.id for job in reversed(newest_first)])
+
+        # Costs are partly NULL; those always come last
+        priced = [job for job in jobs if job.cost is not None]
+        unpriced = [job for job in jobs if job.cost is None]
+        expected = (sorted(priced, key=lambda job: (job.cost, job.id), reverse=True)
+                    + sorted(unpriced, key=lambda job: job.id, reverse=True))
+        self.assertEqual(self.walk(sort='cost'), [job.id for job in expected])
+        expected = (sorted(priced, key=lambda job: (job.cost, job.id))
+                    + sorted(unpriced, key=lambda job: job.id))
+        self.assertEqual(self.walk(sort='cost', descending=False), [job.id for job in expected])
+
+    def test_filters(self):
+        """Test status, printer, material and date range filters"""
+        jobs = self.create_jobs(23)
+        filters = {'status': Status.COMPLETED.value, 'printer': 'Prusa MK4S', 'material': 'PETG'}
+        expected = [job.id for job in jobs if job.status == Status.COMPLETED.value
+                    and job.printer == 'Prusa MK4S' and job.material == 'PETG']
+        self.assertEqual(sorted(self.walk(filters=filters)), sorted(expected))
+
+        filters = {'created_from': date(2026, 1, 1), 'created_to': date(2026, 1, 1)}
+        self.assertEqual(len(self.walk(filters=filters)), 23)
+        filters = {'created_from': date(2026, 1, 2)}
+        self.assertEqual(self.walk(filters=filters), [])
+
+    def test_invalid_cursor(self):
+        """Test that tampered cursors and cursors of another sort are rejected"""
+        self.create_jobs(5)
+        cursor = JobListingService.list_jobs(limit=2)['next_cursor']
+        with self.assertRaises(InvalidCursor):
+            JobListingService.list_jobs(sort='cost', after=cursor)
+        with self.assertRaises(InvalidCursor):
+            JobListingService.list_jobs(after='not-a-cursor')
+
+    def test_jobs_page(self):
+        """Test the staff jobs page with filters and pagination links"""
+        self.create_jobs(120)
+        self.assertEqual(self.client.get('/jobs').status_code, 302)
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+
+        response = self.client.get('/jobs?material=PLA&sort=cost')
+        self.assertEqual(response.status_code, 200)
+        html = response.get_data(as_text=True)
+        self.assertIn('Next', html)
+        self.assertNotIn('Previous', html)
+        self.assertIn('material=PLA', html)
+
+        self.assertEqual(self.client.get('/jobs?after=garbage').status_code, 400)
+        response = self.client.get('/jobs?from=yesterday')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Invalid date', response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+import trimesh
+from app import create_app, db
+from app.maintenance.cleanup import run_maintenance, check_disk_space, read_last_run, CHECKPOINT_FILE
+from app.models.job import Job, Status
+from config import TestingConfig
+
+
+class TestMaintenance(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+        self.maintenance_folder = tempfile.mkdtemp()
+        self.app.config['MAINTENANCE_FOLDER'] = self.maintenance_folder
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        shutil.rmtree(self.maintenance_folder)
+        self.app_context.pop()
+
+    def create_job(self, status, age_days, with_file=True):
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='test.stl',
+            status=status.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        job.filename = f'JohnSmith_PrusaMK4S_Blue_{job.id}.stl'
+        job.updated_at = self.now - timedelta(days=age_days)
+        db.session.commit()
+        if with_file:
+            (self.test_jobs_root / job.status / job.filename).write_bytes(b'x' * 100)
+        return job
+
+    def test_expires_only_due_jobs(self):
+        """Test that stale uploads are deleted and old completed jobs archived"""
+        stale = self.create_job(Status.UPLOADED, 8)
+        fresh = self.create_job(Status.UPLOADED, 1)
+        old_completed = self.create_job(Status.COMPLETED, 31)
+        recent_completed = self.create_job(Status.COMPLETED, 10)
+        self.create_job(Status.PENDING, 100)
+        stale_id, stale_file = stale.id, self.test_jobs_root / 'Uploaded' / stale.filename
+
+        stats = run_maintenance(now=self.now)
+
+        self.assertIsNone(db.session.get(Job, stale_id))
+        self.assertFalse(stale_file.exists())
+        self.assertEqual(fresh.status, Status.UPLOADED.value)
+        self.assertEqual(old_completed.status, Status.COMPLETED.value)
+        self.assertTrue(old_completed.is_archived)
+        self.assertTrue((self.test_jobs_root / 'Archived' / (old_completed.filename + '.zst')).exists())
+        self.assertEqual(recent_completed.status, Status.COMPLETED.value)
+        self.assertFalse(recent_completed.is_archived)
+
+        # Only the two due jobs were looked at on disk
+        self.assertEqual(stats['stages']['stale_uploads'], {
+            'jobs': 1, 'files_checked': 1, 'missing': 0, 'bytes': 100, 'deleted': 1})
+        self.assertEqual(stats['stages']['archive_completed']['archived'], 1)
+        self.assertEqual(stats['stages']['archive_completed']['files_checked'], 1)
+        self.assertTrue(stats['complete'])
+        self.assertEqual(read_last_run(self.maintenance_folder)['run_id'], stats['run_id'])
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        """Test bounded batches with a checkpoint between runs"""
+        for _ in range(5):
+            self.create_job(Status.COMPLETED, 40, with_file=False)
+
+        first = run_maintenance(batch_size=2, max_batches=1, now=self.now)
+        self.assertFalse(first['complete'])
+        self.assertEqual(first['stages']['archive_completed']['jobs'], 2)
+        checkpoint_path = os.path.join(self.maintenance_folder, CHECKPOINT_FILE)
+        with open(checkpoint_path) as f:
+            self.assertIn('archive_completed', json.load(f))
+
+        second = run_maintenance(batch_size=2, now=self.now)
+        self.assertTrue(second['resumed'])
+        self.assertTrue(second['complete'])
+        self.assertEqual(second['stages']['archive_completed']['jobs'], 3)
+        self.assertEqual(second['stages']['archive_completed']['missing'], 3)
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assertEqual(Job.query.filter(Job.archived_at.isnot(None)).count(), 5)
+
+        # Archived jobs are not picked up again
+        third = run_maintenance(batch_size=2, now=self.now)
+        self.assertEqual(third['stages']['archive_completed']['jobs'], 0)
+
+    def test_measures_confirmed_jobs(self):
+        """Test that maintenance measures confirmed jobs the scheduler has no bounding box for"""
+        job = self.create_job(Status.CONFIRMED, 0, with_file=False)
+        os.makedirs(self.test_jobs_root / job.status, exist_ok=True)
+        trimesh.creation.box(extents=(20, 10, 5)).export(str(self.test_jobs_root / job.status / job.filename))
+        self.assertEqual(run_maintenance(dry_run=True, now=self.now)['stages']['measure_confirmed'], {'jobs': 1})
+        self.assertIsNone(job.extents)
+
+        stats = run_maintenance(now=self.now)
+        self.assertEqual(stats['stages']['measure_confirmed'], {'measured': 1, 'failed': 0})
+        self.assertEqual(job.extents, (20.0, 10.0, 5.0))
+
+    def test_dry_run_changes_nothing(self):
+        """Test that a dry run only reports candidates"""
+        job = self.create_job(Status.UPLOADED, 30)
+        stats = run_maintenance(dry_run=True, now=self.now)
+        self.assertEqual(stats['stages']['stale_uploads']['dry_run'], 1)
+        self.assertEqual(job.status, Status.UPLOADED.value)
+        self.assertIsNone(read_last_run(self.maintenance_folder))
+
+    def test_check_disk_space(self):
+        """Test the disk usage check and its alert threshold"""
+        result = check_disk_space(str(self.test_jobs_root), threshold=0.0)
+        self.assertTrue(result['alert'])
+        self.assertGreater(result['total'], 0)
+        self.assertFalse(check_disk_space(str(self.test_jobs_root), threshold=1.0)['alert'])
+
+
+if __name__ == '__main__':
+    unittest.main()
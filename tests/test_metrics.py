@@ -0,0 +1,100 @@
+import unittest
+import threading
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.metrics_service import MetricsRegistry, registry
+from config import TestingConfig
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_counter_merges_thread_shards(self):
+        """Test that increments from many threads are all counted"""
+        local_registry = MetricsRegistry()
+        counter = local_registry.counter('test_total', 'Test counter.', ('kind',))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(kind='a')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter.collect()[('a',)], 8000)
+        self.assertIn('test_total{kind="a"} 8000', local_registry.render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram exposition output"""
+        local_registry = MetricsRegistry()
+        histogram = local_registry.histogram('test_seconds', 'Test histogram.', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        output = local_registry.render()
+        self.assertIn('# TYPE test_seconds histogram', output)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', output)
+        self.assertIn('test_seconds_bucket{le="1.0"} 2', output)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', output)
+        self.assertIn('test_seconds_count 3', output)
+        self.assertIn('test_seconds_sum 5.55', output)
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes in label values cannot break the output"""
+        local_registry = MetricsRegistry()
+        counter = local_registry.counter('test_total', 'Test counter.', ('name',))
+        counter.inc(name='say "hi"')
+        self.assertIn('test_total{name="say \\"hi\\""} 1', local_registry.render())
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics reports job counts, disk usage and request latency"""
+        for _ in range(2):
+            db.session.add(Job(
+                student_name='John Smith',
+                student_email='john@example.com',
+                filename='test.stl',
+                original_filename='test.stl',
+                status=Status.UPLOADED.value,
+                printer='Prusa MK4S',
+                color='Blue'
+            ))
+        db.session.commit()
+
+        self.client.get('/submit')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, registry.CONTENT_TYPE)
+        body = response.get_data(as_text=True)
+        self.assertIn('printsystem_jobs{status="Uploaded"} 2', body)
+        self.assertIn('printsystem_jobs_root_disk_bytes{kind="free"}', body)
+        self.assertIn('printsystem_request_duration_seconds_count{endpoint="main.submit",method="GET",status="200"}', body)
+
+    def test_metrics_token_is_required_when_configured(self):
+        """Test that /metrics rejects scrapes without the configured bearer token"""
+        self.app.config['METRICS_TOKEN'] = 's3cret'
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('printsystem_jobs', response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SEARCH_TRIGGERS = ['jobs_fts_ad', 'jobs_fts_ai', 'jobs_fts_au']
+
+
+class TestMigrations(unittest.TestCase):
+    """Runs the real migration chain against a SQLite file with ``flask db``."""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.remove(self.db_path)
+        # The first two revisions both create jobs; fresh databases start from the second
+        self.flask_db('stamp', '589b020d7229')
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def flask_db(self, *args):
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{self.db_path}', FLASK_APP='app')
+        result = subprocess.run([sys.executable, '-m', 'flask', 'db', *args], cwd=PROJECT_ROOT, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def query(self, sql, *params):
+        with sqlite3.connect(self.db_path) as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def triggers(self):
+        return [name for (name,) in self.query(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'jobs' ORDER BY name")]
+
+    def test_search_triggers_survive_to_head(self):
+        """Test that no later migration rebuilds jobs and loses the search triggers"""
+        self.flask_db('upgrade')
+        self.assertEqual(self.triggers(), SEARCH_TRIGGERS)
+
+        self.query("INSERT INTO jobs (student_name, student_email, filename, original_filename, status, printer) "
+                   "VALUES ('Alex Chen', 'alex@example.edu', 'a.stl', 'bracket.stl', 'Uploaded', 'Prusa XL')")
+        self.assertEqual(self.query("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'bracket'"), [(1,)])
+
+    def test_printer_downgrade_restores_search_triggers(self):
+        """Test that the printers downgrade, which rebuilds jobs on SQLite, puts the triggers back"""
+        self.flask_db('upgrade')
+        self.flask_db('downgrade', 'f5a9c3e7b214')
+        self.assertEqual(self.triggers(), SEARCH_TRIGGERS)
+        self.flask_db('upgrade')
+        self.assertEqual(self.triggers(), SEARCH_TRIGGERS)
+
+
+if __name__ == '__main__':
+    unittest.main()
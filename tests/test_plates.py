@@ -0,0 +1,124 @@
+import unittest
+import random
+import time
+from unittest.mock import patch
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.printer import Printer
+from app.services.geometry_service import GeometryService
+from app.services.plate_service import PlateService
+from config import TestingConfig
+
+
+def overlaps(a, b, spacing):
+    return not (a['x'] + a['width'] + spacing <= b['x'] + 0.2 or b['x'] + b['width'] + spacing <= a['x'] + 0.2
+                or a['y'] + a['depth'] + spacing <= b['y'] + 0.2 or b['y'] + b['depth'] + spacing <= a['y'] + 0.2)
+
+
+class TestPlatePacking(unittest.TestCase):
+    def test_parts_are_packed_without_overlap(self):
+        """Test that every part lands inside a plate, spaced from its neighbours"""
+        rng = random.Random(3)
+        parts = [{'id': i, 'width': rng.uniform(10, 70), 'depth': rng.uniform(10, 70), 'time_min': 30}
+                 for i in range(120)]
+        start = time.perf_counter()
+        plates = PlateService.pack(parts, (250, 210), max_minutes=10 ** 6)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        self.assertEqual(sorted(part['id'] for plate in plates for part in plate['parts']), list(range(120)))
+        for plate in plates:
+            for i, a in enumerate(plate['parts']):
+                self.assertLessEqual(a['x'] + a['width'], 250.1)
+                self.assertLessEqual(a['y'] + a['depth'], 210.1)
+                for b in plate['parts'][i + 1:]:
+                    self.assertFalse(overlaps(a, b, PlateService.SPACING_MM), (a, b))
+        # Skyline packing of small parts should use most of each full plate
+        self.assertGreater(plates[0]['utilization'], 0.7)
+
+    def test_parts_are_turned_to_fit(self):
+        """Test that a part too long one way is turned"""
+        plates = PlateService.pack([{'id': 1, 'width': 40, 'depth': 200}, {'id': 2, 'width': 40, 'depth': 200}],
+                                   (210, 100), spacing=0)
+        self.assertEqual(len(plates), 1)
+        self.assertTrue(all(part['rotated'] for part in plates[0]['parts']))
+        self.assertEqual(PlateService.pack([{'id': 1, 'width': 300, 'depth': 300}], (250, 210)), [])
+
+    def test_print_time_limit_opens_a_new_plate(self):
+        """Test that a plate never holds more than the maximum print time"""
+        parts = [{'id': i, 'width': 10, 'depth': 10, 'time_min': 500} for i in range(5)]
+        plates = PlateService.pack(parts, (250, 210))
+        self.assertEqual([len(plate['parts']) for plate in plates], [2, 2, 1])
+        self.assertEqual(plates[0]['time_min'], 1000)
+
+
+class TestPlateSuggestions(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        db.session.add(Printer(name='MK4S #1', model='Prusa MK4S', build_x_mm=250, build_y_mm=210, build_z_mm=220))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_job(self, extents, color='Black', printer='Prusa MK4S', status=Status.CONFIRMED):
+        job = Job(
+            student_name='Test Student',
+            student_email='test@example.edu',
+            filename='part.stl',
+            original_filename='part.stl',
+            printer=printer,
+            color=color,
+            material='PLA',
+            time_min=60,
+            status=status.value,
+        )
+        job.bbox_x_mm, job.bbox_y_mm, job.bbox_z_mm = extents
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def test_suggestions_group_by_material_and_color(self):
+        """Test that only small confirmed jobs of one printer, material and color share a plate"""
+        black = [self.create_job((30, 20, 10)) for _ in range(3)]
+        self.create_job((30, 20, 10), color='Red')  # alone in its color
+        self.create_job((200, 200, 10))  # too large to share
+        self.create_job((30, 20, 10), printer='Unknown')
+        self.create_job((30, 20, 10), status=Status.PENDING)
+
+        suggestions = PlateService.suggest()
+        self.assertEqual(len(suggestions['plates']), 1)
+        plate = suggestions['plates'][0]
+        self.assertEqual((plate['printer_model'], plate['material'], plate['color']), ('Prusa MK4S', 'PLA', 'Black'))
+        self.assertEqual(sorted(part['id'] for part in plate['parts']), [job.id for job in black])
+        self.assertEqual(plate['time_min'], 180)
+        self.assertEqual(plate['plate_mm'], [250, 210])
+
+    def test_plates_endpoint(self):
+        """Test the staff-only plate suggestions API"""
+        self.create_job((30, 20, 10))
+        self.create_job((30, 20, 10))
+        self.assertEqual(self.client.get('/api/plates').status_code, 302)
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        data = self.client.get('/api/plates').get_json()
+        self.assertEqual(len(data['plates'][0]['parts']), 2)
+
+    def test_suggest_is_read_only(self):
+        """Test that suggestions list unmeasured jobs without measuring or committing"""
+        self.create_job((30, 20, 10))
+        unmeasured = self.create_job((None, None, None))
+        with patch.object(GeometryService, 'measure_job') as measure_job, \
+                patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            suggestions = PlateService.suggest()
+        measure_job.assert_not_called()
+        commit.assert_not_called()
+        self.assertEqual(suggestions['unmeasured'], [unmeasured.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
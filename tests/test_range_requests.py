@@ -0,0 +1,133 @@
+import unittest
+import os
+import random
+import shutil
+from email import message_from_bytes
+from pathlib import Path
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.download_service import DownloadService
+from config import TestingConfig
+
+
+class TestRangeRequests(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+
+        self.job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='JohnSmith_PrusaMK4S_Blue_1.gcode',
+            original_filename='part.gcode',
+            status=Status.UPLOADED.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(self.job)
+        db.session.commit()
+        self.file_path = self.test_jobs_root / self.job.status / self.job.filename
+        self.content = os.urandom(300 * 1024)
+        self.file_path.write_bytes(self.content)
+
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        self.urls = [f'/job/{self.job.id}/file', f'/open_file/{self.job.id}']
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def test_arbitrary_single_ranges_match_file_on_disk(self):
+        """Test random byte ranges against the file on disk for both routes"""
+        on_disk = self.file_path.read_bytes()
+        rng = random.Random(1234)
+        for url in self.urls:
+            for _ in range(25):
+                start = rng.randrange(len(on_disk))
+                end = rng.randrange(start, len(on_disk))
+                response = self.client.get(url, headers={'Range': f'bytes={start}-{end}'})
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.headers['Content-Range'], f'bytes {start}-{end}/{len(on_disk)}')
+                self.assertEqual(int(response.headers['Content-Length']), end - start + 1)
+                self.assertEqual(response.data, on_disk[start:end + 1])
+
+    def test_open_ended_and_suffix_ranges(self):
+        """Test resuming from an offset and fetching the tail of a file"""
+        response = self.client.get(self.urls[0], headers={'Range': 'bytes=1000-'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[1000:])
+
+        response = self.client.get(self.urls[0], headers={'Range': 'bytes=-500'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[-500:])
+
+        # Ranges past the end are clipped to the file size
+        response = self.client.get(self.urls[0], headers={'Range': f'bytes=100-{len(self.content) * 2}'})
+        self.assertEqual(response.data, self.content[100:])
+
+    def test_multi_range_response(self):
+        """Test multipart/byteranges responses, including merged overlaps"""
+        response = self.client.get(self.urls[1], headers={'Range': 'bytes=0-99,5000-5099,4000-5010,-10'})
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.headers['Content-Type'].startswith('multipart/byteranges; boundary='))
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+
+        message = message_from_bytes(
+            b'Content-Type: ' + response.headers['Content-Type'].encode() + b'\r\n\r\n' + response.data
+        )
+        parts = message.get_payload()
+        expected = [(0, 99), (4000, 5099), (len(self.content) - 10, len(self.content) - 1)]
+        self.assertEqual(len(parts), len(expected))
+        for part, (start, end) in zip(parts, expected):
+            self.assertEqual(part['Content-Range'], f'bytes {start}-{end}/{len(self.content)}')
+            self.assertEqual(part.get_payload(decode=True), self.content[start:end + 1])
+
+    def test_if_range(self):
+        """Test that a stale If-Range validator returns the full file"""
+        etag = self.client.get(self.urls[0]).headers['ETag']
+
+        response = self.client.get(self.urls[0], headers={'Range': 'bytes=10-19', 'If-Range': etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[10:20])
+
+        response = self.client.get(self.urls[0], headers={'Range': 'bytes=10-19', 'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.content)
+
+        response = self.client.get(self.urls[0], headers={'Range': 'bytes=10-19', 'If-Range': 'W/' + etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_and_invalid_ranges(self):
+        """Test 416 for ranges past the end and 200 for malformed headers"""
+        response = self.client.get(self.urls[0], headers={'Range': f'bytes={len(self.content)}-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers['Content-Range'], f'bytes */{len(self.content)}')
+
+        # '²' and '٣' pass str.isdigit() but are not valid bounds
+        for header in ('bytes=20-10', 'items=0-5', 'bytes=abc', 'bytes=0-\u00b2', 'bytes=\u0663-9'):
+            response = self.client.get(self.urls[0], headers={'Range': header})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, self.content)
+
+    def test_parse_ranges(self):
+        """Test range parsing and merging"""
+        self.assertEqual(DownloadService.parse_ranges('bytes=0-9, 5-19, 30-', 40), [(0, 20), (30, 40)])
+        self.assertEqual(DownloadService.parse_ranges('bytes=-0', 40), [])
+        for header in ('bytes=\u00b2-', 'bytes=-\u00b9', 'bytes=0-\uff19', 'bytes=+1-5'):
+            self.assertIsNone(DownloadService.parse_ranges(header, 40))
+        self.assertIsNone(DownloadService.parse_ranges(
+            'bytes=' + ','.join(f'{i * 10}-{i * 10 + 1}' for i in range(20)), 1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
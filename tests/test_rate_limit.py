@@ -0,0 +1,145 @@
+import unittest
+from app import create_app, db
+from app.models.rate_limit import RateLimitBucket
+from app.services.rate_limit_service import (
+    DatabaseBuckets, MemoryBuckets, get_admission_control, get_rate_limiter
+)
+from config import TestingConfig
+
+
+class TestMemoryBuckets(unittest.TestCase):
+    def test_burst_then_refill(self):
+        """Test that a bucket allows its burst, then one take per refill interval"""
+        buckets = MemoryBuckets()
+        for _ in range(3):
+            self.assertEqual(buckets.take('ip:1.2.3.4', 3, 1 / 60, now=1000), 0)
+        self.assertAlmostEqual(buckets.take('ip:1.2.3.4', 3, 1 / 60, now=1000), 60)
+        self.assertAlmostEqual(buckets.take('ip:1.2.3.4', 3, 1 / 60, now=1030), 30)
+        self.assertEqual(buckets.take('ip:1.2.3.4', 3, 1 / 60, now=1060), 0)
+        # Other clients have their own bucket
+        self.assertEqual(buckets.take('ip:5.6.7.8', 3, 1 / 60, now=1060), 0)
+
+    def test_least_recently_used_bucket_is_dropped(self):
+        buckets = MemoryBuckets(max_keys=2)
+        buckets.take('a', 1, 1 / 60, now=0)
+        buckets.take('b', 1, 1 / 60, now=0)
+        buckets.take('c', 1, 1 / 60, now=0)
+        self.assertEqual(buckets.take('a', 1, 1 / 60, now=0), 0)
+        self.assertGreater(buckets.take('c', 1, 1 / 60, now=0), 0)
+
+
+class RateLimitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config['RATE_LIMIT_ENABLED'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+
+class TestDatabaseBuckets(RateLimitTestCase):
+    def test_burst_then_refill(self):
+        """Test that the shared buckets match the in-memory ones"""
+        buckets = DatabaseBuckets(idle_seconds=3600)
+        for _ in range(3):
+            self.assertEqual(buckets.take('email:a@example.edu', 3, 1 / 60, now=1000), 0)
+        self.assertAlmostEqual(buckets.take('email:a@example.edu', 3, 1 / 60, now=1000), 60)
+        self.assertAlmostEqual(buckets.take('email:a@example.edu', 3, 1 / 60, now=1030), 30)
+        self.assertEqual(buckets.take('email:a@example.edu', 3, 1 / 60, now=1060), 0)
+        bucket = db.session.get(RateLimitBucket, 'email:a@example.edu')
+        self.assertAlmostEqual(bucket.tokens, 0)
+        self.assertEqual(bucket.updated_at, 1060)
+
+    def test_refill_is_capped_at_burst(self):
+        buckets = DatabaseBuckets(idle_seconds=10 ** 6)
+        buckets.take('ip:1.2.3.4', 2, 1, now=0)
+        for _ in range(2):
+            self.assertEqual(buckets.take('ip:1.2.3.4', 2, 1, now=500), 0)
+        self.assertGreater(buckets.take('ip:1.2.3.4', 2, 1, now=500), 0)
+
+    def test_idle_buckets_are_pruned(self):
+        buckets = DatabaseBuckets(idle_seconds=3600)
+        buckets.take('ip:1.2.3.4', 2, 1, now=0)
+        buckets.take('ip:5.6.7.8', 2, 1, now=5000)
+        self.assertIsNone(db.session.get(RateLimitBucket, 'ip:1.2.3.4'))
+        self.assertIsNotNone(db.session.get(RateLimitBucket, 'ip:5.6.7.8'))
+
+
+class TestSubmitLimits(RateLimitTestCase):
+    def submit(self, email='student@example.edu', ip='10.0.0.1'):
+        # No file attached: an admitted submission is redirected back to the form
+        return self.client.post('/submit', data={'student_name': 'Test Student', 'student_email': email},
+                                environ_base={'REMOTE_ADDR': ip})
+
+    def test_email_limit(self):
+        """Test that one address is refused with 429 once its burst is spent"""
+        get_rate_limiter().limits['email'] = (2, 20)
+        for _ in range(2):
+            self.assertEqual(self.submit(email='Student@Example.edu ').status_code, 302)
+        response = self.submit(ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '180')
+        self.assertIn(b'Too many submissions for this email address', response.data)
+        self.assertEqual(self.submit(email='other@example.edu').status_code, 302)
+
+    def test_ip_limit(self):
+        get_rate_limiter().limits['ip'] = (2, 60)
+        for i in range(2):
+            self.assertEqual(self.submit(email=f'student{i}@example.edu').status_code, 302)
+        response = self.submit(email='student9@example.edu')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '60')
+        self.assertEqual(self.submit(email='student9@example.edu', ip='10.0.0.2').status_code, 302)
+
+    def test_busy_when_upload_slots_are_taken(self):
+        """Test that a submission is refused with 503 while every upload slot is in use"""
+        admission = get_admission_control()
+        admission.wait_seconds = 0.01
+        slots = [admission.acquire() for _ in range(admission.max_concurrent)]
+        self.assertTrue(all(slots))
+        try:
+            response = self.submit()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '5')
+        finally:
+            for _ in slots:
+                admission.release()
+        self.assertEqual(self.submit().status_code, 302)
+
+    def test_get_and_disabled_limits_are_not_counted(self):
+        get_rate_limiter().limits['ip'] = (1, 60)
+        for _ in range(3):
+            self.assertEqual(self.client.get('/submit').status_code, 200)
+        self.app.config['RATE_LIMIT_ENABLED'] = False
+        for _ in range(3):
+            self.assertEqual(self.submit().status_code, 302)
+
+    def test_client_ip_from_trusted_proxy(self):
+        """Test that behind a proxy each forwarded client gets its own bucket"""
+        config = type('ProxiedConfig', (TestingConfig,), {'RATE_LIMIT_ENABLED': True, 'TRUSTED_PROXY_COUNT': 1})
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+            get_rate_limiter().limits['ip'] = (1, 60)
+            client = app.test_client()
+
+            def submit(forwarded_for):
+                return client.post('/submit', data={'student_name': 'Test', 'student_email': 'a@example.edu'},
+                                   headers={'X-Forwarded-For': forwarded_for},
+                                   environ_base={'REMOTE_ADDR': '172.18.0.2'})
+
+            self.assertEqual(submit('198.51.100.7').status_code, 302)
+            self.assertEqual(submit('198.51.100.8').status_code, 302)
+            # A spoofed first hop does not change the address nginx appended
+            self.assertEqual(submit('203.0.113.1, 198.51.100.7').status_code, 429)
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+from sqlalchemy import text
+from app import create_app, db
+from app.maintenance import reconcile as reconcile_module
+from app.maintenance.reconcile import reconcile
+from app.models.job import Job, Status
+from config import TestingConfig
+
+
+class TestReconcile(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+        self.maintenance_folder = tempfile.mkdtemp()
+        self.app.config['MAINTENANCE_FOLDER'] = self.maintenance_folder
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        shutil.rmtree(self.maintenance_folder)
+        self.app_context.pop()
+
+    def create_job(self, status=Status.UPLOADED, folder=None):
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='test.stl',
+            status=status.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        job.filename = f'JohnSmith_PrusaMK4S_Blue_{job.id}.stl'
+        db.session.commit()
+        if folder:
+            (self.test_jobs_root / folder / job.filename).write_bytes(b'solid\n')
+        return job
+
+    def age_dirs(self):
+        """Backdate directory mtimes so cached listings are trusted."""
+        old = time.time() - 60
+        for path in [self.test_jobs_root, *self.test_jobs_root.iterdir()]:
+            os.utime(path, (old, old))
+
+    def test_reports_orphans_missing_and_misplaced(self):
+        """Test the diff between disk and database"""
+        self.create_job(folder='Uploaded')
+        missing = self.create_job(Status.PENDING)
+        # A move that failed halfway left the file behind in Uploaded
+        misplaced = self.create_job(Status.PENDING, folder='Uploaded')
+        (self.test_jobs_root / 'Completed' / 'stray.stl').write_bytes(b'x')
+        (self.test_jobs_root / 'Completed' / '.queue.lock').write_bytes(b'')
+
+        report = reconcile()
+
+        self.assertEqual(report['missing'], [{'job_id': missing.id, 'file': missing.filename, 'expected': 'Pending'}])
+        self.assertEqual(report['misplaced'], [{'job_id': misplaced.id, 'file': misplaced.filename,
+                                                'expected': 'Pending', 'found': 'Uploaded'}])
+        self.assertEqual(report['orphans'], [{'file': 'stray.stl', 'folder': 'Completed', 'job_id': None}])
+
+    def test_repair_moves_misplaced_files(self):
+        """Test that repair moves files to where the database expects them"""
+        job = self.create_job(Status.PENDING, folder='Uploaded')
+        report = reconcile(repair=True)
+        self.assertEqual(len(report['repaired']), 1)
+        self.assertEqual(report['misplaced'], [])
+        self.assertTrue(job.get_file_path().exists())
+
+        report = reconcile()
+        self.assertEqual(report['misplaced'], [])
+        self.assertFalse(report['reused'])
+
+    def test_repair_restores_search_triggers(self):
+        """Test that missing search triggers are reported and recreated by repair"""
+        db.session.execute(text('DROP TRIGGER jobs_fts_ai'))
+        db.session.commit()
+        self.assertEqual(reconcile()['search_index_missing'], ['jobs_fts_ai'])
+        report = reconcile(repair=True)
+        self.assertEqual(report['search_index_repaired'], ['jobs_fts_ai'])
+        self.assertEqual(report['search_index_missing'], [])
+        self.assertEqual(reconcile()['search_index_missing'], [])
+
+    def test_unchanged_tree_is_not_rescanned(self):
+        """Test that incremental runs skip unchanged folders and the job query"""
+        self.create_job(folder='Uploaded')
+        self.age_dirs()
+        reconcile()
+
+        with patch.object(reconcile_module, '_list_dir', wraps=reconcile_module._list_dir) as list_dir, \
+                patch.object(reconcile_module, '_diff', wraps=reconcile_module._diff) as diff:
+            report = reconcile()
+            self.assertTrue(report['reused'])
+            self.assertEqual(report['dirs_scanned'], 0)
+            list_dir.assert_not_called()
+            diff.assert_not_called()
+
+            # Only the folder that changed is listed again
+            job = self.create_job(folder='Completed')
+            report = reconcile()
+            self.assertEqual(report['dirs_scanned'], 1)
+            self.assertEqual(report['orphans'], [])
+            self.assertEqual(report['misplaced'], [{'job_id': job.id, 'file': job.filename,
+                                                    'expected': 'Uploaded', 'found': 'Completed'}])
+
+    def test_database_change_triggers_diff(self):
+        """Test that a status change without file changes is still detected"""
+        job = self.create_job(folder='Uploaded')
+        self.age_dirs()
+        reconcile()
+
+        job.update_status(Status.PENDING)
+        db.session.commit()
+        report = reconcile()
+        self.assertFalse(report['reused'])
+        self.assertEqual(report['dirs_scanned'], 0)
+        self.assertEqual(len(report['misplaced']), 1)
+
+    def test_archived_files_are_expected_in_archived_folder(self):
+        """Test that archived jobs keep their status but their files live in Archived"""
+        job = self.create_job(Status.COMPLETED)
+        job.archived_at, job.compressed_size = datetime.utcnow(), 6
+        db.session.commit()
+        (self.test_jobs_root / 'Archived' / (job.filename + '.zst')).write_bytes(b'solid\n')
+
+        report = reconcile()
+        self.assertEqual((report['orphans'], report['missing'], report['misplaced']), ([], [], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
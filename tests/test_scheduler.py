@@ -0,0 +1,188 @@
+import unittest
+import os
+import random
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+import trimesh
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.printer import Printer, PrinterStatus
+from app.services.geometry_service import GeometryService
+from app.services.scheduler_service import SchedulerService
+from config import TestingConfig
+
+FDM = ['PLA', 'PETG', 'ABS']
+
+
+def printer(id, model='Prusa MK4S', build=(250, 210, 220), materials=FDM, free_at=0, loaded=None):
+    return {'id': id, 'model': model, 'build': build, 'materials': materials, 'free_at': free_at, 'loaded': loaded}
+
+
+def job(id, ready, material='PLA', color='Black', time_min=60, extents=(50, 50, 20), model='Prusa MK4S'):
+    return {'id': id, 'printer': model, 'material': material, 'color': color, 'time_min': time_min,
+            'extents': extents, 'ready': ready}
+
+
+class TestSchedulePlan(unittest.TestCase):
+    def queue(self, result, printer_id):
+        return [entry['job_id'] for entry in result['queues'][printer_id]]
+
+    def test_loaded_material_jumps_ahead_by_one_changeover(self):
+        """Test that a job matching the loaded material beats slightly older ones only"""
+        printers = [printer(1, loaded=('PLA', 'Black'))]
+        result = SchedulerService.plan(printers, [job(1, -20, 'PETG'), job(2, -10)], changeover_minutes=30)
+        self.assertEqual(self.queue(result, 1), [2, 1])
+        self.assertEqual([entry['changeover'] for entry in result['queues'][1]], [False, True])
+        self.assertEqual(result['queues'][1][1]['start'], 90)
+
+        result = SchedulerService.plan(printers, [job(1, -100, 'PETG'), job(2, -10)], changeover_minutes=30)
+        self.assertEqual(self.queue(result, 1), [1, 2])
+
+    def test_jobs_go_where_they_fit(self):
+        """Test model, material and build volume constraints"""
+        printers = [
+            printer(1),
+            printer(2, model='Prusa XL', build=(360, 360, 360), free_at=600),
+            printer(3, model='Form 3+', build=(145, 145, 185), materials=['Resin']),
+        ]
+        jobs = [
+            job(1, -50, extents=(300, 100, 20), model='Unknown'),  # too long for the MK4S
+            job(2, -40, extents=(100, 240, 20), model='Unknown'),  # fits the MK4S turned
+            job(3, -30, material='Resin', color='Clear', model='Form 3+'),
+            job(4, -20, extents=(400, 400, 10), model='Unknown'),  # fits nothing
+            job(5, -10, model='Prusa XL', extents=None),  # unmeasured, assumed to fit
+        ]
+        result = SchedulerService.plan(printers, jobs)
+        self.assertEqual(self.queue(result, 1), [2])
+        self.assertEqual(self.queue(result, 2), [1, 5])
+        self.assertEqual(self.queue(result, 3), [3])
+        self.assertEqual(result['unschedulable'], [4])
+        self.assertEqual(result['queues'][2][0]['start'], 600)
+
+    def test_earliest_free_printer_takes_the_oldest_job(self):
+        """Test that work spreads across identical printers by availability"""
+        printers = [printer(1, free_at=120), printer(2)]
+        result = SchedulerService.plan(printers, [job(i, -10 * (3 - i)) for i in range(3)])
+        self.assertEqual(self.queue(result, 2), [0, 1])
+        self.assertEqual(self.queue(result, 1), [2])
+
+    def test_thousand_jobs_across_twenty_printers(self):
+        """Test that a large backlog is planned in milliseconds"""
+        rng = random.Random(7)
+        printers = [printer(i, loaded=('PLA', rng.choice(['Black', 'White']))) for i in range(20)]
+        jobs = [job(i, -i, material=rng.choice(FDM), color=rng.choice(['Black', 'White', 'Blue']),
+                    time_min=rng.randint(20, 600)) for i in range(1000)]
+        start = time.perf_counter()
+        result = SchedulerService.plan(printers, jobs)
+        self.assertLess(time.perf_counter() - start, 0.25)
+        self.assertEqual(sum(len(queue) for queue in result['queues'].values()), 1000)
+
+
+class TestScheduleBuild(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def create_printer(self, name, status=PrinterStatus.AVAILABLE):
+        printer = Printer(name=name, model='Prusa MK4S', build_x_mm=250, build_y_mm=210, build_z_mm=220,
+                          status=status.value, loaded_material='PLA', loaded_color='Black')
+        printer.materials = FDM
+        db.session.add(printer)
+        db.session.commit()
+        return printer
+
+    def create_job(self, status, minutes_ago, time_min=60, printer=None):
+        job = Job(
+            student_name='Test Student',
+            student_email='test@example.edu',
+            filename=f'job_{minutes_ago}.stl',
+            original_filename='part.stl',
+            printer='Prusa MK4S',
+            color='Black',
+            material='PLA',
+            time_min=time_min,
+            status=status.value,
+            printer_id=printer.id if printer else None,
+        )
+        job.updated_at = self.now - timedelta(minutes=minutes_ago)
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def write_model(self, job, extents):
+        folder = self.test_jobs_root / job.status
+        os.makedirs(folder, exist_ok=True)
+        trimesh.creation.box(extents=extents).export(str(folder / job.filename))
+
+    def test_build_measures_and_applies_queues(self):
+        """Test that the plan accounts for prints in progress and is saved on request"""
+        busy = self.create_printer('MK4S #1')
+        idle = self.create_printer('MK4S #2')
+        self.create_printer('MK4S #3', status=PrinterStatus.MAINTENANCE)
+        self.create_job(Status.PRINTING, 30, time_min=120, printer=busy)
+        jobs = [self.create_job(Status.CONFIRMED, minutes) for minutes in (50, 40, 30)]
+        too_big = self.create_job(Status.CONFIRMED, 20)
+        for job in jobs:
+            self.write_model(job, (40, 30, 10))
+        self.write_model(too_big, (300, 300, 10))
+
+        # Planning only reads bounding boxes; measuring is left to maintenance
+        schedule = SchedulerService.build(now=self.now)
+        self.assertEqual(schedule['unmeasured'], [job.id for job in jobs + [too_big]])
+        self.assertIsNone(jobs[0].extents)
+        self.assertEqual(GeometryService.measure_confirmed(), {'measured': 4, 'failed': 0})
+
+        schedule = SchedulerService.build(now=self.now)
+        self.assertEqual(schedule['unschedulable'], [too_big.id])
+        self.assertEqual(schedule['unmeasured'], [])
+        self.assertEqual(db.session.get(Job, jobs[0].id).extents, (40.0, 30.0, 10.0))
+        queues = {entry['name']: [item['job_id'] for item in entry['queue']] for entry in schedule['printers']}
+        self.assertEqual(queues, {'MK4S #1': [jobs[2].id], 'MK4S #2': [jobs[0].id, jobs[1].id]})
+        self.assertEqual(schedule['printers'][0]['free_at'], (self.now + timedelta(minutes=90)).isoformat())
+        self.assertIsNone(db.session.get(Job, jobs[0].id).printer_id)
+
+        SchedulerService.build(now=self.now, apply=True)
+        self.assertEqual([(job.printer_id, job.queue_position) for job in jobs],
+                         [(idle.id, 0), (idle.id, 1), (busy.id, 0)])
+        self.assertIsNone(too_big.printer_id)
+
+    def test_schedule_endpoint(self):
+        """Test the staff-only schedule API"""
+        printer = self.create_printer('MK4S #1')
+        job = self.create_job(Status.CONFIRMED, 10)
+        job.bbox_x_mm, job.bbox_y_mm, job.bbox_z_mm = 10, 10, 10
+        db.session.commit()
+        self.assertEqual(self.client.get('/api/schedule').status_code, 302)
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        unmeasured = self.create_job(Status.CONFIRMED, 5)
+        self.write_model(unmeasured, (40, 30, 10))
+        with patch.object(GeometryService, 'measure_job') as measure_job, \
+                patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            data = self.client.get('/api/schedule').get_json()
+        measure_job.assert_not_called()
+        commit.assert_not_called()
+        self.assertEqual(data['printers'][0]['queue'][0]['job_id'], job.id)
+        self.assertEqual(data['unmeasured'], [unmeasured.id])
+        self.assertIsNone(db.session.get(Job, job.id).printer_id)
+        self.client.post('/api/schedule')
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Job, job.id).printer_id, printer.id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.job import Job
+from app.services.search_service import SearchService
+from config import TestingConfig
+
+
+class TestJobSearch(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_job(self, name, email, original_filename, color='Blue', material='PLA', notes=None):
+        job = Job(
+            student_name=name,
+            student_email=email,
+            filename='test.stl',
+            original_filename=original_filename,
+            printer='Prusa MK4S',
+            color=color,
+            material=material,
+            notes=notes
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def ids(self, query):
+        return [row.id for row in SearchService.search(query)]
+
+    def test_prefix_matching_across_columns(self):
+        """Test that every term must match some column as a prefix"""
+        alex = self.create_job('Alex Chen', 'alex.chen@example.edu', 'bracket.stl')
+        self.create_job('Alexis Park', 'apark@example.edu', 'gear.stl', color='Red', material='PETG')
+
+        self.assertEqual(self.ids('ale blu pla'), [alex.id])
+        self.assertEqual(len(self.ids('alex')), 2)
+        self.assertEqual(self.ids('brack'), [alex.id])
+        self.assertEqual(self.ids('chen@example'), [alex.id])
+        self.assertEqual(self.ids('nothing'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that the triggers keep the index in sync"""
+        job = self.create_job('Alex Chen', 'alex@example.edu', 'bracket.stl')
+        job.notes = 'needs tree supports'
+        job.color = 'Orange'
+        db.session.commit()
+        self.assertEqual(self.ids('tree orange'), [job.id])
+        self.assertEqual(self.ids('blue'), [])
+
+        db.session.delete(job)
+        db.session.commit()
+        self.assertEqual(self.ids('alex'), [])
+
+    def test_ranking_prefers_name_matches(self):
+        """Test that a student name match ranks above a notes mention"""
+        mention = self.create_job('Jordan Lee', 'jlee@example.edu', 'case.stl', notes='same design as Morgan')
+        morgan = self.create_job('Morgan Diaz', 'mdiaz@example.edu', 'hinge.stl')
+        self.assertEqual(self.ids('morgan'), [morgan.id, mention.id])
+
+    def test_query_syntax_is_literal(self):
+        """Test that FTS5 operators in user input cannot break the query"""
+        job = self.create_job('Alex Chen', 'alex@example.edu', 'bracket.stl')
+        for query in ('"alex', 'alex AND', 'NEAR(alex', 'alex*', 'col:alex', '-alex', ''):
+            SearchService.search(query)
+        self.assertEqual(self.ids('alex OR zzz'), [])
+        self.assertEqual(self.ids('"alex"'), [job.id])
+
+    def test_missing_triggers_are_recreated(self):
+        """Test that dropped triggers are reported, recreated, and jobs added meanwhile are indexed"""
+        self.assertEqual(SearchService.check_index(), [])
+        for trigger in ('jobs_fts_ai', 'jobs_fts_au'):
+            db.session.execute(text(f'DROP TRIGGER {trigger}'))
+        db.session.commit()
+        job = self.create_job('Alex Chen', 'alex@example.edu', 'bracket.stl')
+        self.assertEqual(self.ids('alex'), [])
+
+        self.assertEqual(SearchService.check_index(), ['jobs_fts_ai', 'jobs_fts_au'])
+        self.assertEqual(SearchService.check_index(repair=True), ['jobs_fts_ai', 'jobs_fts_au'])
+        self.assertEqual(SearchService.check_index(), [])
+        self.assertEqual(self.ids('alex'), [job.id])
+        job.notes = 'tree supports'
+        db.session.commit()
+        self.assertEqual(self.ids('tree'), [job.id])
+
+    def test_search_endpoint(self):
+        """Test the staff-only search API"""
+        job = self.create_job('Alex Chen', 'alex@example.edu', 'bracket.stl')
+        self.assertEqual(self.client.get('/api/jobs/search?q=alex').status_code, 302)
+
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        response = self.client.get('/api/jobs/search?q=alex+blue')
+        self.assertEqual(response.status_code, 200)
+        result = response.json['results'][0]
+        self.assertEqual(result['id'], job.id)
+        self.assertEqual(result['url'], f'/job/{job.id}')
+        self.assertEqual(result['material'], 'PLA')
+        self.assertIn('took_ms', response.json)
+
+
+if __name__ == '__main__':
+    unittest.main()
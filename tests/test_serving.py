@@ -0,0 +1,124 @@
+import unittest
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from app import create_app, db
+from app.serve import WorkerLifecycle
+from config import TestingConfig
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestHealthEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_liveness(self):
+        """Test that /healthz answers without touching the database"""
+        response = self.client.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], 'ok')
+
+    def test_ready(self):
+        """Test that /readyz reports every check as ok"""
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['checks'], {'database': 'ok', 'jobs_root': 'ok', 'worker': 'ok'})
+
+    def test_not_ready_while_draining_or_without_jobs_root(self):
+        """Test that a draining worker or a missing jobs volume is reported as unavailable"""
+        self.app.extensions['draining'] = threading.Event()
+        self.app.extensions['draining'].set()
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['checks']['worker'], 'draining')
+
+        self.app.extensions['draining'].clear()
+        self.app.config['JOBS_ROOT'] = os.path.join(ROOT, 'no-such-jobs-root')
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['checks']['jobs_root'], 'missing')
+
+
+class TestWorkerLifecycle(unittest.TestCase):
+    def test_drains_after_max_requests(self):
+        """Test that the worker is asked to drain once it has served its requests"""
+        draining = threading.Event()
+        middleware = WorkerLifecycle(lambda environ, start_response: [b'ok'], 3, draining)
+        for _ in range(2):
+            middleware({}, None)
+        self.assertFalse(draining.is_set())
+        middleware({}, None)
+        self.assertTrue(draining.is_set())
+
+    def test_never_drains_without_a_limit(self):
+        draining = threading.Event()
+        middleware = WorkerLifecycle(lambda environ, start_response: [b'ok'], 0, draining)
+        for _ in range(10):
+            middleware({}, None)
+        self.assertFalse(draining.is_set())
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(os.name == 'posix', 'worker processes need a POSIX supervisor')
+class TestSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.port = free_port()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'app.serve', '--config', 'config.TestingConfig', '--host', '127.0.0.1',
+             '--port', str(self.port), '--workers', '2', '--threads', '2', '--max-requests', '4',
+             '--max-requests-jitter', '0', '--graceful-timeout', '5'],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(self.stop)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def get(self, path, timeout=30):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+                conn.request('GET', path)
+                response = conn.getresponse()
+                return response.status, json.loads(response.read())
+            except (ConnectionError, OSError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def test_workers_are_recycled_and_stop_gracefully(self):
+        """Test that workers are replaced after their request limit without failed requests"""
+        results = [self.get('/healthz') for _ in range(16)]
+        self.assertEqual({status for status, _ in results}, {200})
+        # Two workers of four requests each cannot serve sixteen requests
+        self.assertGreater(len({body['pid'] for _, body in results}), 2)
+
+        self.process.send_signal(signal.SIGTERM)
+        self.assertEqual(self.process.wait(timeout=30), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
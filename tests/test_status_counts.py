@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.status_count_service import get_status_count_cache
+from config import TestingConfig
+
+
+class TestStatusCounts(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_job(self, status=Status.UPLOADED):
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='test.stl',
+            status=status.value,
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def test_counts_follow_create_update_and_delete(self):
+        """Test incremental updates without re-querying the database"""
+        cache = get_status_count_cache()
+        self.assertEqual(cache.get_counts(), {})
+
+        with patch.object(cache, 'reconcile', wraps=cache.reconcile) as reconcile:
+            job = self.create_job()
+            self.create_job()
+            self.assertEqual(cache.get_counts()[Status.UPLOADED.value], 2)
+
+            job.update_status(Status.PENDING)
+            db.session.commit()
+            counts = cache.get_counts()
+            self.assertEqual(counts[Status.UPLOADED.value], 1)
+            self.assertEqual(counts[Status.PENDING.value], 1)
+
+            db.session.delete(job)
+            db.session.commit()
+            self.assertEqual(cache.get_counts()[Status.PENDING.value], 0)
+            reconcile.assert_not_called()
+
+    def test_rollback_discards_pending_changes(self):
+        """Test that rolled back transitions are not counted"""
+        job = self.create_job()
+        cache = get_status_count_cache()
+        cache.get_counts()
+
+        job.update_status(Status.PENDING)
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertEqual(cache.get_counts()[Status.UPLOADED.value], 1)
+        self.assertNotIn(Status.PENDING.value, cache.get_counts())
+
+    def test_periodic_reconcile_corrects_drift(self):
+        """Test that stale counts are reloaded from the database"""
+        cache = get_status_count_cache()
+        self.create_job()
+        cache.get_counts()
+        # Simulate a row written by another process
+        db.session.execute(Job.__table__.update().values(status=Status.REJECTED.value))
+        db.session.commit()
+
+        cache.reconcile_seconds = 0
+        counts = cache.get_counts()
+        self.assertEqual(counts.get(Status.UPLOADED.value, 0), 0)
+        self.assertEqual(counts[Status.REJECTED.value], 1)
+
+    def test_status_counts_endpoint(self):
+        """Test the public JSON endpoint and its conditional GET support"""
+        self.create_job()
+        self.create_job(Status.REJECTED)
+
+        response = self.client.get('/api/status-counts')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['counts'][Status.UPLOADED.value], 1)
+        self.assertEqual(response.json['counts'][Status.REJECTED.value], 1)
+        self.assertEqual(response.json['counts'][self.app.config['PRINTING_FOLDER']], 0)
+        self.assertEqual(response.json['total'], 2)
+
+        response = self.client.get('/api/status-counts', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
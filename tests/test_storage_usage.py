@@ -0,0 +1,174 @@
+import unittest
+import io
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+from werkzeug.datastructures import FileStorage
+from app import create_app, db
+from app.models.job import Job, Status
+from app.models.storage import StorageUsage, StorageSnapshot
+from app.services import counter_service
+from app.services.counter_service import increment_counters
+from app.services.file_service import FileService
+from app.services.storage_service import StorageService
+from config import TestingConfig
+
+GB = 1024 ** 3
+
+
+class TestStorageUsage(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        self.test_jobs_root = Path(self.app.config['JOBS_ROOT'])
+        for folder in self.app.config['STATUS_FOLDERS']:
+            os.makedirs(self.test_jobs_root / folder, exist_ok=True)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        if self.test_jobs_root.exists():
+            shutil.rmtree(self.test_jobs_root)
+        self.app_context.pop()
+
+    def create_job(self, size, email='john@example.com'):
+        job = Job(
+            student_name='John Smith',
+            student_email=email,
+            filename='test.stl',
+            original_filename='test.stl',
+            printer='Prusa MK4S',
+            color='Blue'
+        )
+        db.session.add(job)
+        db.session.commit()
+        job.filename = f'JohnSmith_PrusaMK4S_Blue_{job.id}.stl'
+        upload = FileStorage(stream=io.BytesIO(b'x' * size), filename='test.stl')
+        self.assertTrue(FileService.save_uploaded_file(upload, Status.UPLOADED.value, job.filename, job=job))
+        db.session.commit()
+        return job
+
+    def usage(self, scope, key):
+        row = StorageUsage.query.filter_by(scope=scope, key=key).first()
+        return (row.bytes, row.files) if row else (0, 0)
+
+    def test_totals_follow_saves_transitions_and_deletes(self):
+        """Test that totals change with the job rows, without touching the disk"""
+        job = self.create_job(1000)
+        self.create_job(500, email='jane@example.com')
+        self.assertEqual(self.usage('status', 'Uploaded'), (1500, 2))
+        self.assertEqual(self.usage('student', 'john@example.com'), (1000, 1))
+
+        job.update_status(Status.PENDING)
+        db.session.commit()
+        self.assertEqual(self.usage('status', 'Uploaded'), (500, 1))
+        self.assertEqual(self.usage('status', 'Pending'), (1000, 1))
+
+        # Size changes of an expired job are applied against the stored size
+        job.file_size = 300
+        db.session.commit()
+        self.assertEqual(self.usage('status', 'Pending'), (300, 1))
+
+        db.session.delete(job)
+        db.session.commit()
+        self.assertEqual(self.usage('status', 'Pending'), (0, 0))
+        self.assertEqual(self.usage('student', 'john@example.com'), (0, 0))
+
+    def test_rollback_leaves_totals_unchanged(self):
+        """Test that a failed transition does not skew the totals"""
+        job = self.create_job(1000)
+        job.update_status(Status.REJECTED)
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.usage('status', 'Uploaded'), (1000, 1))
+        self.assertEqual(self.usage('status', 'Rejected'), (0, 0))
+
+    def test_counters_are_upserted(self):
+        """Test that a new total is created and later ones added in one statement"""
+        table = StorageUsage.__table__
+        with db.engine.begin() as connection:
+            for _ in range(2):
+                increment_counters(connection, table, {'scope': 'status', 'key': 'Pending'}, {'bytes': 5, 'files': 1})
+        row = StorageUsage.query.filter_by(scope='status', key='Pending').one()
+        self.assertEqual((row.bytes, row.files), (10, 2))
+
+    def test_row_created_concurrently_is_updated(self):
+        """Test the UPDATE-then-INSERT fallback when another transaction creates the row first"""
+        table = StorageUsage.__table__
+
+        class RacingConnection:
+            # Another worker inserts the row right after this UPDATE missed it
+            def __init__(self, connection):
+                self.connection, self.raced = connection, False
+
+            def execute(self, statement):
+                result = self.connection.execute(statement)
+                if not self.raced:
+                    self.raced = True
+                    self.connection.execute(table.insert().values(scope='status', key='Pending', bytes=7, files=1))
+                return result
+
+            def __getattr__(self, name):
+                return getattr(self.connection, name)
+
+        with patch.dict(counter_service._UPSERT_INSERTS, clear=True), db.engine.begin() as connection:
+            increment_counters(RacingConnection(connection), table, {'scope': 'status', 'key': 'Pending'},
+                               {'bytes': 5, 'files': 1})
+        row = StorageUsage.query.filter_by(scope='status', key='Pending').one()
+        self.assertEqual((row.bytes, row.files), (12, 2))
+
+    def test_rebuild_backfills_sizes(self):
+        """Test backfilling jobs created before sizes were tracked"""
+        job = self.create_job(1000)
+        db.session.execute(Job.__table__.update().values(file_size=None))
+        db.session.query(StorageUsage).delete()
+        db.session.commit()
+
+        self.assertEqual(StorageService.rebuild(), 1)
+        self.assertEqual(db.session.get(Job, job.id).file_size, 1000)
+        self.assertEqual(self.usage('status', 'Uploaded'), (1000, 1))
+        self.assertEqual(self.usage('student', 'john@example.com'), (1000, 1))
+
+    def test_forecast_days_until_threshold(self):
+        """Test the linear capacity forecast"""
+        now = datetime.utcnow()
+        for day in range(10):
+            db.session.add(StorageSnapshot(taken_at=now - timedelta(days=9 - day), disk_total=100 * GB,
+                                           disk_used=(71 + day) * GB, jobs_bytes=0))
+        db.session.commit()
+
+        forecast = StorageService.forecast(now=now)
+        self.assertEqual(forecast['bytes_per_day'], GB)
+        self.assertEqual(forecast['days_until_threshold'], 10)
+
+        db.session.query(StorageSnapshot).delete()
+        db.session.commit()
+        self.assertIsNone(StorageService.forecast(now=now)['days_until_threshold'])
+
+    def test_storage_endpoint(self):
+        """Test the staff usage report"""
+        self.create_job(1000)
+        big = self.create_job(5000, email='jane@example.com')
+        response = self.client.get('/api/storage')
+        self.assertEqual(response.status_code, 302)
+
+        self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+        report = self.client.get('/api/storage?top=1').json
+        self.assertEqual(report['total_bytes'], 6000)
+        self.assertEqual(report['by_status']['Uploaded'], {'bytes': 6000, 'files': 2})
+        self.assertEqual(report['by_status']['Archived'], {'bytes': 0, 'files': 0})
+        self.assertEqual(report['largest_jobs'], [{
+            'id': big.id, 'filename': big.filename, 'status': 'Uploaded',
+            'student_email': 'jane@example.com', 'bytes': 5000}])
+        self.assertEqual(report['top_students'][0]['student_email'], 'jane@example.com')
+        self.assertIn('days_until_threshold', report['forecast'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import re
+import unittest
+from unittest.mock import patch
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.email_service import EmailService
+from app.services.metrics_service import STUDENT_STATUS_REQUESTS
+from app.services.student_status_service import StudentStatusService, get_student_status_cache
+from app.services.token_service import TokenService
+from config import TestingConfig
+
+
+class TestStudentStatus(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config['STUDENT_STATUS_CACHE_SECONDS'] = 10 ** 9  # no estimate refresh mid-test
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        STUDENT_STATUS_REQUESTS.reset()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def make_job(self, email='Student@Example.edu', filename='part.stl', **fields):
+        job = Job(student_name='Test Student', student_email=email, filename=filename,
+                  original_filename=filename, printer='Prusa MK4S', color='Blue', material='PLA', **fields)
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def status_url(self, email='student@example.edu'):
+        return f'/status/{TokenService.generate_status_token(email)}'
+
+    def test_lists_only_the_students_jobs(self):
+        """Test that the page shows the token's jobs, whatever the case of the stored address"""
+        self.make_job(filename='bracket.stl')
+        self.make_job(email='student@example.edu', filename='gear.stl', status=Status.PENDING.value)
+        self.make_job(email='other@example.edu', filename='secret.stl')
+        response = self.client.get(self.status_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'bracket.stl', response.data)
+        self.assertIn(b'gear.stl', response.data)
+        self.assertIn(b'Pending', response.data)
+        self.assertNotIn(b'secret.stl', response.data)
+        self.assertEqual(response.headers['Referrer-Policy'], 'no-referrer')
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+
+    def test_invalid_and_confirmation_tokens_are_refused(self):
+        job = self.make_job()
+        for token in ('not-a-token', TokenService.generate_token(job)):
+            response = self.client.get(f'/status/{token}')
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response.location.endswith('/status'))
+
+    def test_conditional_get_and_cache(self):
+        """Test that refreshes are answered with 304 or from the cache until a status changes"""
+        job = self.make_job()
+        url = self.status_url()
+        first = self.client.get(url)
+        etag = first.headers['ETag']
+
+        unchanged = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.data, b'')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(STUDENT_STATUS_REQUESTS.collect(),
+                         {('miss',): 1, ('not_modified',): 1, ('hit',): 1})
+
+        job.update_status(Status.REJECTED, actor='staff')
+        db.session.commit()
+        changed = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertIn(b'Rejected', changed.data)
+        self.assertEqual(STUDENT_STATUS_REQUESTS.collect()[('miss',)], 2)
+
+    def test_cache_serves_only_the_current_version(self):
+        cache = get_student_status_cache()
+        cache.put('student@example.edu', 'v1', '<p>old</p>')
+        self.assertEqual(cache.get('student@example.edu', 'v1'), '<p>old</p>')
+        self.assertIsNone(cache.get('student@example.edu', 'v2'))
+        self.assertEqual(StudentStatusService.version('student@example.edu'),
+                         StudentStatusService.version('student@example.edu'))
+
+    def test_request_link_emails_only_known_addresses(self):
+        """Test that a link is emailed to addresses with jobs, with the same answer for any address"""
+        self.make_job()
+        with patch.object(EmailService, 'send_email', return_value=True) as send_email:
+            known = self.client.post('/status', data={'student_email': ' STUDENT@example.edu'}, follow_redirects=True)
+            unknown = self.client.post('/status', data={'student_email': 'nobody@example.edu'}, follow_redirects=True)
+        self.assertEqual(send_email.call_count, 1)
+        subject, recipient, body, html = send_email.call_args.args
+        self.assertEqual(recipient, 'student@example.edu')
+        self.assertIn(b'has been emailed', known.data)
+        self.assertIn(b'has been emailed', unknown.data)
+
+        token = re.search(r'/status/(\S+)', body).group(1)
+        self.assertEqual(TokenService.verify_status_token(token), ('student@example.edu', None))
+        self.assertIn(b'part.stl', self.client.get(f'/status/{token}').data)
+
+    def test_request_link_is_rate_limited(self):
+        self.make_job()
+        self.app.config['RATE_LIMIT_ENABLED'] = True
+        with patch.object(EmailService, 'send_email', return_value=True) as send_email:
+            for _ in range(5):
+                self.client.post('/status', data={'student_email': 'student@example.edu'})
+        self.assertEqual(send_email.call_count, self.app.config['STATUS_LINK_BURST'])
+
+
+if __name__ == '__main__':
+    unittest.main()
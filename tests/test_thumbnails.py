@@ -0,0 +1,136 @@
+import unittest
+import io
+import os
+import re
+import shutil
+from pathlib import Path
+from PIL import Image, features
+from app import create_app, db
+from app.models.job import Job, Status
+from app.services.thumbnail_service import ThumbnailService, THUMBNAIL_SIZES
+from config import TestingConfig
+
+
+class TestThumbnailSizes(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+        self.thumbnails_dir = Path(self.app.config['THUMBNAILS_DIR'])
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        shutil.rmtree(self.thumbnails_dir, ignore_errors=True)
+        self.app_context.pop()
+
+    def login_staff(self):
+        return self.client.post('/staff/login', data={'password': self.app.config['STAFF_PASSWORD']})
+
+    def create_job(self, render=True, color=(200, 60, 30)):
+        """Create a job and write its thumbnails as the renderer would."""
+        job = Job(student_name='John Smith', student_email='john@example.com', filename='test.stl',
+                  original_filename='test.stl', status=Status.UPLOADED.value, printer='Prusa MK4S', color='Blue')
+        db.session.add(job)
+        db.session.commit()
+        if render:
+            render = Image.new('RGB', (max(THUMBNAIL_SIZES),) * 2, color)
+            ThumbnailService._save_sizes(render, job.id, str(self.thumbnails_dir))
+            job.thumbnail_path = f'thumbnails/{job.id}.png'
+            db.session.commit()
+        return job
+
+    def test_one_render_writes_every_size(self):
+        """Test that a render is saved at every size in WebP and PNG"""
+        job = self.create_job()
+        for size in THUMBNAIL_SIZES:
+            for fmt in ('webp', 'png'):
+                name = f'{job.id}.png' if (size, fmt) == (400, 'png') else f'{job.id}_{size}.{fmt}'
+                with Image.open(self.thumbnails_dir / name) as image:
+                    self.assertEqual(image.size, (size, size))
+                    self.assertEqual(image.format, fmt.upper())
+        self.assertFalse((self.thumbnails_dir / f'{job.id}_64.avif').exists())
+
+    @unittest.skipUnless(features.check('avif'), 'Pillow was built without AVIF')
+    def test_avif_is_optional(self):
+        self.app.config['THUMBNAIL_AVIF'] = True
+        job = self.create_job()
+        self.assertEqual(ThumbnailService.get_thumbnail_formats(job.id), ['avif', 'webp', 'png'])
+
+        # Rendering again without AVIF removes the old AVIF files
+        self.app.config['THUMBNAIL_AVIF'] = False
+        ThumbnailService._save_sizes(Image.new('RGB', (400, 400)), job.id, str(self.thumbnails_dir))
+        self.assertEqual(ThumbnailService.get_thumbnail_formats(job.id), ['webp', 'png'])
+
+    def test_dashboard_srcset(self):
+        """Test that the dashboard offers WebP and PNG sources with every size"""
+        job = self.create_job()
+        self.login_staff()
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        source = re.search(r'<source type="image/webp" srcset="([^"]+)" sizes="64px">', html)
+        self.assertIsNotNone(source)
+        self.assertEqual([entry.split()[1] for entry in source.group(1).split(', ')], ['64w', '128w', '400w'])
+        self.assertIn(f'{job.id}_64.webp', source.group(1))
+        src = re.search(r'<img src="([^"]+)" srcset="[^"]+" sizes="64px"', html).group(1).replace('&amp;', '&')
+        self.assertIn(f'{job.id}_128.png', src)
+
+        # Every size shares the version of the full-size PNG, so it is immutable
+        webp = source.group(1).split(', ')[0].split()[0].replace('&amp;', '&')
+        response = self.client.get(webp)
+        self.assertEqual(response.mimetype, 'image/webp')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+
+    def test_older_thumbnails_keep_a_single_image(self):
+        job = self.create_job(render=False)
+        Image.new('RGB', (400, 400)).save(self.thumbnails_dir / f'{job.id}.png')
+        job.thumbnail_path = f'thumbnails/{job.id}.png'
+        db.session.commit()
+        self.login_staff()
+        html = self.client.get('/dashboard').get_data(as_text=True)
+        self.assertNotIn('<source', html)
+        self.assertRegex(html, rf'<img src="/thumbnail/{job.id}.png\?v=\w+"\s+alt=')
+
+    def test_jobs_list_uses_one_sprite_sheet(self):
+        """Test that the jobs list loads every thumbnail from one sprite request"""
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        jobs = [self.create_job(color=color) for color in colors]
+        self.create_job(render=False)
+        self.login_staff()
+        html = self.client.get('/jobs').get_data(as_text=True)
+        urls = set(re.findall(r"background-image: url\('([^']+)'\)", html))
+        self.assertEqual(len(urls), 1)
+        self.assertNotIn('<img', html)
+
+        url = urls.pop().replace('&amp;', '&')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        with Image.open(io.BytesIO(response.data)) as sheet:
+            self.assertEqual(sheet.format, 'WEBP')
+            self.assertEqual(sheet.size, (3 * 64, 64))
+            sheet = sheet.convert('RGB')
+            # Tiles follow the order of the ids in the URL
+            ids = [int(job_id) for job_id in re.search(r'ids=([\d%C,]+)', url).group(1).replace('%2C', ',').split(',')]
+            for index, job_id in enumerate(ids):
+                expected = colors[[job.id for job in jobs].index(job_id)]
+                pixel = sheet.getpixel((index * 64 + 32, 32))
+                self.assertTrue(all(abs(a - b) < 10 for a, b in zip(pixel, expected)), (pixel, expected))
+
+        response = self.client.get(url, headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_sprite_arguments(self):
+        job = self.create_job()
+        self.assertEqual(self.client.get(f'/thumbnails/sprite?ids={job.id}').status_code, 302)
+        self.login_staff()
+        self.assertEqual(self.client.get(f'/thumbnails/sprite?ids={job.id}&size=128').status_code, 200)
+        self.assertEqual(self.client.get(f'/thumbnails/sprite?ids={job.id}&size=400').status_code, 400)
+        self.assertEqual(self.client.get('/thumbnails/sprite?ids=1,x').status_code, 400)
+        self.assertEqual(self.client.get('/thumbnails/sprite?ids=999').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
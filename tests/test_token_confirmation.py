@@ -1,5 +1,7 @@
 import unittest
 import os
+import time
+from unittest.mock import patch, PropertyMock
 from app import create_app, db
 from app.models.job import Job, Status
 from app.services.token_service import TokenService
@@ -145,4 +147,58 @@ class TestTokenConfirmation(unittest.TestCase):
         # Try to confirm
         response = self.client.get(f'/job/confirm/{token}', follow_redirects=True)
         self.assertEqual(response.status_code, 200)
-        self.assertIn(b'must be in \'Pending\' status', response.data) 
\ No newline at end of file
+        self.assertIn(b'must be in \'Pending\' status', response.data)
+
+    def create_pending_job(self):
+        job = Job(
+            student_name='John Smith',
+            student_email='john@example.com',
+            filename='test.stl',
+            original_filename='test.stl',
+            status=Status.PENDING,
+            printer='Prusa MK4S',
+            color='Blue',
+            weight_g=100,
+            time_min=120,
+            cost=7.0
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def test_serializer_is_rebuilt_only_for_a_new_secret_key(self):
+        """Test that tokens are checked once, and the cache goes with the key"""
+        job = self.create_pending_job()
+        token = TokenService.generate_token(job)
+        serializer = self.app.extensions['token_service'][1]
+        with patch.object(serializer, 'loads', wraps=serializer.loads) as loads:
+            for _ in range(5):
+                self.assertEqual(TokenService.verify_token(token), (job.id, None))
+            self.assertEqual(loads.call_count, 1)
+        self.assertIs(self.app.extensions['token_service'][1], serializer)
+
+        self.app.config['SECRET_KEY'] = 'rotated'
+        self.assertEqual(TokenService.verify_token(token), (None, 'Invalid confirmation link.'))
+
+    def test_cached_token_still_expires(self):
+        """Test that a cached token is refused once it is older than the expiry"""
+        job = self.create_pending_job()
+        token = TokenService.generate_token(job)
+        self.assertEqual(TokenService.verify_token(token), (job.id, None))
+        with patch('app.services.token_service.time.time', return_value=time.time() + 3600):
+            job_id, error = TokenService.verify_token(token, expiration=60)
+        self.assertIsNone(job_id)
+        self.assertIn('expired', error)
+
+    def test_confirmed_token_is_single_use(self):
+        """Test that a used confirmation link is turned away without loading the job"""
+        job = self.create_pending_job()
+        self.create_test_file(job)
+        token = TokenService.generate_token(job)
+        response = self.client.post(f'/job/confirm/{token}')
+        self.assertEqual(response.status_code, 200)
+
+        with patch.object(Job, 'query', new_callable=PropertyMock, side_effect=AssertionError('no lookup expected')):
+            response = self.client.get(f'/job/confirm/{token}', follow_redirects=True)
+        self.assertIn(b'already been confirmed', response.data)
+        self.assertEqual(TokenService.verify_token(token), (None, 'This job has already been confirmed.'))